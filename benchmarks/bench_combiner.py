@@ -0,0 +1,259 @@
+"""
+Micro-benchmarks for the search hot path: request adapters and the result
+combiner.
+
+Times each stage of turning a search into a response, at growing payload
+sizes, and measures the peak memory allocated by each stage (tracemalloc):
+  prepare      - prepare_flyhub_request + prepare_bdfare_request
+  parse        - parse_flyhub + parse_bdfare (supplier dicts -> Offer objects)
+  dedup        - deduplicate_offers across both suppliers, on freshly parsed
+                 offers each run (it records alternatives on them)
+  select       - select_offers (sort by fare)
+  to_dict      - Offer.to_dict for the response
+  combine      - combine_results end to end (parse + dedup + select + to_dict)
+  encode       - fast_json.dumps of the combined response
+
+Regression thresholds:
+  --check         fail if combine takes longer than COMBINE_BUDGET_US_PER_OFFER
+  --compare FILE  fail if any stage is more than --max-regression slower (or
+                  allocates that much more) than in a previous --output file
+
+Usage: python -m benchmarks.bench_combiner [--offers 10 100 1000 5000 20000]
+           [--segments 2] [--duplicates 0.3] [--output FILE] [--compare FILE]
+           [--max-regression 0.2] [--check]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import timeit
+import tracemalloc
+from itertools import chain
+
+from benchmarks import payloads
+from services.flight_service import result_combiner
+from services.flight_service.bdfare_adapter import prepare_bdfare_request
+from services.flight_service.flyhub_adapter import prepare_flyhub_request
+from shared import fast_json
+
+DEFAULT_OFFER_COUNTS = [10, 100, 1000, 5000, 20000]
+# Generous absolute budget for combine_results, per offer and supplier, in
+# microseconds
+COMBINE_BUDGET_US_PER_OFFER = float(
+    os.getenv("COMBINE_BUDGET_US_PER_OFFER", "60"),
+)
+
+
+def search_params(segment_count):
+    return {
+        "segments": [
+            {
+                "origin": origin,
+                "destination": destination,
+                "departure_date": f"2026-12-{20 + i:02d}",
+            }
+            for i, (origin, destination) in enumerate(
+                zip(payloads.AIRPORTS[:segment_count], payloads.AIRPORTS[1:])
+            )
+        ],
+        "adult_count": 2,
+        "child_count": 1,
+        "cabin_class": "economy",
+        "trip_type": (
+            "multi_city"
+            if segment_count > 2
+            else "round_trip" if segment_count == 2 else "one_way"
+        ),
+    }
+
+
+def stages(count, segment_count, duplicates):
+    """
+    The benchmarked stages for one payload size, with their inputs prepared up
+    front: each is a function, or a (setup, function) pair for a stage that
+    needs a fresh input from setup() on every run.
+    """
+    params = search_params(segment_count)
+    flyhub = payloads.generate_flyhub_response(
+        count, segments_per_offer=segment_count, duplicates=duplicates
+    )
+    bdfare = payloads.generate_bdfare_response(
+        count, segments_per_offer=segment_count, duplicates=duplicates
+    )
+    parsed = [
+        result_combiner.parse_flyhub(flyhub),
+        result_combiner.parse_bdfare(bdfare),
+    ]
+    offers = chain.from_iterable(parsed)
+    deduplicated = result_combiner.deduplicate_offers(offers)
+    selected = result_combiner.select_offers([deduplicated])
+    response = {
+        "results": result_combiner.combine_results(flyhub, bdfare),
+        "suppliers": {},
+    }
+    return {
+        "prepare": lambda: (
+            prepare_flyhub_request(params),
+            prepare_bdfare_request(params),
+        ),
+        "parse": lambda: (
+            result_combiner.parse_flyhub(flyhub),
+            result_combiner.parse_bdfare(bdfare),
+        ),
+        "dedup": (
+            lambda: result_combiner.parse_flyhub(flyhub)
+            + result_combiner.parse_bdfare(bdfare),
+            result_combiner.deduplicate_offers,
+        ),
+        "select": lambda: result_combiner.select_offers([deduplicated]),
+        "to_dict": lambda: [offer.to_dict() for offer in selected],
+        "combine": lambda: result_combiner.combine_results(flyhub, bdfare),
+        "encode": lambda: fast_json.dumps(response),
+    }
+
+
+def _loop_count(func):
+    number = 1
+    # Grow the loop until one measurement takes long enough to be reliable
+    while number < 10000:
+        if min(timeit.repeat(func, repeat=1, number=number)) >= 0.02:
+            break
+        number *= 10
+    return number
+
+
+def time_stage(stage, repeat):
+    if callable(stage):
+        number = _loop_count(stage)
+        return min(timeit.repeat(stage, repeat=repeat, number=number)) / number
+
+    setup, func = stage
+    number = _loop_count(lambda: func(setup()))
+    timings = []
+    for _ in range(repeat):
+        inputs = [setup() for _ in range(number)]
+        started = time.perf_counter()
+        for stage_input in inputs:
+            func(stage_input)
+        timings.append(time.perf_counter() - started)
+    return min(timings) / number
+
+
+def peak_allocation(stage):
+    setup, func = (None, stage) if callable(stage) else stage
+    stage_input = setup() if setup else None
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        func(stage_input) if setup else func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(offer_counts, segment_count, repeat, duplicates):
+    results = {}
+    print("  offers stage            ms  us/offer   peak KiB")
+    for count in offer_counts:
+        results[str(count)] = {}
+        for stage, func in stages(count, segment_count, duplicates).items():
+            seconds = time_stage(func, repeat)
+            peak = peak_allocation(func)
+            results[str(count)][stage] = {
+                "ms": round(seconds * 1000, 4),
+                "peak_kib": round(peak / 1024, 1),
+            }
+            print(
+                f"{count:>8} {stage:<8} {seconds * 1000:>10.3f}"
+                f" {seconds * 1e6 / count:>9.2f} {peak / 1024:>10.1f}"
+            )
+    return results
+
+
+def check_budget(results):
+    ok = True
+    for count, stage_results in results.items():
+        # Two suppliers, each answering with ``count`` offers
+        per_offer = stage_results["combine"]["ms"] * 1000 / (2 * int(count))
+        if per_offer > COMBINE_BUDGET_US_PER_OFFER:
+            print(
+                f"combine at {count} offers: {per_offer:.1f} us/offer"
+                f" exceeds {COMBINE_BUDGET_US_PER_OFFER} us/offer"
+            )
+            ok = False
+    return ok
+
+
+def compare(results, baseline, max_regression):
+    ok = True
+    for count, stage_results in results.items():
+        for stage, current in stage_results.items():
+            previous = baseline.get(count, {}).get(stage)
+            if previous is None:
+                continue
+            for metric in ("ms", "peak_kib"):
+                if previous[metric] and current[metric] > previous[metric] * (
+                    1 + max_regression
+                ):
+                    change = current[metric] / previous[metric] - 1
+                    print(
+                        f"{stage} at {count} offers: {metric}"
+                        f" {previous[metric]} -> {current[metric]}"
+                        f" ({change:+.0%})"
+                    )
+                    ok = False
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--offers",
+        type=int,
+        nargs="+",
+        default=DEFAULT_OFFER_COUNTS,
+    )
+    parser.add_argument(
+        "--segments", type=int, default=2, help="segments per itinerary"
+    )
+    parser.add_argument(
+        "--duplicates",
+        type=float,
+        default=0.3,
+        help="share of itineraries offered by both suppliers",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--output",
+        help="write results as JSON, e.g. to use as a --compare baseline",
+    )
+    parser.add_argument("--compare", help="results JSON from a previous run")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="enforce the absolute combine budget",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.offers, args.segments, args.repeat, args.duplicates)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    ok = True
+    if args.check:
+        ok = check_budget(results) and ok
+    if args.compare:
+        with open(args.compare) as f:
+            ok = compare(results, json.load(f), args.max_regression) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Benchmark of the hotel availability index against a local stand-in hotel API.
+
+Measures, for a given inventory size:
+  build        - index build from already-fetched inventory (CPU only)
+  full refresh - paged inventory download plus build, as on the first refresh
+                 of a day
+  incremental  - refresh applying changes to --changed of the hotels
+  query        - date-range availability query on the index alone
+  indexed      - search_available_hotels: index query plus one live re-pricing
+                 call
+  live         - the supplier's own /hotels/search, what every search cost
+                 before
+
+Usage: python -m benchmarks.bench_hotel_index [--hotels 2000] [--days 180]
+           [--changed 0.05] [--latency lognormal:300:0.5] [--searches 50]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+import httpx
+
+from benchmarks import fake_suppliers, payloads
+from services.hotel_service import availability_index
+from shared.api_client import AsyncAPIClient
+from shared.auth.oauth2_client import OAuth2Client
+
+STAY_PARAMS = ("location", "check_in", "check_out")
+
+
+def random_stays(count, days, seed=0):
+    rng = random.Random(seed)
+    today = date.today()
+    stays = []
+    for _ in range(count):
+        check_in = today + timedelta(days=rng.randrange(0, days - 14))
+        stays.append(
+            (
+                rng.choice(payloads.AIRPORTS),
+                check_in.isoformat(),
+                (check_in + timedelta(days=rng.randrange(1, 14))).isoformat(),
+            )
+        )
+    return stays
+
+
+def median_ms(samples):
+    return statistics.median(samples) * 1000
+
+
+def elapsed_ms(started):
+    return (time.perf_counter() - started) * 1000
+
+
+async def run(args):
+    hotels = payloads.generate_hotel_inventory(args.hotels, args.days)
+    changes = payloads.change_hotel_inventory(hotels, args.changed, args.days)
+    hotels_per_location = args.hotels // len(payloads.AIRPORTS)
+    search = fake_suppliers.FakeSupplier(
+        fake_suppliers.fake_hotel_search_body(hotels_per_location),
+        args.latency,
+    )
+    server = fake_suppliers.ServerThread(
+        fake_suppliers.create_hotel_app(hotels, changes, search)
+    ).start()
+    base_url = f"http://127.0.0.1:{server.port}"
+    stays = random_stays(args.searches, args.days)
+    try:
+        async with httpx.AsyncClient(timeout=60) as http_client:
+            client = AsyncAPIClient(
+                base_url,
+                OAuth2Client("bench", "bench", f"{base_url}/oauth/token"),
+                http_client=http_client,
+            )
+
+            index = availability_index.HotelAvailabilityIndex(
+                client, horizon_days=args.days
+            )
+            started = time.perf_counter()
+            index._apply({}, {}, hotels, date.today())
+            print(
+                f"build         {elapsed_ms(started):>10.1f} ms"
+                f"  ({args.hotels} hotels)"
+            )
+
+            started = time.perf_counter()
+            assert await index.refresh()
+            print(f"full refresh  {elapsed_ms(started):>10.1f} ms")
+
+            started = time.perf_counter()
+            assert await index.refresh()
+            print(
+                f"incremental   {elapsed_ms(started):>10.1f} ms"
+                f"  ({len(changes)} hotels changed)"
+            )
+
+            samples = []
+            matches = 0
+            for location, check_in, check_out in stays:
+                started = time.perf_counter()
+                matches += len(index.query(location, check_in, check_out))
+                samples.append(time.perf_counter() - started)
+            print(
+                f"query         {median_ms(samples):>10.3f} ms  median,"
+                f" {matches / len(stays):.0f} matches per stay"
+            )
+
+            for name, search_once in (
+                (
+                    "indexed",
+                    lambda stay: availability_index.search_available_hotels(
+                        *stay, index=index
+                    ),
+                ),
+                (
+                    "live",
+                    lambda stay: client.get(
+                        "/hotels/search",
+                        params=dict(zip(STAY_PARAMS, stay)),
+                    ),
+                ),
+            ):
+                samples = []
+                for stay in stays:
+                    started = time.perf_counter()
+                    await search_once(stay)
+                    samples.append(time.perf_counter() - started)
+                print(f"{name:<13} {median_ms(samples):>10.1f} ms  median")
+    finally:
+        server.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--hotels", type=int, default=2000)
+    parser.add_argument(
+        "--days", type=int, default=180, help="nights of inventory per hotel"
+    )
+    parser.add_argument(
+        "--changed",
+        type=float,
+        default=0.05,
+        help="share of hotels changed between refreshes",
+    )
+    parser.add_argument(
+        "--latency",
+        default="lognormal:300:0.5",
+        help="stand-in latency of live calls",
+    )
+    parser.add_argument("--searches", type=int, default=50)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
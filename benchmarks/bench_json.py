@@ -0,0 +1,80 @@
+"""
+Compare the stdlib JSON path with shared.fast_json on search-sized payloads.
+
+Measures three stages of serving a search:
+  decode   - supplier response bytes -> dicts (response.json() vs
+             fast_json.loads)
+  encode   - combined results -> response body (json.dumps vs fast_json.dumps)
+  cached   - serving a cache hit (decode + re-encode vs sending stored bytes)
+
+Usage: python -m benchmarks.bench_json [--offers 10 1000 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import timeit
+
+from benchmarks import payloads
+from services.flight_service.result_combiner import combine_results
+from shared import fast_json
+
+
+def best_of(func, repeat, number):
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def run(offer_counts, repeat):
+    print(f"orjson available: {fast_json.orjson is not None}")
+    print(
+        f"{'offers':>8} {'stage':<8} {'stdlib ms':>10} {'fast ms':>10}"
+        f" {'speedup':>8}"
+    )
+    for count in offer_counts:
+        flyhub = payloads.generate_flyhub_response(count)
+        bdfare = payloads.generate_bdfare_response(count)
+        supplier_body = json.dumps(bdfare).encode()
+        response = {
+            "results": combine_results(flyhub, bdfare),
+            "suppliers": {},
+        }
+        cached_body = fast_json.dumps(response)
+        number = max(1, 2000 // count)
+
+        stages = {
+            "decode": (
+                lambda: json.loads(supplier_body.decode()),
+                lambda: fast_json.loads(supplier_body),
+            ),
+            "encode": (
+                lambda: json.dumps(response).encode(),
+                lambda: fast_json.dumps(response),
+            ),
+            "cached": (
+                lambda: json.dumps(json.loads(cached_body)).encode(),
+                lambda: bytes(cached_body),
+            ),
+        }
+        for stage, (baseline, fast) in stages.items():
+            baseline_time = best_of(baseline, repeat, number)
+            fast_time = best_of(fast, repeat, number)
+            print(
+                f"{count:>8} {stage:<8} {baseline_time * 1000:>10.3f}"
+                f" {fast_time * 1000:>10.3f}"
+                f" {baseline_time / fast_time:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--offers",
+        type=int,
+        nargs="+",
+        default=[10, 1000, 10000],
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.offers, args.repeat)
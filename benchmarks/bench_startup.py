@@ -0,0 +1,128 @@
+"""
+Startup benchmark: how long importing the app takes, and which modules it goes
+to.
+
+Imports main in fresh interpreters with ``python -X importtime`` and reports
+the total import time (best of --repeat runs) and the slowest modules by
+cumulative import time. First-party modules (main, shared.*, services.*) are
+listed separately, since those are the ones we can make lazier.
+
+--services sets ENABLED_SERVICES for the run, to compare a single-service
+deployment with the full gateway.
+
+Usage: python -m benchmarks.bench_startup [--repeat 5] [--top 15]
+           [--services flights,hotels] [--max-import-ms 0]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+FIRST_PARTY = ("main", "shared", "services")
+# "import time: self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_times(services: Optional[str]) -> Dict[str, Dict[str, int]]:
+    """
+    Self and cumulative import time in microseconds of every module imported
+    by main.
+    """
+    env = dict(os.environ)
+    if services is not None:
+        env["ENABLED_SERVICES"] = services
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in process.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append(
+                (
+                    module,
+                    {
+                        "self": int(self_us),
+                        "cumulative": int(cumulative_us),
+                        "depth": (len(indent) - 1) // 2,
+                    },
+                )
+            )
+    # A module is reported after everything it imported, so main's imports
+    # are the nested lines just before it
+    end = [module for module, _ in entries].index("main") + 1
+    start = end - 1
+    while start > 0 and entries[start - 1][1]["depth"] > 0:
+        start -= 1
+    return dict(entries[start:end])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument(
+        "--services",
+        help="ENABLED_SERVICES for the run (default: as in the environment)",
+    )
+    parser.add_argument(
+        "--max-import-ms",
+        type=float,
+        default=0,
+        help="fail if importing main takes longer",
+    )
+    args = parser.parse_args(argv)
+
+    runs = [import_times(args.services) for _ in range(args.repeat)]
+    best = min(runs, key=lambda times: times["main"]["cumulative"])
+    total_ms = best["main"]["cumulative"] / 1000
+    print(
+        f"import main: {total_ms:.1f} ms (best of {args.repeat}),"
+        f" {len(best)} modules"
+    )
+
+    print("\nSlowest direct imports of main (cumulative ms):")
+    top_level = sorted(
+        ((module, t) for module, t in best.items() if t["depth"] == 1),
+        key=lambda item: -item[1]["cumulative"],
+    )
+    for module, t in top_level[: args.top]:
+        print(f"  {t['cumulative'] / 1000:>8.1f}  {module}")
+
+    print("\nFirst-party modules (self / cumulative ms):")
+    first_party = sorted(
+        (
+            (module, t)
+            for module, t in best.items()
+            if module.split(".")[0] in FIRST_PARTY
+        ),
+        key=lambda item: -item[1]["cumulative"],
+    )
+    for module, t in first_party:
+        self_ms, cumulative_ms = t["self"] / 1000, t["cumulative"] / 1000
+        print(f"  {self_ms:>8.1f} {cumulative_ms:>8.1f}  {module}")
+
+    if args.max_import_ms and total_ms > args.max_import_ms:
+        print(
+            f"\nImporting main took {total_ms:.1f} ms,"
+            f" over the {args.max_import_ms} ms limit"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
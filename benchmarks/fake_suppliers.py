@@ -0,0 +1,321 @@
+"""
+Local stand-ins for the Flyhub and BDFare sandboxes and the hotel API, for
+load tests and benchmarks.
+
+Flyhub serves Authenticate and AirSearch, BDFare serves AirShopping. Responses
+are synthetic payloads from benchmarks.payloads, generated and serialized once
+up front so the fakes cost little CPU per request. Each supplier has its own
+latency distribution and error rate.
+
+Latency distributions are given as strings:
+  fixed:300            always 300 ms
+  uniform:100:500      uniformly between 100 and 500 ms
+  lognormal:300:0.5    median 300 ms, sigma 0.5 (a long right tail, like
+                       real suppliers)
+
+Usage: python -m benchmarks.fake_suppliers [--offers 200]
+           [--flyhub-latency lognormal:300:0.5]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+from typing import Callable, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+
+from benchmarks import payloads
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Turn a latency spec into a function returning a delay in seconds."""
+    kind, *args = spec.split(":")
+    values = [float(arg) for arg in args]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        median, sigma = values
+        return lambda rng: median * rng.lognormvariate(0, sigma) / 1000
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+class FakeSupplier:
+    """One fake supplier: canned JSON body, latency sampler and error rate."""
+
+    def __init__(
+        self,
+        body: bytes,
+        latency: str = "fixed:0",
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.body = body
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+
+    def stats(self):
+        return {"requests": self.requests, "errors": self.errors}
+
+    async def respond(self, body: Optional[bytes] = None) -> Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency(self.rng))
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            return Response(
+                b'{"error": "Service Unavailable"}',
+                status_code=503,
+                media_type="application/json",
+            )
+        return Response(
+            self.body if body is None else body, media_type="application/json"
+        )
+
+
+def create_flyhub_app(search: FakeSupplier) -> Starlette:
+    async def authenticate(request):
+        return Response(
+            json.dumps({"TokenId": "fake-flyhub-token"}),
+            media_type="application/json",
+        )
+
+    async def air_search(request):
+        await request.body()
+        return await search.respond()
+
+    return Starlette(
+        routes=[
+            Route("/api/v1/Authenticate", authenticate, methods=["POST"]),
+            Route("/api/v1/AirSearch", air_search, methods=["POST"]),
+        ]
+    )
+
+
+def create_bdfare_app(shopping: FakeSupplier) -> Starlette:
+    async def air_shopping(request):
+        await request.body()
+        return await shopping.respond()
+
+    return Starlette(
+        routes=[
+            Route(
+                "/api/enterprise/AirShopping",
+                air_shopping,
+                methods=["POST"],
+            ),
+        ]
+    )
+
+
+def create_hotel_app(
+    hotels: list, changes: list, search: FakeSupplier, page_size: int = 500
+) -> Starlette:
+    """
+    Hotel API serving what the hotel availability index uses: paged full
+    inventory, changes since a cursor, batched live rates and the live search.
+    """
+    page_count = max(1, -(-len(hotels) // page_size))
+    pages = []
+    for page in range(page_count):
+        start = page * page_size
+        stop = start + page_size
+        pages.append(
+            json.dumps(
+                {
+                    "hotels": hotels[start:stop],
+                    "cursor": "full",
+                    "next_page": page + 1 if page + 1 < page_count else None,
+                }
+            ).encode()
+        )
+    changes_body = json.dumps(
+        {"hotels": changes, "cursor": "changes", "next_page": None}
+    ).encode()
+
+    async def token(request):
+        return Response(
+            json.dumps(
+                {
+                    "access_token": "fake-hotel-token",
+                    "expires_in": 3600,
+                }
+            ),
+            media_type="application/json",
+        )
+
+    async def inventory(request):
+        if request.query_params.get("updated_since"):
+            return Response(changes_body, media_type="application/json")
+        return Response(
+            pages[int(request.query_params.get("page", 0))],
+            media_type="application/json",
+        )
+
+    async def rates(request):
+        hotel_ids = (await request.json())["hotel_ids"]
+        body = json.dumps(
+            {
+                "rates": {
+                    hotel_id: {"available": True, "total": 100.0}
+                    for hotel_id in hotel_ids
+                }
+            }
+        )
+        return await search.respond(body.encode())
+
+    async def hotel_search(request):
+        return await search.respond()
+
+    return Starlette(
+        routes=[
+            Route("/oauth/token", token, methods=["POST"]),
+            Route("/hotels/inventory", inventory, methods=["GET"]),
+            Route("/hotels/rates", rates, methods=["POST"]),
+            Route("/hotels/search", hotel_search, methods=["GET"]),
+        ]
+    )
+
+
+def fake_hotel_search_body(hotel_count: int) -> bytes:
+    return json.dumps(
+        {
+            "hotels": [
+                {
+                    "hotel_id": f"H-{i}",
+                    "name": f"Hotel {i}",
+                    "location": payloads.AIRPORTS[i % len(payloads.AIRPORTS)],
+                    "total": 100.0,
+                }
+                for i in range(hotel_count)
+            ]
+        }
+    ).encode()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ServerThread:
+    """Runs an ASGI app under uvicorn on a background thread."""
+
+    def __init__(self, app, port: Optional[int] = None):
+        self.port = port or free_port()
+        self.server = uvicorn.Server(
+            uvicorn.Config(
+                app,
+                host="127.0.0.1",
+                port=self.port,
+                log_level="warning",
+                access_log=False,
+            )
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError(
+                    f"Fake supplier on port {self.port} did not start",
+                )
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+class FakeSuppliers:
+    """
+    Both fake suppliers, with the environment that points the flight service
+    at them.
+    """
+
+    def __init__(
+        self,
+        offers: int = 200,
+        flyhub_latency: str = "lognormal:300:0.5",
+        bdfare_latency: str = "lognormal:400:0.6",
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        flyhub = payloads.generate_flyhub_response(offers, seed=seed)
+        bdfare = payloads.generate_bdfare_response(offers, seed=seed)
+        self.flyhub = FakeSupplier(
+            json.dumps(flyhub).encode(),
+            flyhub_latency,
+            error_rate,
+            seed,
+        )
+        self.bdfare = FakeSupplier(
+            json.dumps(bdfare).encode(),
+            bdfare_latency,
+            error_rate,
+            seed + 1,
+        )
+        self._servers = [
+            ServerThread(create_flyhub_app(self.flyhub)),
+            ServerThread(create_bdfare_app(self.bdfare)),
+        ]
+
+    def start(self):
+        for server in self._servers:
+            server.start()
+        return self
+
+    def stop(self):
+        for server in self._servers:
+            server.stop()
+
+    @property
+    def env(self):
+        flyhub, bdfare = self._servers
+        return {
+            "FLYHUB_API_URL": f"{flyhub.url}/api/v1/",
+            "BDFARE_API_URL": f"{bdfare.url}/api/enterprise/",
+        }
+
+    def stats(self):
+        return {"flyhub": self.flyhub.stats(), "bdfare": self.bdfare.stats()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--offers", type=int, default=200)
+    parser.add_argument("--flyhub-latency", default="lognormal:300:0.5")
+    parser.add_argument("--bdfare-latency", default="lognormal:400:0.6")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    suppliers = FakeSuppliers(
+        args.offers, args.flyhub_latency, args.bdfare_latency, args.error_rate
+    ).start()
+    for name, value in suppliers.env.items():
+        print(f"{name}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        suppliers.stop()
@@ -0,0 +1,368 @@
+"""
+End-to-end load test of POST /api/v1/flights/search against local fake
+suppliers.
+
+Starts the fake Flyhub and BDFare servers (benchmarks.fake_suppliers), runs
+main:app under uvicorn in a child process pointed at them, and drives it with
+a fixed number of concurrent clients. Reports throughput, latency percentiles,
+error rate and the app process's CPU and memory use.
+
+Results are written as JSON (one file per run) so runs can be compared;
+--compare exits non-zero when throughput or tail latency regressed by more
+than --max-regression against a previous result.
+
+Usage:
+  python -m benchmarks.load_test [--concurrency 50] [--duration 30]
+      [--offers 200] [--distinct-searches 0]
+      [--flyhub-latency lognormal:300:0.5] [--error-rate 0.01]
+      [--output benchmarks/results/run.json]
+      [--compare benchmarks/results/baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.fake_suppliers import FakeSuppliers, free_port
+from benchmarks.payloads import AIRPORTS
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+SEARCH_PATH = "/api/v1/flights/search"
+# Metrics compared between runs, and whether higher is better
+COMPARED_METRICS = {
+    "rps": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+}
+# Error rates near zero make relative changes meaningless, so they are
+# compared in absolute terms
+ERROR_RATE_TOLERANCE = 0.01
+
+
+def search_params(index: int) -> Dict[str, Any]:
+    """
+    The index-th distinct search: cycles through departure dates, then
+    routes.
+    """
+    routes = [
+        (origin, destination)
+        for origin in AIRPORTS
+        for destination in AIRPORTS
+        if origin != destination
+    ]
+    origin, destination = routes[(index // 300) % len(routes)]
+    departure = date.today() + timedelta(days=1 + index % 300)
+    return {
+        "segments": [
+            {
+                "origin": origin,
+                "destination": destination,
+                "departure_date": departure.isoformat(),
+            }
+        ],
+        "adult_count": 1 + index // (300 * len(routes)),
+        "cabin_class": "economy",
+        "trip_type": "one_way",
+    }
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    last = len(sorted_values) - 1
+    return sorted_values[min(int(round(p * last)), last)]
+
+
+class ProcessMonitor:
+    """CPU time and memory of a child process, read from /proc (Linux only)."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        sysconf = getattr(os, "sysconf", None)
+        self.ticks = sysconf("SC_CLK_TCK") if sysconf else 100
+
+    def cpu_seconds(self) -> Optional[float]:
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            # utime and stime, fields 14 and 15 of /proc/<pid>/stat
+            return (int(fields[11]) + int(fields[12])) / self.ticks
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def memory_mb(self) -> Dict[str, Optional[float]]:
+        memory = {"rss_mb": None, "peak_rss_mb": None}
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    name, _, value = line.partition(":")
+                    key = {"VmRSS": "rss_mb", "VmHWM": "peak_rss_mb"}.get(name)
+                    if key:
+                        memory[key] = round(int(value.split()[0]) / 1024, 1)
+        except OSError:
+            pass
+        return memory
+
+
+def start_app(port: int, env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        cwd=ROOT,
+        env={**os.environ, **env},
+    )
+
+
+async def wait_until_ready(
+    client: httpx.AsyncClient, process: subprocess.Popen, timeout: float = 30
+):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("The app exited during startup")
+        try:
+            await client.get("/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("The app did not start in time")
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    concurrency: int,
+    duration: float,
+    distinct_searches: int,
+    warmup: float,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    counter = iter(range(10**12))
+    measuring_from = time.monotonic() + warmup
+    stop_at = measuring_from + duration
+
+    async def worker():
+        while time.monotonic() < stop_at:
+            index = next(counter)
+            params = search_params(
+                index % distinct_searches if distinct_searches else index
+            )
+            started = time.monotonic()
+            try:
+                response = await client.post(SEARCH_PATH, json=params)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            if started >= measuring_from:
+                latencies.append(time.monotonic() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    latencies.sort()
+    requests = len(latencies)
+    errors = requests - statuses.get("200", 0)
+    return {
+        "requests": requests,
+        "rps": round(requests / duration, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "statuses": statuses,
+    }
+
+
+async def run_load_test(args) -> Dict[str, Any]:
+    suppliers = FakeSuppliers(
+        args.offers, args.flyhub_latency, args.bdfare_latency, args.error_rate
+    ).start()
+    port = free_port()
+    extra_env = dict(pair.split("=", 1) for pair in args.env)
+    process = start_app(port, {**suppliers.env, **extra_env})
+    limits = httpx.Limits(
+        max_connections=args.concurrency,
+        max_keepalive_connections=args.concurrency,
+    )
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60
+        ) as client:
+            await wait_until_ready(client, process)
+            monitor = ProcessMonitor(process.pid)
+            cpu_before, wall_before = monitor.cpu_seconds(), time.monotonic()
+            results = await drive(
+                client,
+                args.concurrency,
+                args.duration,
+                args.distinct_searches,
+                args.warmup,
+            )
+            cpu_after, wall_after = monitor.cpu_seconds(), time.monotonic()
+            if cpu_before is not None and cpu_after is not None:
+                cpu_used = cpu_after - cpu_before
+                wall = wall_after - wall_before
+                results["cpu_percent"] = round(100 * cpu_used / wall, 1)
+            results.update(monitor.memory_mb())
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        suppliers.stop()
+    results["suppliers"] = suppliers.stats()
+    return results
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float
+) -> bool:
+    """
+    Print the change of each compared metric; False if any regressed beyond
+    max_regression.
+    """
+    ok = True
+    print(f"\n{'metric':<12} {'baseline':>10} {'current':>10} {'change':>8}")
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        before = baseline["results"].get(metric)
+        after = current["results"].get(metric)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before if before else 0.0
+        regressed = (
+            (change < -max_regression)
+            if higher_is_better
+            else (change > max_regression)
+        )
+        ok = ok and not regressed
+        flag = "  REGRESSED" if regressed else ""
+        print(f"{metric:<12} {before:>10} {after:>10} {change:>+7.1%}{flag}")
+
+    before = baseline["results"]["error_rate"]
+    after = current["results"]["error_rate"]
+    regressed = after - before > ERROR_RATE_TOLERANCE
+    ok = ok and not regressed
+    flag = "  REGRESSED" if regressed else ""
+    delta = after - before
+    print(
+        f"{'error_rate':<12} {before:>10} {after:>10} {delta:>+7.2%}{flag}",
+    )
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=30,
+        help="measured seconds",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=5,
+        help="seconds of load before measuring",
+    )
+    parser.add_argument(
+        "--offers", type=int, default=200, help="offers per supplier response"
+    )
+    parser.add_argument(
+        "--distinct-searches",
+        type=int,
+        default=0,
+        help="cycle through this many searches (0: every search is different)",
+    )
+    parser.add_argument("--flyhub-latency", default="lognormal:300:0.5")
+    parser.add_argument("--bdfare-latency", default="lognormal:400:0.6")
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="share of supplier calls answering 503",
+    )
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="extra environment for the app, e.g. FLIGHT_HEDGED_ENDPOINTS=",
+    )
+    parser.add_argument(
+        "--output",
+        help="result file (default: benchmarks/results/<timestamp>.json)",
+    )
+    parser.add_argument(
+        "--compare",
+        help="previous result file to compare against",
+    )
+    parser.add_argument("--max-regression", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run_load_test(args))
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "config": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "compare")
+        },
+        "results": results,
+    }
+    print(json.dumps(record, indent=2))
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(record, f, indent=2)
+    print(f"\nSaved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["config"] != record["config"]:
+            print(
+                "Warning: the baseline was run with a different configuration",
+            )
+        if not compare(record, baseline, args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
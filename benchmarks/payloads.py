@@ -0,0 +1,237 @@
+"""
+Synthetic Flyhub and BDFare search responses and hotel inventory for
+benchmarks and load tests.
+
+Payloads follow the shape of the real AirSearch / AirShopping responses that
+result_combiner consumes, with multi-segment itineraries and a configurable
+number of offers. A ``duplicates`` share of offer slots carries the same
+itinerary and refundability in both suppliers' responses (at different
+fares), as happens when they sell the same flights. Hotel inventory follows
+the contract of the hotel availability index. Generation is seeded, so the
+same arguments always produce the same payload.
+"""
+
+import random
+from datetime import date, datetime, timedelta
+
+AIRPORTS = [
+    "DAC",
+    "CGP",
+    "ZYL",
+    "CXB",
+    "JSR",
+    "DXB",
+    "DOH",
+    "KUL",
+    "SIN",
+    "BKK",
+    "CCU",
+    "DEL",
+    "IST",
+    "LHR",
+    "JED",
+]
+AIRLINES = [
+    ("BG", "Biman Bangladesh Airlines"),
+    ("BS", "US-Bangla Airlines"),
+    ("VQ", "Novoair"),
+    ("EK", "Emirates"),
+    ("QR", "Qatar Airways"),
+    ("SQ", "Singapore Airlines"),
+    ("MH", "Malaysia Airlines"),
+    ("TK", "Turkish Airlines"),
+    ("AI", "Air India"),
+    ("6E", "IndiGo"),
+]
+BASE_DEPARTURE = datetime(2026, 12, 20, 6, 0)
+
+
+def _itinerary(rng, segment_count):
+    route = rng.sample(AIRPORTS, segment_count + 1)
+    departure = BASE_DEPARTURE + timedelta(minutes=5 * rng.randrange(0, 288))
+    segments = []
+    for origin, destination in zip(route, route[1:]):
+        code, name = rng.choice(AIRLINES)
+        duration = rng.randrange(45, 600)
+        arrival = departure + timedelta(minutes=duration)
+        segments.append(
+            {
+                "origin": origin,
+                "destination": destination,
+                "airline_code": code,
+                "airline_name": name,
+                "flight_number": str(rng.randrange(1, 9999)),
+                "departure": departure.isoformat(),
+                "arrival": arrival.isoformat(),
+                "duration": duration,
+            }
+        )
+        departure = arrival + timedelta(minutes=rng.randrange(60, 360))
+    return segments
+
+
+def _offer_itinerary(rng, i, segments_per_offer, seed, duplicates):
+    """
+    (segments, refundable) for offer slot ``i``; duplicated slots come out
+    the same for both suppliers.
+    """
+    shared = random.Random(f"{seed}:{i}")
+    if shared.random() < duplicates:
+        return _itinerary(shared, segments_per_offer), shared.random() < 0.4
+    return _itinerary(rng, segments_per_offer), rng.random() < 0.4
+
+
+def generate_flyhub_response(
+    offer_count,
+    segments_per_offer=2,
+    seed=0,
+    duplicates=0.0,
+):
+    rng = random.Random(seed)
+    results = []
+    for i in range(offer_count):
+        segments, refundable = _offer_itinerary(
+            rng, i, segments_per_offer, seed, duplicates
+        )
+        results.append(
+            {
+                "ResultID": f"FH-{seed}-{i}",
+                "IsRefundable": refundable,
+                "TotalFare": rng.randrange(8000, 250000),
+                "Currency": "BDT",
+                "Segments": [
+                    {
+                        "Origin": {"AirportCode": segment["origin"]},
+                        "Destination": {"AirportCode": segment["destination"]},
+                        "Airline": {
+                            "AirlineName": segment["airline_name"],
+                            "AirlineCode": segment["airline_code"],
+                        },
+                        "FlightNumber": segment["flight_number"],
+                        "DepartureDateTime": segment["departure"],
+                        "ArrivalDateTime": segment["arrival"],
+                        "Duration": str(segment["duration"]),
+                        "Baggage": rng.choice(["20K", "25K", "30K", "2P"]),
+                    }
+                    for segment in segments
+                ],
+            }
+        )
+    return {"SearchId": f"FH-SEARCH-{seed}", "Results": results}
+
+
+def _bdfare_pax_segment(segment):
+    return {
+        "paxSegment": {
+            "departure": {
+                "iatA_LocationCode": segment["origin"],
+                "aircraftScheduledDateTime": segment["departure"],
+            },
+            "arrival": {
+                "iatA_LocationCode": segment["destination"],
+                "aircraftScheduledDateTime": segment["arrival"],
+            },
+            "marketingCarrierInfo": {
+                "carrierDesigCode": segment["airline_code"],
+                "carrierName": segment["airline_name"],
+            },
+            "flightNumber": segment["flight_number"],
+            "duration": str(segment["duration"]),
+        }
+    }
+
+
+def generate_bdfare_response(
+    offer_count,
+    segments_per_offer=2,
+    seed=0,
+    duplicates=0.0,
+):
+    rng = random.Random(seed + 1)
+    offers = []
+    for i in range(offer_count):
+        segments, refundable = _offer_itinerary(
+            rng, i, segments_per_offer, seed, duplicates
+        )
+        offers.append(
+            {
+                "offer": {
+                    "offerId": f"BD-{seed}-{i}",
+                    "refundable": refundable,
+                    "price": {
+                        "totalPayable": {
+                            "total": rng.randrange(8000, 250000),
+                            "currency": "BDT",
+                        }
+                    },
+                    "baggageAllowanceList": [
+                        {
+                            "departure": segment["origin"],
+                            "arrival": segment["destination"],
+                            "checkIn": [
+                                {
+                                    "paxType": "ADT",
+                                    "allowance": rng.choice(
+                                        ["20 KG", "25 KG", "30 KG"]
+                                    ),
+                                }
+                            ],
+                            "cabin": [{"paxType": "ADT", "allowance": "7 KG"}],
+                        }
+                        for segment in segments
+                    ],
+                    "paxSegmentList": [
+                        _bdfare_pax_segment(segment) for segment in segments
+                    ],
+                }
+            }
+        )
+    return {"response": {"traceId": f"BD-TRACE-{seed}", "offersGroup": offers}}
+
+
+def _hotel_calendar(rng, start, days):
+    calendar = {}
+    base_rate = rng.randrange(40, 400)
+    for offset in range(days):
+        calendar[(start + timedelta(days=offset)).isoformat()] = {
+            "available": 0 if rng.random() < 0.15 else rng.randrange(1, 20),
+            "rate": round(base_rate * rng.uniform(0.8, 1.5), 2),
+        }
+    return calendar
+
+
+def generate_hotel_inventory(hotel_count, days=180, seed=0, start=None):
+    """
+    Hotels spread over AIRPORTS' cities, each with a nightly calendar of
+    ``days`` nights from ``start``.
+    """
+    rng = random.Random(seed)
+    start = start or date.today()
+    return [
+        {
+            "hotel_id": f"H-{i}",
+            "name": f"Hotel {i}",
+            "location": AIRPORTS[i % len(AIRPORTS)],
+            "calendar": _hotel_calendar(rng, start, days),
+        }
+        for i in range(hotel_count)
+    ]
+
+
+def change_hotel_inventory(hotels, fraction, days=180, seed=0, start=None):
+    """
+    Incremental updates for ``fraction`` of ``hotels``: a few changed nights
+    each.
+    """
+    rng = random.Random(seed)
+    start = start or date.today()
+    changes = []
+    for hotel in rng.sample(hotels, int(len(hotels) * fraction)):
+        nights = {}
+        for offset in rng.sample(range(days), 5):
+            nights[(start + timedelta(days=offset)).isoformat()] = {
+                "available": rng.randrange(0, 20),
+                "rate": round(rng.uniform(40, 600), 2),
+            }
+        changes.append({"hotel_id": hotel["hotel_id"], "calendar": nights})
+    return changes
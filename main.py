@@ -1,24 +1,156 @@
-from fastapi import FastAPI
-from services.flight_service.flight_service import router as flight_router
-from services.hotel_service.hotel_service import router as hotel_router
-from services.holiday_service.holiday_service import router as holiday_router
-from services.car_service.car_service import router as car_router
-from services.bus_service.bus_service import router as bus_router
-from services.train_service.train_service import router as train_router
-from services.event_service.event_service import router as event_router
-from services.insurance_service.insurance_service import router as insurance_router
-
-app = FastAPI()
-
-app.include_router(flight_router, prefix="/api/v1/flights")
-app.include_router(hotel_router, prefix="/api/v1/hotels")
-app.include_router(holiday_router, prefix="/api/v1/holidays")
-app.include_router(car_router, prefix="/api/v1/cars")
-app.include_router(bus_router, prefix="/api/v1/buses")
-app.include_router(train_router, prefix="/api/v1/trains")
-app.include_router(event_router, prefix="/api/v1/events")
-app.include_router(insurance_router, prefix="/api/v1/insurance")
+import importlib
+import math
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from shared.circuit_breaker import circuit_breakers
+from shared.config import CLIENT_API_KEYS, CLIENT_RATE_LIMIT, CLIENT_RATE_LIMIT_BURST, ENABLED_SERVICES
+from shared.exceptions import RateLimitExceeded
+from shared.hedging import default_hedge_policy
+from shared.http_clients import http_clients
+from shared.metrics import PrometheusMiddleware, register_stats, render_metrics
+from shared.rate_limiter import RateLimiter, create_bucket_store
+from shared.response import FastJSONResponse, error_response
+from shared.secrets_manager import secrets_provider
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pooled supplier clients live for the whole application and are closed on shutdown
+    app.state.http_clients = http_clients
+    for service in background_services:
+        service.start()
+    yield
+    for service in background_services:
+        await service.stop()
+    await http_clients.aclose()
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+client_rate_limiter = None
+if CLIENT_RATE_LIMIT > 0:
+    client_rate_limiter = RateLimiter(CLIENT_RATE_LIMIT, 1, burst=CLIENT_RATE_LIMIT_BURST, store=create_bucket_store(),
+                                      name="client")
+
+def client_identity(request: Request) -> str:
+    """Who a request is limited as: its API key if it is one we issued, otherwise its IP address."""
+    api_key = request.headers.get("API-Key")
+    if api_key and api_key in CLIENT_API_KEYS:
+        return f"key:{api_key}"
+    # An unknown key is not an identity: rotating it must not buy a fresh bucket
+    return f"ip:{request.client.host if request.client else 'anonymous'}"
+
+@app.middleware("http")
+async def rate_limit_clients(request: Request, call_next):
+    if client_rate_limiter is not None:
+        try:
+            await client_rate_limiter.aacquire(f"client:{client_identity(request)}")
+        except RateLimitExceeded as e:
+            return FastJSONResponse(
+                status_code=429,
+                content=error_response(str(e)),
+                headers={"Retry-After": str(math.ceil(e.retry_after))}
+            )
+    return await call_next(request)
+
+# Router modules by service; only those in ENABLED_SERVICES (default: all) are imported and mounted
+SERVICE_MODULES = {
+    "flights": "services.flight_service.flight_service",
+    "hotels": "services.hotel_service.hotel_service",
+    "holidays": "services.holiday_service.holiday_service",
+    "cars": "services.car_service.car_service",
+    "buses": "services.bus_service.bus_service",
+    "trains": "services.train_service.train_service",
+    "events": "services.event_service.event_service",
+    "insurance": "services.insurance_service.insurance_service",
+    "bundles": "services.bundle_service.bundle_service",
+}
+unknown_services = set(ENABLED_SERVICES) - set(SERVICE_MODULES)
+if unknown_services:
+    raise ValueError(f"Unknown services in ENABLED_SERVICES: {', '.join(sorted(unknown_services))}")
+
+SERVICE_ROUTERS = {
+    f"/api/v1/{name}": importlib.import_module(module).router
+    for name, module in SERVICE_MODULES.items()
+    if not ENABLED_SERVICES or name in ENABLED_SERVICES
+}
+for prefix, service_router in SERVICE_ROUTERS.items():
+    app.include_router(service_router, prefix=prefix)
+
+# Per-service caches, coalescers and background refreshers, for the lifespan and stats endpoints
+caches = {}
+single_flights = {}
+background_services = []
+# Bundle searches go through the flight search cache too
+if "/api/v1/flights" in SERVICE_ROUTERS or "/api/v1/bundles" in SERVICE_ROUTERS:
+    from services.flight_service.flight_service import search_flights
+    from services.flight_service.search_cache import search_cache as flight_search_cache
+    caches["flight_search"] = flight_search_cache
+    single_flights["flight_search"] = search_flights
+if "/api/v1/flights" in SERVICE_ROUTERS:
+    from services.flight_service.offer_store import offer_store
+    from services.flight_service.result_index import result_indexes
+    caches["flight_offers"] = offer_store
+    caches["flight_result_indexes"] = result_indexes
+# Bundle hotel sections are served from the same availability index
+if "/api/v1/hotels" in SERVICE_ROUTERS or "/api/v1/bundles" in SERVICE_ROUTERS:
+    from services.hotel_service.availability_index import hotel_index
+    background_services.append(hotel_index)
+    register_stats("travel_hotel_index", "index", lambda: {"hotels": hotel_index.stats()},
+                   "Local hotel availability index")
+if "/api/v1/bundles" in SERVICE_ROUTERS:
+    from services.bundle_service.bundle_search import product_caches, product_searches
+    caches.update((f"{product}_search", cache) for product, cache in product_caches.items())
+    single_flights.update((f"{product}_search", search) for product, search in product_searches.items())
+
+# Outermost, so rate-limited and failed requests are timed too
+app.add_middleware(PrometheusMiddleware, prefixes=[*SERVICE_ROUTERS, "/internal", "/metrics"])
+
+# Pool, breaker and cache state is read from the existing stats() at scrape time only
+register_stats("travel_http_pool", "origin", http_clients.stats, "Supplier connection pool usage")
+register_stats("travel_circuit_breaker", "upstream",
+               lambda: {upstream: {**stats, "open": stats["state"] == "open"}
+                        for upstream, stats in circuit_breakers.stats().items()},
+               "Circuit breaker state")
+register_stats("travel_hedging", "endpoint", default_hedge_policy.stats, "Hedged supplier requests")
+register_stats("travel_single_flight", "name",
+               lambda: {name: single_flight.stats() for name, single_flight in single_flights.items()},
+               "Coalesced identical searches")
+register_stats("travel_cache", "cache", lambda: {name: cache.stats() for name, cache in caches.items()},
+               "Response caches")
+register_stats("travel_secrets", "provider", lambda: {"default": secrets_provider.stats()}, "Cached secrets")
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to the Travel API"}
\ No newline at end of file
+    return {"message": "Welcome to the Travel API"}
+
+@app.get("/metrics")
+async def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/internal/http-pools")
+async def http_pool_stats():
+    return http_clients.stats()
+
+@app.get("/internal/caches")
+async def cache_stats():
+    return {name: cache.stats() for name, cache in caches.items()}
+
+@app.get("/internal/circuit-breakers")
+async def circuit_breaker_stats():
+    return circuit_breakers.stats()
+
+@app.get("/internal/hedging")
+async def hedging_stats():
+    return default_hedge_policy.stats()
+
+@app.get("/internal/single-flight")
+async def single_flight_stats():
+    return {name: single_flight.stats() for name, single_flight in single_flights.items()}
+
+@app.get("/internal/hotel-index")
+async def hotel_index_stats():
+    return hotel_index.stats() if "/api/v1/hotels" in SERVICE_ROUTERS else {}
+
+@app.get("/internal/secrets")
+async def secrets_stats():
+    return secrets_provider.stats()
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi import HTTPException
+
+from services.flight_service.flight_service import cached_flight_search
+from services.flight_service.reference_data import validate_flight_search
+from services.flight_service.search_cache import search_fingerprint
+from services.hotel_service.availability_index import parse_stay
+from shared import fast_json
+from shared.cache import CACHE_BACKEND, create_cache
+from shared.single_flight import SingleFlight
+
+# One deadline for the whole bundle; sections still running at it are reported as timeouts
+BUNDLE_SEARCH_DEADLINE = float(os.getenv("BUNDLE_SEARCH_DEADLINE", "10"))
+BUNDLE_CACHE_TTL = int(os.getenv("BUNDLE_CACHE_TTL", "300"))
+BUNDLE_CACHE_BACKEND = os.getenv("BUNDLE_CACHE_BACKEND", CACHE_BACKEND)
+BUNDLE_CACHE_MAX_ENTRIES = int(os.getenv("BUNDLE_CACHE_MAX_ENTRIES", "5000"))
+
+# Required search fields of each product in a bundle request, in the order the service's search takes them
+PRODUCT_FIELDS = {
+    "flights": (),
+    "hotels": ("location", "check_in", "check_out"),
+    "cars": ("location", "pickup_date", "return_date"),
+    "insurance": ("trip", "travelers"),
+}
+
+# Flights have their own search cache; the other products' results are cached here
+product_caches = {
+    product: create_cache(
+        BUNDLE_CACHE_BACKEND,
+        prefix=f"travel:{product}:search:",
+        max_entries=BUNDLE_CACHE_MAX_ENTRIES,
+    )
+    for product in ("hotels", "cars", "insurance")
+}
+product_searches = {product: SingleFlight() for product in product_caches}
+
+
+def _product_search(product: str) -> Callable[..., Awaitable[Dict[str, Any]]]:
+    # Imported on first use: the supplier API clients pull in requests, which is slow to import
+    if product == "hotels":
+        # Served from the local availability index when it is loaded
+        from services.hotel_service import availability_index
+
+        return availability_index.search_available_hotels
+    if product == "cars":
+        from services.car_service.api import search_cars
+
+        return search_cars
+    from services.insurance_service.api import get_insurance_quotes
+
+    return get_insurance_quotes
+
+
+def product_fingerprint(params: Dict[str, Any]) -> str:
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+async def cached_product_search(product: str, params: Dict[str, Any]) -> Any:
+    """A product's search results, from its cache or its service; raises 502 if the service failed."""
+    cache = product_caches[product]
+    cache_key = product_fingerprint(params)
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    async def search_and_cache():
+        response = await _product_search(product)(
+            *(params[field] for field in PRODUCT_FIELDS[product])
+        )
+        if response.get("status") != "success":
+            raise HTTPException(
+                status_code=502,
+                detail="; ".join(response.get("errors") or ["search failed"]),
+            )
+        await cache.set(cache_key, response["data"], BUNDLE_CACHE_TTL)
+        return response["data"]
+
+    return await product_searches[product].do(cache_key, search_and_cache)
+
+
+def validate_bundle(bundle: Dict[str, Any]):
+    """Reject unknown products and missing search fields before any section is searched."""
+    if not bundle:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Request at least one of: {', '.join(PRODUCT_FIELDS)}",
+        )
+    unknown = set(bundle) - set(PRODUCT_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown products: {', '.join(sorted(unknown))}"
+        )
+
+    for product, params in bundle.items():
+        if not isinstance(params, dict):
+            raise HTTPException(
+                status_code=400,
+                detail=f"{product}: search parameters must be an object",
+            )
+        missing = [field for field in PRODUCT_FIELDS[product] if field not in params]
+        if missing:
+            raise HTTPException(
+                status_code=400, detail=f"{product}: missing {', '.join(missing)}"
+            )
+    if "flights" in bundle:
+        try:
+            validate_flight_search(bundle["flights"])
+            search_fingerprint(bundle["flights"])
+        except (KeyError, TypeError, AttributeError) as e:
+            raise HTTPException(
+                status_code=400, detail=f"flights: invalid search ({e!r})"
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"flights: {e}")
+    if "hotels" in bundle:
+        try:
+            parse_stay(bundle["hotels"]["check_in"], bundle["hotels"]["check_out"])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"hotels: {e}")
+
+
+def section_calls(bundle: Dict[str, Any]) -> Dict[str, Callable[[], Awaitable[Any]]]:
+    """One call per requested product, for running concurrently as a search fan-out."""
+    calls = {}
+    for product, params in bundle.items():
+        if product == "flights":
+
+            async def call(params=params):
+                return fast_json.loads(await cached_flight_search(params))
+
+        else:
+
+            async def call(product=product, params=params):
+                return await cached_product_search(product, params)
+
+        calls[product] = call
+    return calls
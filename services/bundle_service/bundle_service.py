@@ -0,0 +1,74 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from services.flight_service import supplier_search
+from shared.response import STREAM_MEDIA_TYPES, encode_stream_frame
+
+from . import bundle_search as bundles
+
+router = APIRouter()
+
+
+@router.post("/search")
+async def bundle_search(bundle: dict):
+    """
+    Search flights, hotels, cars and insurance for one trip concurrently.
+
+    The request has one object per wanted product, holding that product's
+    search parameters. Every section is bounded by a single deadline; a
+    section that fails or runs out of time is reported in "sections" without
+    discarding the others.
+    """
+    bundles.validate_bundle(bundle)
+    calls = bundles.section_calls(bundle)
+    # Each product is run like a supplier in a flight search fan-out
+    results = await supplier_search.search_suppliers(
+        calls,
+        {name: bundles.BUNDLE_SEARCH_DEADLINE for name in calls},
+        bundles.BUNDLE_SEARCH_DEADLINE,
+    )
+    sections = {name: result.metadata() for name, result in results.items()}
+    if not any(result.ok for result in results.values()):
+        raise HTTPException(status_code=502, detail=sections)
+    return {
+        "results": {name: result.payload for name, result in results.items()},
+        "sections": sections,
+    }
+
+
+async def _stream_bundle(calls: dict, stream_format: str):
+    sections = {}
+    async for result in supplier_search.iter_supplier_results(
+        calls,
+        {name: bundles.BUNDLE_SEARCH_DEADLINE for name in calls},
+        bundles.BUNDLE_SEARCH_DEADLINE,
+    ):
+        sections[result.supplier] = result.metadata()
+        yield encode_stream_frame(
+            {
+                "type": "section",
+                "product": result.supplier,
+                "status": sections[result.supplier],
+                "results": result.payload,
+            },
+            stream_format,
+        )
+
+    yield encode_stream_frame({"type": "summary", "sections": sections}, stream_format)
+
+
+@router.post("/search/stream")
+async def bundle_search_stream(bundle: dict, format: str = "ndjson"):
+    """
+    Streaming variant of /search: one "section" frame per product as soon as
+    it completes, then a "summary" frame. Served as NDJSON or Server-Sent Events.
+    """
+    if format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400, detail=f"Unsupported stream format: {format}"
+        )
+    bundles.validate_bundle(bundle)
+    return StreamingResponse(
+        _stream_bundle(bundles.section_calls(bundle), format),
+        media_type=STREAM_MEDIA_TYPES[format],
+    )
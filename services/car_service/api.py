@@ -1,17 +1,18 @@
-from shared.api_client import APIClient
-from shared.auth import OAuth2Handler
+from shared.api_client import AsyncAPIClient
+from shared.auth.oauth2_client import OAuth2Client
+from shared.config import TOKEN_URL
 
-auth_handler = OAuth2Handler(client_id="car_rental_client_id", client_secret="car_rental_client_secret")
-car_rental_api = APIClient(base_url="https://car-rental-enterprise-api.com", auth_handler=auth_handler)
+oauth2_client = OAuth2Client(client_id="car_rental_client_id", client_secret="car_rental_client_secret", token_url=TOKEN_URL)
+car_rental_api = AsyncAPIClient(base_url="https://car-rental-enterprise-api.com", oauth2_client=oauth2_client)
 
-def search_cars(location: str, pickup_date: str, return_date: str):
-    return car_rental_api.get("/cars/search", params={"location": location, "pickup_date": pickup_date, "return_date": return_date})
+async def search_cars(location: str, pickup_date: str, return_date: str):
+    return await car_rental_api.get("/cars/search", params={"location": location, "pickup_date": pickup_date, "return_date": return_date})
 
-def reserve_car(car_id: str, rental_details: dict):
-    return car_rental_api.post("/cars/reserve", data={"car_id": car_id, "rental": rental_details})
+async def reserve_car(car_id: str, rental_details: dict):
+    return await car_rental_api.post("/cars/reserve", data={"car_id": car_id, "rental": rental_details})
 
-def get_reservation_details(reservation_id: str):
-    return car_rental_api.get(f"/cars/reservations/{reservation_id}")
+async def get_reservation_details(reservation_id: str):
+    return await car_rental_api.get(f"/cars/reservations/{reservation_id}")
 
-def cancel_reservation(reservation_id: str):
-    return car_rental_api.delete(f"/cars/reservations/{reservation_id}")
\ No newline at end of file
+async def cancel_reservation(reservation_id: str):
+    return await car_rental_api.delete(f"/cars/reservations/{reservation_id}")
\ No newline at end of file
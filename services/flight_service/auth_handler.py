@@ -1,23 +1,108 @@
-import httpx
+import asyncio
 import os
+import time
+from typing import Any, Dict, Optional
+
+import httpx
 from fastapi import HTTPException
+from shared.http_clients import http_clients, HTTP_CLIENT_TIMEOUT
+from shared.metrics import TOKEN_REFRESHES
 
-FLYHUB_SANDBOX_URL = "http://api.sandbox.flyhub.com/api/v1/"
-BDFARE_SANDBOX_URL = "https://bdf.centralindia.cloudapp.azure.com/api/enterprise/"
+# Overridable so load tests can point the service at local fake suppliers
+FLYHUB_SANDBOX_URL = os.getenv("FLYHUB_API_URL", "http://api.sandbox.flyhub.com/api/v1/")
+BDFARE_SANDBOX_URL = os.getenv("BDFARE_API_URL", "https://bdf.centralindia.cloudapp.azure.com/api/enterprise/")
 
 FLYHUB_USERNAME = os.getenv("FLYHUB_USERNAME")
 FLYHUB_API_KEY = os.getenv("FLYHUB_API_KEY")
 BDFARE_API_KEY = os.getenv("BDFARE_API_KEY")
 
+# Flyhub session tokens are reused until shortly before they expire (seconds)
+FLYHUB_TOKEN_TTL = float(os.getenv("FLYHUB_TOKEN_TTL", "3600"))
+FLYHUB_TOKEN_REFRESH_MARGIN = float(os.getenv("FLYHUB_TOKEN_REFRESH_MARGIN", "60"))
+
+
+async def _authenticate_flyhub() -> str:
+    client = http_clients.get(FLYHUB_SANDBOX_URL)
+    response = await client.post(
+        f"{FLYHUB_SANDBOX_URL}Authenticate",
+        json={"username": FLYHUB_USERNAME, "apikey": FLYHUB_API_KEY}
+    )
+    if response.status_code == 200:
+        return response.json()["TokenId"]
+    raise HTTPException(status_code=401, detail="Failed to authenticate with Flyhub")
+
+
+class FlyhubTokenCache:
+    """
+    In-process cache for the Flyhub ``TokenId``.
+
+    Concurrent callers that find the token missing or stale share a single
+    in-flight ``Authenticate`` call instead of each starting their own.
+    """
+
+    def __init__(self, ttl: float = FLYHUB_TOKEN_TTL, refresh_margin: float = FLYHUB_TOKEN_REFRESH_MARGIN):
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh: Optional[asyncio.Future] = None
+        self.refresh_count = 0
+
+    def is_valid(self) -> bool:
+        return self._token is not None and time.monotonic() < self._expires_at - self.refresh_margin
+
+    async def get_token(self) -> str:
+        if self.is_valid():
+            return self._token
+        if self._refresh is None:
+            self._refresh = asyncio.ensure_future(self._fetch())
+        # Shield the shared refresh so one cancelled caller doesn't abort it for the others
+        return await asyncio.shield(self._refresh)
+
+    async def _fetch(self) -> str:
+        try:
+            token = await _authenticate_flyhub()
+            self._token = token
+            self._expires_at = time.monotonic() + self.ttl
+            self.refresh_count += 1
+            TOKEN_REFRESHES.labels("flyhub").inc()
+            return token
+        finally:
+            self._refresh = None
+
+    def invalidate(self, token: Optional[str] = None):
+        """Drop the cached token; pass the rejected token so a newer one is kept."""
+        if token is None or token == self._token:
+            self._token = None
+            self._expires_at = 0.0
+
+
+flyhub_token_cache = FlyhubTokenCache()
+
+
 async def get_flyhub_token():
-    async with httpx.AsyncClient() as client:
+    return await flyhub_token_cache.get_token()
+
+async def flyhub_post(endpoint: str, payload: Dict[str, Any], timeout: float = HTTP_CLIENT_TIMEOUT) -> httpx.Response:
+    """POST to Flyhub with the cached token, refreshing it once if Flyhub rejects it."""
+    client = http_clients.get(FLYHUB_SANDBOX_URL)
+    token = await get_flyhub_token()
+    response = await client.post(
+        f"{FLYHUB_SANDBOX_URL}{endpoint}",
+        json=payload,
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=timeout
+    )
+    if response.status_code == 401:
+        flyhub_token_cache.invalidate(token)
+        token = await get_flyhub_token()
         response = await client.post(
-            f"{FLYHUB_SANDBOX_URL}Authenticate",
-            json={"username": FLYHUB_USERNAME, "apikey": FLYHUB_API_KEY}
+            f"{FLYHUB_SANDBOX_URL}{endpoint}",
+            json=payload,
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=timeout
         )
-        if response.status_code == 200:
-            return response.json()["TokenId"]
-        raise HTTPException(status_code=401, detail="Failed to authenticate with Flyhub")
+    return response
 
 def get_bdfare_headers():
     return {"Authorization": f"Bearer {BDFARE_API_KEY}"}
@@ -27,4 +112,4 @@ async def get_auth_headers():
     return {
         "flyhub": {"Authorization": f"Bearer {flyhub_token}"},
         "bdfare": get_bdfare_headers()
-    }
\ No newline at end of file
+    }
@@ -1,52 +1,401 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from itertools import chain
+from typing import Optional
 import httpx
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from shared import fast_json
+from shared.circuit_breaker import circuit_breakers
+from shared.exceptions import CircuitOpenError, RateLimitExceeded
+from shared.http_clients import http_clients
+from shared.metrics import track_upstream
+from shared.retry import default_retry_policy
+from shared.single_flight import SingleFlight
+from shared.response import RawJSONResponse, STREAM_MEDIA_TYPES, encode_stream_frame
 from .flyhub_adapter import prepare_flyhub_request
 from .bdfare_adapter import prepare_bdfare_request
-from .result_combiner import combine_results
-from .auth_handler import get_auth_headers, FLYHUB_SANDBOX_URL, BDFARE_SANDBOX_URL
+from .result_combiner import combine_results, deduplicate_offers, select_offers, PARSERS, FLIGHT_SEARCH_MAX_RESULTS
+from .auth_handler import flyhub_post, get_bdfare_headers, FLYHUB_SANDBOX_URL, BDFARE_SANDBOX_URL
+from .supplier_search import (
+    search_suppliers, iter_supplier_results, throttle_supplier, hedge_supplier_call, SUPPLIER_TIMEOUTS,
+    FLIGHT_BOOKING_TIMEOUT
+)
+from .search_cache import search_cache, search_fingerprint, search_ttl
+from .reference_data import reference_data, validate_flight_search
+from .offer_store import offer_store, search_ref, StoredOffer
+from .result_index import (
+    result_indexes, query_key, encode_cursor, decode_cursor, SORT_KEYS,
+    FLIGHT_RESULTS_PAGE_SIZE, FLIGHT_RESULTS_MAX_PAGE_SIZE
+)
 
 router = APIRouter()
 
-@router.post("/search")
-async def flight_search(search_params: dict):
+search_flights = SingleFlight()
+
+# Searches keep only the cheapest offers, picked with a bounded heap instead of sorting them all
+RESULT_LIMIT = FLIGHT_SEARCH_MAX_RESULTS or None
+
+SUPPLIER_URLS = {"flyhub": FLYHUB_SANDBOX_URL, "bdfare": BDFARE_SANDBOX_URL}
+
+async def _supplier_post(supplier: str, endpoint: str, payload: dict, timeout: float):
+    """One POST to a supplier through its quota, circuit breaker and upstream metrics."""
+    await throttle_supplier(supplier)
+    async with circuit_breakers.get(SUPPLIER_URLS[supplier]).protect(), track_upstream(supplier):
+        if supplier == "flyhub":
+            response = await flyhub_post(endpoint, payload, timeout=timeout)
+        else:
+            response = await http_clients.get(BDFARE_SANDBOX_URL).post(
+                f"{BDFARE_SANDBOX_URL}{endpoint}",
+                json=payload,
+                headers=get_bdfare_headers(),
+                timeout=timeout
+            )
+        response.raise_for_status()
+    return response
+
+def _supplier_calls(search_params: dict):
     flyhub_request = prepare_flyhub_request(search_params)
     bdfare_request = prepare_bdfare_request(search_params)
 
-    # Get authentication headers
-    auth_headers = await get_auth_headers()
+    async def flyhub_attempt(timeout: float):
+        response = await hedge_supplier_call(
+            "flyhub", "AirSearch", lambda: _supplier_post("flyhub", "AirSearch", flyhub_request, timeout)
+        )
+        return fast_json.loads(response.content)
 
-    # Make concurrent API calls
-    async with httpx.AsyncClient() as client:
-        flyhub_response = await client.post(
-            f"{FLYHUB_SANDBOX_URL}AirSearch",
-            json=flyhub_request,
-            headers=auth_headers["flyhub"]
+    async def bdfare_attempt(timeout: float):
+        response = await hedge_supplier_call(
+            "bdfare", "AirShopping", lambda: _supplier_post("bdfare", "AirShopping", bdfare_request, timeout)
         )
-        bdfare_response = await client.post(
-            f"{BDFARE_SANDBOX_URL}AirShopping",
-            json=bdfare_request,
-            headers=auth_headers["bdfare"]
+        return fast_json.loads(response.content)
+
+    # Searches are read-only, so their POSTs are safe to hedge and to retry within the supplier's timeout
+    async def flyhub_search():
+        return await default_retry_policy.aexecute(flyhub_attempt, "POST", key=FLYHUB_SANDBOX_URL,
+                                                   deadline=SUPPLIER_TIMEOUTS["flyhub"], allow_non_idempotent=True)
+
+    async def bdfare_search():
+        return await default_retry_policy.aexecute(bdfare_attempt, "POST", key=BDFARE_SANDBOX_URL,
+                                                   deadline=SUPPLIER_TIMEOUTS["bdfare"], allow_non_idempotent=True)
+
+    return {"flyhub": flyhub_search, "bdfare": bdfare_search}
+
+async def _search_and_cache(search_params: dict, cache_key: str) -> bytes:
+    # Fan out to all suppliers concurrently over the shared connection pools
+    supplier_results = await search_suppliers(_supplier_calls(search_params))
+
+    if not any(result.ok for result in supplier_results.values()):
+        raise HTTPException(
+            status_code=502,
+            detail={name: result.metadata() for name, result in supplier_results.items()}
         )
 
-    # Check for successful responses
-    if flyhub_response.status_code != 200:
-        raise HTTPException(status_code=flyhub_response.status_code, detail="Flyhub API request failed")
-    if bdfare_response.status_code != 200:
-        raise HTTPException(status_code=bdfare_response.status_code, detail="Bdfare API request failed")
+    # Process and combine whatever results arrived in time
+    combined_results = combine_results(
+        supplier_results["flyhub"].payload or {},
+        supplier_results["bdfare"].payload or {},
+        limit=RESULT_LIMIT
+    )
+    search_refs = {name: search_ref(name, result.payload) for name, result in supplier_results.items() if result.ok}
+    offer_store.remember(combined_results, search_refs, cache_key)
+    body = fast_json.dumps({
+        "results": combined_results,
+        "suppliers": {name: result.metadata() for name, result in supplier_results.items()},
+        # Kept with the results so a cache hit can put its offers back in this process's offer store
+        "search_refs": search_refs
+    })
+    # Only complete answers are cached; a partial one would hide a recovered supplier
+    if all(result.ok for result in supplier_results.values()):
+        await search_cache.set(cache_key, body, search_ttl(search_params))
+    return body
+
+def _remember_cached(cache_key: str, cached_body: bytes, cached_response: Optional[dict] = None):
+    """
+    Put a cached search's offers in the offer store, unless they are already
+    there: the cache may have been filled by another replica, or before a restart.
+    """
+    if offer_store.has_search(cache_key):
+        return
+    cached_response = cached_response or fast_json.loads(cached_body)
+    offer_store.remember(cached_response["results"], cached_response.get("search_refs", {}), cache_key)
+
+async def cached_flight_search(search_params: dict) -> bytes:
+    """Serialized search response, from the cache or a supplier fan-out; raises 502 if no supplier answered."""
+    cache_key = search_fingerprint(search_params)
+    cached_body = await search_cache.get(cache_key)
+    if cached_body is not None:
+        _remember_cached(cache_key, cached_body)
+        return cached_body
+
+    # Identical searches arriving together share a single supplier fan-out
+    return await search_flights.do(cache_key, lambda: _search_and_cache(search_params, cache_key))
+
+def _validate_search(search_params: dict):
+    # Rejected before the cache and the suppliers: no upstream call is spent on a search that cannot match
+    try:
+        validate_flight_search(search_params)
+        search_fingerprint(search_params)
+    except (KeyError, TypeError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid search, missing or malformed {e!r}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def _search_page(search_params: dict, filters: dict, sort: str, limit: int, cursor: Optional[str]) -> bytes:
+    """One page of filtered, sorted results, served from the search's result index."""
+    if sort.lstrip("-") not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"Unsupported sort: {sort}")
+    if not 0 < limit <= FLIGHT_RESULTS_MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {FLIGHT_RESULTS_MAX_PAGE_SIZE}")
+    key = search_fingerprint(search_params)
+    query = query_key(filters, sort)
+    index = None
+    place = seen = 0
+    if cursor is not None:
+        try:
+            version, cursor_query, place, seen = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if cursor_query != query:
+            raise HTTPException(status_code=400, detail="Cursor belongs to a different filter or sort")
+        # Later pages come from the index the first page was served from: no cache read, no supplier call
+        index = result_indexes.get(key, version)
+        if index is None:
+            raise HTTPException(status_code=410, detail="Results for this cursor have expired; start from the first page")
+    else:
+        body = await cached_flight_search(search_params)
+        index = result_indexes.index(key, body, [segment["destination"].strip().upper()
+                                                 for segment in search_params["segments"]])
+
+    try:
+        mask = index.select(**filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total = bin(mask).count("1")
+    positions, place = index.page(mask, sort, place, limit)
+    seen += len(positions)
+    next_cursor = encode_cursor(index.version, query, place, seen) if seen < total else None
+    return index.render(positions, total, next_cursor)
+
+@router.post("/search")
+async def flight_search(search_params: dict, sort: Optional[str] = None, limit: Optional[int] = None,
+                        cursor: Optional[str] = None, stops: Optional[int] = None, airlines: Optional[str] = None,
+                        min_price: Optional[float] = None, max_price: Optional[float] = None,
+                        departure_from: Optional[str] = None, departure_to: Optional[str] = None,
+                        refundable: Optional[bool] = None):
+    """
+    Search all suppliers. Without query parameters the whole price-sorted result
+    set is returned. With any of ``sort`` (price, duration or departure, "-" for
+    descending), ``limit``, ``cursor`` or the filters (``stops``: most stops per
+    leg, ``airlines``: comma-separated codes, ``min_price``/``max_price``,
+    ``departure_from``/``departure_to``: "HH:MM" window of the first departure,
+    ``refundable``) one page is returned with ``total_results`` and a
+    ``next_cursor`` to pass, with the same search and query, for the next page.
+    """
+    _validate_search(search_params)
+    filters = {name: value for name, value in (
+        ("stops", stops), ("airlines", airlines.split(",") if airlines else None),
+        ("min_price", min_price), ("max_price", max_price),
+        ("departure_from", departure_from), ("departure_to", departure_to), ("refundable", refundable),
+    ) if value is not None}
+    if filters or sort is not None or limit is not None or cursor is not None:
+        return RawJSONResponse(await _search_page(search_params, filters, sort or "price",
+                                                  FLIGHT_RESULTS_PAGE_SIZE if limit is None else limit, cursor))
+    # Cached results are stored pre-serialized and sent without re-encoding
+    return RawJSONResponse(await cached_flight_search(search_params))
+
+async def _stream_search(search_params: dict, cache_key: str, calls: dict, stream_format: str):
+    supplier_status = {}
+    search_refs = {}
+    supplier_offers = []
+    total_results = 0
+    async for result in iter_supplier_results(calls):
+        offers = select_offers([PARSERS[result.supplier](result.payload or {})], limit=RESULT_LIMIT)
+        supplier_status[result.supplier] = result.metadata()
+        total_results += len(offers)
+        supplier_offers.append(offers)
+        offer_dicts = [offer.to_dict() for offer in offers]
+        if result.ok:
+            search_refs[result.supplier] = search_ref(result.supplier, result.payload)
+            offer_store.remember(offer_dicts, search_refs)
+        yield encode_stream_frame({
+            "type": "offers",
+            "supplier": result.supplier,
+            "status": supplier_status[result.supplier],
+            "results": offer_dicts
+        }, stream_format)
+
+    yield encode_stream_frame({
+        "type": "summary",
+        "suppliers": supplier_status,
+        "total_results": total_results,
+        "cached": False
+    }, stream_format)
+
+    if all(status["status"] == "ok" for status in supplier_status.values()):
+        # Suppliers are streamed as they arrive; cross-supplier duplicates are only collapsed for the cache
+        combined_offers = select_offers([deduplicate_offers(chain.from_iterable(supplier_offers))],
+                                        limit=RESULT_LIMIT)
+        body = fast_json.dumps({
+            "results": [offer.to_dict() for offer in combined_offers],
+            "suppliers": {name: supplier_status[name] for name in calls},
+            "search_refs": search_refs
+        })
+        await search_cache.set(cache_key, body, search_ttl(search_params))
+
+async def _stream_cached(cache_key: str, cached_body: bytes, stream_format: str):
+    cached_response = fast_json.loads(cached_body)
+    _remember_cached(cache_key, cached_body, cached_response)
+    yield encode_stream_frame({"type": "offers", "supplier": "cache", "status": None, "results": cached_response["results"]}, stream_format)
+    yield encode_stream_frame({
+        "type": "summary",
+        "suppliers": cached_response["suppliers"],
+        "total_results": len(cached_response["results"]),
+        "cached": True
+    }, stream_format)
+
+@router.post("/search/stream")
+async def flight_search_stream(search_params: dict, format: str = "ndjson"):
+    """
+    Streaming variant of /search: one "offers" frame per supplier as soon as it
+    answers, then a "summary" frame. Served as NDJSON or Server-Sent Events.
+    """
+    if format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported stream format: {format}")
+    _validate_search(search_params)
+
+    cache_key = search_fingerprint(search_params)
+    cached_body = await search_cache.get(cache_key)
+    if cached_body is not None:
+        return StreamingResponse(_stream_cached(cache_key, cached_body, format), media_type=STREAM_MEDIA_TYPES[format])
+
+    # Build the supplier requests up front so invalid searches fail before streaming starts
+    calls = _supplier_calls(search_params)
+    return StreamingResponse(
+        _stream_search(search_params, cache_key, calls, format),
+        media_type=STREAM_MEDIA_TYPES[format]
+    )
+
+# Declared before /{booking_id}, which would otherwise capture these paths
+@router.get("/airports")
+async def autocomplete_airports(q: str, limit: int = 10):
+    """Airports whose code, name or city starts with ``q``, for search-box autocomplete."""
+    return {"results": reference_data().airports.search(q, min(limit, 50))}
+
+@router.get("/airlines")
+async def autocomplete_airlines(q: str, limit: int = 10):
+    """Airlines whose code or name starts with ``q``."""
+    return {"results": reference_data().airlines.search(q, min(limit, 50))}
+
+def _stored_offer(offer_id: str) -> StoredOffer:
+    stored = offer_store.get(offer_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Offer {offer_id} not found or expired; search again")
+    return stored
+
+async def _price_call(stored: StoredOffer, endpoint: str, payload: dict) -> dict:
+    """A pricing call about a stored offer, retried as it is read-only; raises 502 with the supplier's status."""
+    supplier = stored.source.lower()
+
+    async def attempt(timeout: float):
+        response = await _supplier_post(supplier, endpoint, payload, timeout)
+        return fast_json.loads(response.content)
+
+    async def call():
+        return await default_retry_policy.aexecute(attempt, "POST", key=SUPPLIER_URLS[supplier],
+                                                   deadline=SUPPLIER_TIMEOUTS[supplier], allow_non_idempotent=True)
+
+    result = (await search_suppliers({supplier: call}))[supplier]
+    if not result.ok:
+        raise HTTPException(status_code=502, detail={supplier: result.metadata()})
+    return result.payload
 
-    # Process and combine results
-    combined_results = combine_results(flyhub_response.json(), bdfare_response.json())
-    return combined_results
+async def _booking_call(stored: StoredOffer, endpoint: str, payload: dict) -> dict:
+    """
+    A booking call about a stored offer: sent exactly once, with its own timeout,
+    and not cancelled if the client goes away, since the supplier may already be
+    creating the order. Raises 502 if the booking certainly failed and 504 if
+    its outcome is unknown.
+    """
+    supplier = stored.source.lower()
+    call = asyncio.ensure_future(_supplier_post(supplier, endpoint, payload, FLIGHT_BOOKING_TIMEOUT))
+    try:
+        response = await asyncio.shield(call)
+    except (httpx.ConnectTimeout, httpx.PoolTimeout, RateLimitExceeded, CircuitOpenError) as e:
+        # Never sent: the offer can safely be booked again
+        raise HTTPException(status_code=502, detail={supplier: {"status": "error", "error": str(e) or repr(e)}})
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=504, detail={
+            "status": "outcome_unknown",
+            "offer_id": stored.supplier_offer_id,
+            "error": f"{supplier} did not answer within {FLIGHT_BOOKING_TIMEOUT}s; the booking may have been "
+                     "created. Check the booking status with the supplier before booking again."
+        })
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=502, detail={supplier: {
+            "status": "error", "http_status": e.response.status_code, "error": f"{supplier} API request failed"
+        }})
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail={supplier: {
+            "status": "error", "error": f"{supplier} API request failed: {e!r}"
+        }})
+    return fast_json.loads(response.content)
 
 @router.post("/verify-price")
 async def verify_price(offer_id: str):
-    # TODO: Implement price verification logic
-    return {"message": "Price verification not implemented yet", "offer_id": offer_id}
+    """
+    Re-price an offer from a recent search with one supplier call: Flyhub
+    AirPrice by SearchID and ResultID, or BDFare OfferPrice by traceId and offerId.
+    """
+    stored = _stored_offer(offer_id)
+    if stored.source == "Flyhub":
+        payload = await _price_call(stored, "AirPrice",
+                                    {"SearchID": stored.search_ref, "ResultID": stored.supplier_offer_id})
+    else:
+        payload = await _price_call(stored, "OfferPrice",
+                                    {"traceId": stored.search_ref, "offerId": [stored.supplier_offer_id]})
+    # Priced offers come back in the same shape as search results
+    priced = PARSERS[stored.source.lower()](payload)
+    if not priced:
+        raise HTTPException(status_code=409, detail=f"Offer {offer_id} is no longer available")
+    offer = priced[0]
+    return {
+        "offer_id": offer_id,
+        "source": stored.source,
+        "quoted_fare": stored.total_fare,
+        "total_fare": offer.total_fare,
+        "currency": offer.currency,
+        "price_changed": offer.total_fare != stored.total_fare or offer.currency != stored.currency,
+        "offer": offer.to_dict()
+    }
 
 @router.post("/create-booking")
 async def create_booking(booking_details: dict):
-    # TODO: Implement booking creation logic
-    return {"message": "Booking creation not implemented yet", "details": booking_details}
+    """
+    Book an offer from a recent search with one supplier call: Flyhub AirBook
+    or BDFare OrderCreate. Takes ``offer_id``, ``passengers`` and ``contact``.
+    A 504 means the supplier did not answer in time and the booking may exist.
+    """
+    try:
+        offer_id = booking_details["offer_id"]
+        passengers = booking_details["passengers"]
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid booking, missing {e}")
+    stored = _stored_offer(offer_id)
+    if stored.source == "Flyhub":
+        payload = await _booking_call(stored, "AirBook", {
+            "SearchID": stored.search_ref,
+            "ResultID": stored.supplier_offer_id,
+            "Passengers": passengers
+        })
+    else:
+        payload = await _booking_call(stored, "OrderCreate", {
+            "traceId": stored.search_ref,
+            "offerId": [stored.supplier_offer_id],
+            "request": {"contactInfo": booking_details.get("contact", {}), "paxList": passengers}
+        })
+    # A booked offer cannot be booked twice
+    offer_store.delete(offer_id)
+    return {"offer_id": offer_id, "source": stored.source, "booking": payload}
 
 @router.get("/{booking_id}")
 async def get_booking(booking_id: str):
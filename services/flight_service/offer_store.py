@@ -0,0 +1,181 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+OFFER_STORE_TTL = float(os.getenv("OFFER_STORE_TTL", "1800"))
+OFFER_STORE_MAX_ENTRIES = int(os.getenv("OFFER_STORE_MAX_ENTRIES", "200000"))
+
+
+def search_ref(supplier: str, payload: Dict[str, Any]) -> Optional[str]:
+    """The supplier's id for a whole search response, which its pricing and booking calls refer back to."""
+    if supplier == "flyhub":
+        return payload.get("SearchId")
+    return payload.get("response", {}).get("traceId")
+
+
+class StoredOffer:
+    """What pricing or booking an offer needs: the supplier's ids for it and the fare it was shown at."""
+
+    __slots__ = (
+        "expires_at",
+        "source",
+        "supplier_offer_id",
+        "search_ref",
+        "total_fare",
+        "currency",
+        "search_key",
+    )
+
+    def __init__(
+        self,
+        expires_at,
+        source,
+        supplier_offer_id,
+        search_ref,
+        total_fare,
+        currency,
+        search_key=None,
+    ):
+        self.expires_at = expires_at
+        self.source = source
+        self.supplier_offer_id = supplier_offer_id
+        # Flyhub SearchId or BDFare traceId; one string shared by every offer of a search
+        self.search_ref = search_ref
+        self.total_fare = total_fare
+        self.currency = currency
+        # Search cache key the offer was remembered from, if any
+        self.search_key = search_key
+
+
+class OfferStore:
+    """
+    Offers from recent searches by result id, so verify-price and create-booking
+    can go straight to the supplier without searching again.
+
+    Every entry lives for the same ``ttl``, so insertion order is expiry order:
+    expired entries are dropped from the front as new ones arrive, and past
+    ``max_entries`` the oldest go first. Lookups and inserts are O(1). Entries
+    are local to this process, so the store also tracks which cached searches
+    it holds the offers of: a search cache hit (possibly filled by another
+    replica) re-remembers its offers unless ``has_search`` says they are here.
+    """
+
+    def __init__(
+        self, ttl: float = OFFER_STORE_TTL, max_entries: int = OFFER_STORE_MAX_ENTRIES
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._offers: "OrderedDict[str, StoredOffer]" = OrderedDict()
+        # Search cache keys whose offers are all stored, by expiry
+        self._searches: "OrderedDict[str, float]" = OrderedDict()
+        self.evictions = 0
+        self.hits = 0
+        self.misses = 0
+
+    def put(
+        self,
+        result_id: str,
+        source: str,
+        search_ref: Optional[str],
+        total_fare: Any,
+        currency: str,
+        search_key: Optional[str] = None,
+    ):
+        now = time.monotonic()
+        offers = self._offers
+        offers.pop(result_id, None)
+        offers[result_id] = StoredOffer(
+            now + self.ttl,
+            source,
+            result_id,
+            search_ref,
+            total_fare,
+            currency,
+            search_key,
+        )
+        while offers:
+            oldest = next(iter(offers.values()))
+            if oldest.expires_at > now and len(offers) <= self.max_entries:
+                break
+            offers.popitem(last=False)
+            self.evictions += 1
+            if oldest.search_key is not None:
+                # Its search is no longer complete here
+                self._searches.pop(oldest.search_key, None)
+
+    def remember(
+        self,
+        offers: Iterable[Dict[str, Any]],
+        search_refs: Dict[str, Optional[str]],
+        search_key: Optional[str] = None,
+    ):
+        """
+        Store normalized offers, including their deduplicated alternatives, with
+        the search reference of their supplier (keyed "flyhub"/"bdfare"), and
+        record ``search_key`` as held if given.
+        """
+        for offer in offers:
+            source, currency = offer["source"], offer["currency"]
+            self.put(
+                offer["result_id"],
+                source,
+                search_refs.get(source.lower()),
+                offer["total_fare"],
+                currency,
+                search_key,
+            )
+            for alternative in offer["alternatives"]:
+                # Alternatives share the itinerary signature, and with it the currency
+                alternative_source = alternative["source"]
+                self.put(
+                    alternative["result_id"],
+                    alternative_source,
+                    search_refs.get(alternative_source.lower()),
+                    alternative["total_fare"],
+                    currency,
+                    search_key,
+                )
+        if search_key is not None:
+            now = time.monotonic()
+            searches = self._searches
+            searches.pop(search_key, None)
+            searches[search_key] = now + self.ttl
+            while searches and (
+                next(iter(searches.values())) <= now or len(searches) > self.max_entries
+            ):
+                searches.popitem(last=False)
+
+    def has_search(self, search_key: str) -> bool:
+        """Whether the offers of the cached search ``search_key`` were remembered here and are all still stored."""
+        expires_at = self._searches.get(search_key)
+        return expires_at is not None and expires_at > time.monotonic()
+
+    def get(self, result_id: str) -> Optional[StoredOffer]:
+        offer = self._offers.get(result_id)
+        if offer is None or offer.expires_at <= time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return offer
+
+    def delete(self, result_id: str):
+        self._offers.pop(result_id, None)
+
+    def __len__(self) -> int:
+        return len(self._offers)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._offers),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+offer_store = OfferStore()
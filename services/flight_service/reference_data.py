@@ -0,0 +1,184 @@
+import csv
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+# Tab-separated airports.tsv (code, name, city, country) and airlines.tsv (code, name, country)
+REFERENCE_DATA_DIR = os.getenv(
+    "REFERENCE_DATA_DIR", os.path.join(os.path.dirname(__file__), "data")
+)
+# "format": only the shape of codes is checked; "strict": they must also be in the bundled reference
+# data, which only lists the airports and airlines it was built with, so opt in once it covers your routes; "off"
+FLIGHT_CODE_VALIDATION = os.getenv("FLIGHT_CODE_VALIDATION", "format")
+
+AIRPORT_CODE = re.compile(r"^[A-Z]{3}$")
+AIRLINE_CODE = re.compile(r"^[A-Z0-9]{2}$")
+
+
+class ReferenceTable:
+    """
+    Read-only rows keyed by IATA code, with a prefix index for autocomplete.
+
+    Columns are stored as tuples in code order. The prefix index is a sorted
+    list of lowercased search keys (the code, the full name and city, and each
+    later word of them) with a parallel array of row numbers, so a prefix
+    lookup is one bisection followed by a short forward scan.
+    """
+
+    def __init__(self, fields: List[str], rows: List[Dict[str, str]]):
+        rows = sorted(rows, key=lambda row: row["code"])
+        self.fields = fields
+        self.columns = {field: tuple(row[field] for row in rows) for field in fields}
+        self.codes = self.columns["code"]
+        self._row = {code: i for i, code in enumerate(self.codes)}
+
+        entries = set()
+        for i, row in enumerate(rows):
+            entries.add((row["code"].lower(), i))
+            for field in fields[1:]:
+                if field == "country":
+                    continue
+                words = row[field].lower().split()
+                for start in range(len(words)):
+                    entries.add((" ".join(words[start:]), i))
+        ordered = sorted(entries)
+        self._keys = [key for key, _ in ordered]
+        self._rows = array("H", (i for _, i in ordered))
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._row
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def get(self, code: str) -> Optional[Dict[str, str]]:
+        row = self._row.get(code)
+        return None if row is None else self._record(row)
+
+    def _record(self, row: int) -> Dict[str, str]:
+        return {field: column[row] for field, column in self.columns.items()}
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict[str, str]]:
+        """Rows with a code, name or city word starting with ``prefix``; an exact code match comes first."""
+        prefix = " ".join(prefix.lower().split())
+        if not prefix or limit <= 0:
+            return []
+        found: List[int] = []
+        exact = self._row.get(prefix.upper())
+        if exact is not None:
+            found.append(exact)
+
+        keys, rows = self._keys, self._rows
+        position = bisect_left(keys, prefix)
+        while (
+            position < len(keys)
+            and len(found) < limit
+            and keys[position].startswith(prefix)
+        ):
+            row = rows[position]
+            if row not in found:
+                found.append(row)
+            position += 1
+        return [self._record(row) for row in found]
+
+
+def _load_table(path: str) -> Tuple[List[str], List[Dict[str, str]]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f, delimiter="\t", quoting=csv.QUOTE_NONE)
+        return list(reader.fieldnames or []), list(reader)
+
+
+class ReferenceData:
+    """Airports and airlines, loaded from REFERENCE_DATA_DIR."""
+
+    def __init__(self, directory: str = REFERENCE_DATA_DIR):
+        self.airports = ReferenceTable(
+            *_load_table(os.path.join(directory, "airports.tsv"))
+        )
+        self.airlines = ReferenceTable(
+            *_load_table(os.path.join(directory, "airlines.tsv"))
+        )
+        # Plain dicts for the parsers' per-segment lookups; they map supplier strings to shared ones
+        self.airport_codes = {code: code for code in self.airports.codes}
+        self.airline_names = dict(
+            zip(self.airlines.codes, self.airlines.columns["name"])
+        )
+
+
+_reference: Optional[ReferenceData] = None
+_lock = threading.Lock()
+
+
+def reference_data() -> ReferenceData:
+    """The reference data, loaded on first use rather than at startup."""
+    global _reference
+    if _reference is None:
+        with _lock:
+            if _reference is None:
+                _reference = ReferenceData()
+    return _reference
+
+
+PASSENGER_COUNTS = ("adult_count", "child_count", "infant_count")
+
+
+def _shape_problems(params: Dict[str, Any]) -> List[str]:
+    """Fields that are missing or of the wrong type; the search fingerprint and the supplier requests need them all."""
+    problems = []
+    segments = params.get("segments")
+    if (
+        not isinstance(segments, list)
+        or not segments
+        or not all(isinstance(segment, dict) for segment in segments)
+    ):
+        problems.append("segments must be a non-empty list of objects")
+    else:
+        for field in ("origin", "destination", "departure_date"):
+            if not all(isinstance(segment.get(field), str) for segment in segments):
+                problems.append(f"every segment needs a string {field}")
+    for field in ("cabin_class", "trip_type"):
+        if not isinstance(params.get(field), str):
+            problems.append(f"{field} must be a string")
+    airlines = params.get("preferred_airlines", [])
+    if not isinstance(airlines, list) or not all(
+        isinstance(airline, str) for airline in airlines
+    ):
+        problems.append("preferred_airlines must be a list of strings")
+    for field in PASSENGER_COUNTS:
+        count = params.get(field, 0)
+        if isinstance(count, bool) or not isinstance(count, int) or count < 0:
+            problems.append(f"{field} must be a whole number")
+    return problems
+
+
+def validate_flight_search(params: Dict[str, Any], mode: str = FLIGHT_CODE_VALIDATION):
+    """
+    Raise ValueError naming every malformed field, and every airport or airline
+    code no supplier could use, in a search. ``mode`` only affects the code checks.
+    """
+    problems = _shape_problems(params)
+    if problems or mode == "off":
+        if problems:
+            raise ValueError("; ".join(problems))
+        return
+    reference = reference_data() if mode == "strict" else None
+    for segment in params["segments"]:
+        for field in ("origin", "destination"):
+            code = segment[field].strip().upper()
+            if not AIRPORT_CODE.match(code):
+                problems.append(
+                    f"{field} {segment[field]!r} is not an IATA airport code"
+                )
+            elif reference is not None and code not in reference.airports:
+                problems.append(f"unknown airport {code}")
+    for airline in params.get("preferred_airlines", ()):
+        code = airline.strip().upper()
+        if not AIRLINE_CODE.match(code):
+            problems.append(f"{airline!r} is not an IATA airline code")
+        elif reference is not None and code not in reference.airlines:
+            problems.append(f"unknown airline {code}")
+    if problems:
+        raise ValueError("; ".join(problems))
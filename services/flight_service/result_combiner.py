@@ -1,56 +1,240 @@
-def combine_results(flyhub_results, bdfare_results):
+import heapq
+import os
+from itertools import chain
+
+from .reference_data import reference_data
+
+# Most offers kept per search, cheapest first (0 keeps all); selected with a bounded heap, not a full sort
+FLIGHT_SEARCH_MAX_RESULTS = int(os.getenv("FLIGHT_SEARCH_MAX_RESULTS", "1000"))
+
+
+class Segment:
+    """A single normalized flight segment."""
+    __slots__ = ('origin', 'destination', 'airline', 'flight_number', 'departure_time',
+                 'arrival_time', 'duration', 'baggage')
+
+    def __init__(self, origin, destination, airline, flight_number, departure_time, arrival_time, duration, baggage):
+        self.origin = origin
+        self.destination = destination
+        self.airline = airline
+        self.flight_number = flight_number
+        self.departure_time = departure_time
+        self.arrival_time = arrival_time
+        self.duration = duration
+        self.baggage = baggage
+
+    def to_dict(self):
+        return {
+            'origin': self.origin,
+            'destination': self.destination,
+            'airline': self.airline,
+            'flight_number': self.flight_number,
+            'departure_time': self.departure_time,
+            'arrival_time': self.arrival_time,
+            'duration': self.duration,
+            'baggage': self.baggage
+        }
+
+
+class Offer:
+    """
+    A normalized supplier offer.
+
+    Offers stay in this compact form through combining and ranking and are
+    only turned into dicts at the edge, via to_dict().
+    """
+    __slots__ = ('source', 'result_id', 'is_refundable', 'total_fare', 'currency', 'segments', 'alternatives')
+
+    def __init__(self, source, result_id, is_refundable, total_fare, currency, segments):
+        self.source = source
+        self.result_id = result_id
+        self.is_refundable = is_refundable
+        self.total_fare = total_fare
+        self.currency = currency
+        self.segments = segments
+        # Pricier offers for the same itinerary, filled in by deduplicate_offers()
+        self.alternatives = None
+
+    def to_dict(self):
+        return {
+            'source': self.source,
+            'result_id': self.result_id,
+            'is_refundable': self.is_refundable,
+            'total_fare': self.total_fare,
+            'currency': self.currency,
+            'segments': [segment.to_dict() for segment in self.segments],
+            'alternatives': self.alternatives or []
+        }
+
+    def summary(self):
+        return {'source': self.source, 'result_id': self.result_id, 'total_fare': self.total_fare}
+
+
+def _fare_key(offer):
+    return offer.total_fare
+
+
+def parse_flyhub(flyhub_results):
+    """
+    Parse a Flyhub AirSearch response into Offers.
+    """
+    reference = reference_data()
+    airports, airline_names = reference.airport_codes, reference.airline_names
+    offers = []
+    for result in flyhub_results.get('Results', ()):
+        segments = []
+        for segment in result['Segments']:
+            airline = segment['Airline']
+            origin = segment['Origin']['AirportCode']
+            destination = segment['Destination']['AirportCode']
+            # Known codes and airline names are shared with the reference data instead of copied per segment
+            segments.append(Segment(
+                airports.get(origin, origin),
+                airports.get(destination, destination),
+                airline_names.get(airline['AirlineCode']) or airline['AirlineName'],
+                airline['AirlineCode'] + segment['FlightNumber'],
+                segment['DepartureDateTime'],
+                segment['ArrivalDateTime'],
+                segment['Duration'],
+                segment['Baggage']
+            ))
+        offers.append(Offer('Flyhub', result['ResultID'], result['IsRefundable'], result['TotalFare'],
+                            result['Currency'], tuple(segments)))
+    return offers
+
+
+def _baggage_index(baggage_allowance_list):
+    """Map departure airport -> check-in allowance; the first entry per airport wins."""
+    index = {}
+    for allowance in baggage_allowance_list:
+        departure = allowance['departure']
+        if departure not in index:
+            index[departure] = allowance['checkIn'][0]['allowance']
+    return index
+
+
+def parse_bdfare(bdfare_results):
+    """
+    Parse a Bdfare AirShopping response into Offers.
+    """
+    reference = reference_data()
+    airports, airline_names = reference.airport_codes, reference.airline_names
+    offers = []
+    for group in bdfare_results.get('response', {}).get('offersGroup', ()):
+        offer = group['offer']
+        # One pass over the allowances per offer instead of one scan per segment
+        baggage = _baggage_index(offer['baggageAllowanceList'])
+        segments = []
+        for item in offer['paxSegmentList']:
+            pax_segment = item['paxSegment']
+            departure = pax_segment['departure']
+            arrival = pax_segment['arrival']
+            carrier = pax_segment['marketingCarrierInfo']
+            departure_code = departure['iatA_LocationCode']
+            arrival_code = arrival['iatA_LocationCode']
+            segments.append(Segment(
+                airports.get(departure_code, departure_code),
+                airports.get(arrival_code, arrival_code),
+                airline_names.get(carrier['carrierDesigCode']) or carrier['carrierName'],
+                f"{carrier['carrierDesigCode']}{pax_segment['flightNumber']}",
+                departure['aircraftScheduledDateTime'],
+                arrival['aircraftScheduledDateTime'],
+                pax_segment['duration'],
+                baggage.get(departure_code, 'N/A')
+            ))
+        total_payable = offer['price']['totalPayable']
+        offers.append(Offer('Bdfare', offer['offerId'], offer['refundable'], total_payable['total'],
+                            total_payable['currency'], tuple(segments)))
+    return offers
+
+
+def normalize_flyhub(flyhub_results):
+    """
+    Normalize a Flyhub AirSearch response into our offer format.
+    """
+    return [offer.to_dict() for offer in parse_flyhub(flyhub_results)]
+
+def normalize_bdfare(bdfare_results):
+    """
+    Normalize a Bdfare AirShopping response into our offer format.
+    """
+    return [offer.to_dict() for offer in parse_bdfare(bdfare_results)]
+
+PARSERS = {
+    'flyhub': parse_flyhub,
+    'bdfare': parse_bdfare,
+}
+
+
+def _flight_key(flight_number):
+    # "BG0147" and "BG 147" are the same flight
+    flight_number = flight_number.replace(' ', '').upper()
+    return flight_number[:2] + flight_number[2:].lstrip('0')
+
+
+def itinerary_signature(offer):
+    """
+    Identity of the fare on a physical itinerary: currency, refundability, and
+    flight number and departure minute per segment.
+    """
+    return (offer.currency, offer.is_refundable) + tuple(
+        (_flight_key(segment.flight_number), segment.departure_time[:16].replace(' ', 'T'))
+        for segment in offer.segments
+    )
+
+
+def _offer_rank(offer):
+    # Fare first; source and id only break ties, so the outcome does not depend on arrival order
+    return offer.total_fare, offer.source, str(offer.result_id)
+
+
+def deduplicate_offers(offers):
+    """
+    Collapse the same fare offered by different suppliers into the cheapest one.
+
+    Offers are grouped by itinerary signature and, within it, by supplier. The
+    cheapest offer of the group survives and lists every other supplier's
+    offers under ``alternatives``, cheapest first. Fares from the surviving
+    supplier are never collapsed into each other: a second fare for the same
+    itinerary (e.g. another fare brand) is a distinct product and is kept as
+    its own offer. Ties go by source and then result id, so which offers
+    survive, and with which alternatives, does not depend on the order of
+    ``offers``; only the order of the returned list does.
+    """
+    groups = {}
+    for offer in offers:
+        offer.alternatives = None
+        groups.setdefault(itinerary_signature(offer), {}).setdefault(offer.source, []).append(offer)
+
+    deduplicated = []
+    for by_source in groups.values():
+        winner = min((offer for fares in by_source.values() for offer in fares), key=_offer_rank)
+        others = [offer for source, fares in by_source.items() if source != winner.source for offer in fares]
+        if others:
+            winner.alternatives = [offer.summary() for offer in sorted(others, key=_offer_rank)]
+        deduplicated.extend(by_source[winner.source])
+    return deduplicated
+
+
+def select_offers(offer_lists, limit=None):
+    """
+    Merge per-supplier offer lists into one list ordered by total fare.
+
+    With a limit only the cheapest ``limit`` offers are kept, using a bounded
+    heap (O(n log k)) instead of sorting everything. Ties keep supplier order.
+    """
+    offers = chain.from_iterable(offer_lists)
+    if limit is not None:
+        return heapq.nsmallest(limit, offers, key=_fare_key)
+    return sorted(offers, key=_fare_key)
+
+
+def combine_results(flyhub_results, bdfare_results, limit=None, deduplicate=True):
     """
     Combine and normalize results from both Flyhub and Bdfare APIs.
     """
-    combined_results = []
-
-    # Process Flyhub results
-    if 'Results' in flyhub_results:
-        for result in flyhub_results['Results']:
-            combined_results.append({
-                'source': 'Flyhub',
-                'result_id': result['ResultID'],
-                'is_refundable': result['IsRefundable'],
-                'total_fare': result['TotalFare'],
-                'currency': result['Currency'],
-                'segments': [
-                    {
-                        'origin': segment['Origin']['AirportCode'],
-                        'destination': segment['Destination']['AirportCode'],
-                        'airline': segment['Airline']['AirlineName'],
-                        'flight_number': segment['Airline']['AirlineCode'] + segment['FlightNumber'],
-                        'departure_time': segment['DepartureDateTime'],
-                        'arrival_time': segment['ArrivalDateTime'],
-                        'duration': segment['Duration'],
-                        'baggage': segment['Baggage']
-                    } for segment in result['Segments']
-                ]
-            })
-
-    # Process Bdfare results
-    if 'response' in bdfare_results and 'offersGroup' in bdfare_results['response']:
-        for offer in bdfare_results['response']['offersGroup']:
-            combined_results.append({
-                'source': 'Bdfare',
-                'result_id': offer['offer']['offerId'],
-                'is_refundable': offer['offer']['refundable'],
-                'total_fare': offer['offer']['price']['totalPayable']['total'],
-                'currency': offer['offer']['price']['totalPayable']['currency'],
-                'segments': [
-                    {
-                        'origin': segment['paxSegment']['departure']['iatA_LocationCode'],
-                        'destination': segment['paxSegment']['arrival']['iatA_LocationCode'],
-                        'airline': segment['paxSegment']['marketingCarrierInfo']['carrierName'],
-                        'flight_number': f"{segment['paxSegment']['marketingCarrierInfo']['carrierDesigCode']}{segment['paxSegment']['flightNumber']}",
-                        'departure_time': segment['paxSegment']['departure']['aircraftScheduledDateTime'],
-                        'arrival_time': segment['paxSegment']['arrival']['aircraftScheduledDateTime'],
-                        'duration': segment['paxSegment']['duration'],
-                        'baggage': next((ba['checkIn'][0]['allowance'] for ba in offer['offer']['baggageAllowanceList'] if ba['departure'] == segment['paxSegment']['departure']['iatA_LocationCode']), 'N/A')
-                    } for segment in offer['offer']['paxSegmentList']
-                ]
-            })
-
-    # Sort combined results by total fare
-    combined_results.sort(key=lambda x: x['total_fare'])
-
-    return combined_results
\ No newline at end of file
+    offer_lists = [parse_flyhub(flyhub_results), parse_bdfare(bdfare_results)]
+    if deduplicate:
+        offer_lists = [deduplicate_offers(chain.from_iterable(offer_lists))]
+    offers = select_offers(offer_lists, limit=limit)
+    return [offer.to_dict() for offer in offers]
@@ -0,0 +1,325 @@
+import base64
+import os
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from shared import fast_json
+
+# Indexed result sets kept per process, and how long a cursor can keep paging one (seconds)
+FLIGHT_RESULT_INDEX_MAX_ENTRIES = int(
+    os.getenv("FLIGHT_RESULT_INDEX_MAX_ENTRIES", "64")
+)
+FLIGHT_RESULT_INDEX_TTL = float(os.getenv("FLIGHT_RESULT_INDEX_TTL", "900"))
+FLIGHT_RESULTS_PAGE_SIZE = int(os.getenv("FLIGHT_RESULTS_PAGE_SIZE", "50"))
+FLIGHT_RESULTS_MAX_PAGE_SIZE = int(os.getenv("FLIGHT_RESULTS_MAX_PAGE_SIZE", "200"))
+
+SORT_KEYS = ("price", "duration", "departure")
+# Durations that cannot be read sort after every real one
+UNKNOWN_DURATION = 2**31 - 1
+
+
+def _bitmap(positions, size: int) -> int:
+    """An int with the bits at ``positions`` set, built in one pass rather than one big-int OR per bit."""
+    bits = bytearray((size + 7) >> 3)
+    for i in positions:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _range_bitmap(start: int, stop: int) -> int:
+    return ((1 << stop) - 1) ^ ((1 << start) - 1) if stop > start else 0
+
+
+def _minute_of_day(value: str) -> int:
+    """Minutes since midnight of an "HH:MM" time or of an ISO date-time's time part."""
+    time_of_day = value[11:16] if len(value) > 5 else value
+    try:
+        hours, minutes = time_of_day.split(":")
+        minute = int(hours) * 60 + int(minutes)
+    except ValueError:
+        minute = -1
+    if not 0 <= minute < 1440:
+        raise ValueError(f"{value!r} is not an HH:MM time of day")
+    return minute
+
+
+def _departure_minute(departure: str) -> int:
+    try:
+        return _minute_of_day(departure)
+    except ValueError:
+        return 0
+
+
+def _offer_stops(
+    segments: List[Dict[str, Any]], leg_destinations: Sequence[str]
+) -> int:
+    """Most connections on any one leg of the trip; a leg ends on reaching the searched destination."""
+    most = stops = leg = 0
+    for segment in segments[:-1]:
+        if (
+            leg < len(leg_destinations)
+            and segment["destination"] == leg_destinations[leg]
+        ):
+            leg += 1
+            stops = 0
+        else:
+            stops += 1
+            most = max(most, stops)
+    return most
+
+
+def _offer_duration(segments: List[Dict[str, Any]]) -> int:
+    try:
+        return sum(int(segment["duration"]) for segment in segments)
+    except (TypeError, ValueError):
+        return UNKNOWN_DURATION
+
+
+class SearchResultIndex:
+    """
+    One cached search response, indexed for filtering, sorting and paging.
+
+    Built once per result set. Offers keep the response's price order and are
+    referred to by position: each sort key is an array of positions, each
+    filter value a bitmap (an int with one bit per offer), so a query is a few
+    ANDs of bitmaps and a page is a walk along one sorted array. Offers are
+    kept JSON-encoded, and a page is sent by joining them without re-encoding.
+    """
+
+    def __init__(self, body: bytes, leg_destinations: Sequence[str]):
+        response = fast_json.loads(body)
+        offers = sorted(response["results"], key=lambda offer: offer["total_fare"])
+        size = len(offers)
+        self.version = f"{zlib.crc32(body):08x}"
+        self.size = size
+        self.all = (1 << size) - 1
+        self.suppliers = fast_json.dumps(response["suppliers"])
+        self.encoded = [fast_json.dumps(offer) for offer in offers]
+
+        self.fares = array("d", (offer["total_fare"] for offer in offers))
+        durations = [_offer_duration(offer["segments"]) for offer in offers]
+        departures = [
+            offer["segments"][0]["departure_time"][:16].replace(" ", "T")
+            for offer in offers
+        ]
+        # Python's sort is stable, so ties stay cheapest first
+        self.orders = {
+            "price": array("I", range(size)),
+            "duration": array("I", sorted(range(size), key=durations.__getitem__)),
+            "departure": array("I", sorted(range(size), key=departures.__getitem__)),
+        }
+
+        minutes = [_departure_minute(departure) for departure in departures]
+        self._minute_order = array("I", sorted(range(size), key=minutes.__getitem__))
+        self._minutes = array("H", (minutes[i] for i in self._minute_order))
+
+        stops = [_offer_stops(offer["segments"], leg_destinations) for offer in offers]
+        # Bitmap k holds the offers with at most k stops
+        self._max_stops = [
+            _bitmap((i for i, count in enumerate(stops) if count <= k), size)
+            for k in range(max(stops, default=0) + 1)
+        ]
+        airline_positions: Dict[str, List[int]] = {}
+        for i, offer in enumerate(offers):
+            for airline in {
+                segment["flight_number"][:2].upper() for segment in offer["segments"]
+            }:
+                airline_positions.setdefault(airline, []).append(i)
+        self._airlines = {
+            airline: _bitmap(positions, size)
+            for airline, positions in airline_positions.items()
+        }
+        self._refundable = _bitmap(
+            (i for i, offer in enumerate(offers) if offer["is_refundable"]), size
+        )
+
+    def select(
+        self,
+        stops: Optional[int] = None,
+        airlines: Optional[Sequence[str]] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        departure_from: Optional[str] = None,
+        departure_to: Optional[str] = None,
+        refundable: Optional[bool] = None,
+    ) -> int:
+        """Bitmap of the offers matching every given filter; airlines match any segment's carrier."""
+        mask = self.all
+        if stops is not None:
+            mask &= (
+                self._max_stops[min(stops, len(self._max_stops) - 1)]
+                if stops >= 0
+                else 0
+            )
+        if airlines:
+            mask &= self._airline_mask(airlines)
+        if min_price is not None or max_price is not None:
+            # Offers are in price order, so a price range is a contiguous run of positions
+            start = 0 if min_price is None else bisect_left(self.fares, min_price)
+            stop = (
+                self.size if max_price is None else bisect_right(self.fares, max_price)
+            )
+            mask &= _range_bitmap(start, stop)
+        if departure_from is not None or departure_to is not None:
+            mask &= self._departure_mask(
+                _minute_of_day(departure_from or "00:00"),
+                _minute_of_day(departure_to or "23:59"),
+            )
+        if refundable is not None:
+            mask &= self._refundable if refundable else self.all ^ self._refundable
+        return mask
+
+    def _airline_mask(self, airlines: Sequence[str]) -> int:
+        mask = 0
+        for airline in airlines:
+            mask |= self._airlines.get(airline.strip().upper(), 0)
+        return mask
+
+    def _departure_mask(self, first: int, last: int) -> int:
+        # A window such as 22:00-06:00 runs past midnight
+        if first > last:
+            return self._departure_mask(first, 1439) | self._departure_mask(0, last)
+        start, stop = bisect_left(self._minutes, first), bisect_right(
+            self._minutes, last
+        )
+        return _bitmap(self._minute_order[start:stop], self.size)
+
+    def page(
+        self,
+        mask: int,
+        sort: str = "price",
+        start: int = 0,
+        limit: int = FLIGHT_RESULTS_PAGE_SIZE,
+    ) -> Tuple[List[int], int]:
+        """
+        Positions of up to ``limit`` matching offers in ``sort`` order ("-" for
+        descending) from place ``start`` of that order, and the place after the last one.
+        """
+        descending = sort.startswith("-")
+        order = self.orders[sort.lstrip("-")]
+        size = self.size
+        if mask == self.all:
+            stop = min(start + limit, size)
+            return [
+                order[size - 1 - place] if descending else order[place]
+                for place in range(start, stop)
+            ], stop
+
+        bits = mask.to_bytes((size + 7) >> 3, "little")
+        found: List[int] = []
+        place = start
+        while place < size and len(found) < limit:
+            i = order[size - 1 - place] if descending else order[place]
+            if bits[i >> 3] >> (i & 7) & 1:
+                found.append(i)
+            place += 1
+        return found, place
+
+    def render(
+        self, positions: List[int], total: int, next_cursor: Optional[str]
+    ) -> bytes:
+        """A page of results as a search response, from the pre-encoded offers."""
+        return b"".join(
+            (
+                b'{"results":[',
+                b",".join([self.encoded[i] for i in positions]),
+                b'],"suppliers":',
+                self.suppliers,
+                b',"total_results":',
+                str(total).encode(),
+                b',"next_cursor":',
+                fast_json.dumps(next_cursor),
+                b"}",
+            )
+        )
+
+
+def query_key(filters: Dict[str, Any], sort: str) -> str:
+    """Short fingerprint of a filter and sort combination, carried in its cursors."""
+    return f"{zlib.crc32(repr((sorted(filters.items()), sort)).encode()):08x}"
+
+
+def encode_cursor(version: str, query: str, place: int, seen: int) -> str:
+    return (
+        base64.urlsafe_b64encode(f"{version}.{query}.{place}.{seen}".encode())
+        .decode()
+        .rstrip("=")
+    )
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str, int, int]:
+    """
+    (result set version, query key, place in the sort order, matches already
+    returned); raises ValueError for a malformed cursor.
+    """
+    try:
+        version, query, place, seen = (
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            .decode()
+            .split(".")
+        )
+        return version, query, int(place), int(seen)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+class ResultIndexStore:
+    """Recently indexed result sets by search fingerprint, least recently used evicted first."""
+
+    def __init__(
+        self,
+        max_entries: int = FLIGHT_RESULT_INDEX_MAX_ENTRIES,
+        ttl: float = FLIGHT_RESULT_INDEX_TTL,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._indexes: "OrderedDict[str, Tuple[float, SearchResultIndex]]" = (
+            OrderedDict()
+        )
+        self.builds = 0
+        self.evictions = 0
+
+    def get(
+        self, key: str, version: Optional[str] = None
+    ) -> Optional[SearchResultIndex]:
+        """The index for ``key``, if it is still fresh and, given a version, of that result set."""
+        entry = self._indexes.get(key)
+        if (
+            entry is None
+            or entry[0] <= time.monotonic()
+            or (version is not None and entry[1].version != version)
+        ):
+            return None
+        self._indexes.move_to_end(key)
+        return entry[1]
+
+    def index(
+        self, key: str, body: bytes, leg_destinations: Sequence[str]
+    ) -> SearchResultIndex:
+        """The index of ``body``, reusing the one already built for it."""
+        index = self.get(key, f"{zlib.crc32(body):08x}")
+        if index is None:
+            index = SearchResultIndex(body, leg_destinations)
+            self.builds += 1
+            self._indexes[key] = (time.monotonic() + self.ttl, index)
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+                self.evictions += 1
+        return index
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "entries": len(self._indexes),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "builds": self.builds,
+        }
+
+
+result_indexes = ResultIndexStore()
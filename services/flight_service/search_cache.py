@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from shared.cache import CACHE_BACKEND, create_cache
+
+# (days until departure, ttl in seconds): fares close to departure move fastest
+SEARCH_CACHE_TTL_TIERS = (
+    (3, 120),
+    (14, 300),
+    (60, 900),
+)
+SEARCH_CACHE_DEFAULT_TTL = int(os.getenv("FLIGHT_SEARCH_CACHE_DEFAULT_TTL", "1800"))
+FLIGHT_SEARCH_CACHE_BACKEND = os.getenv("FLIGHT_SEARCH_CACHE_BACKEND", CACHE_BACKEND)
+FLIGHT_SEARCH_CACHE_MAX_ENTRIES = int(
+    os.getenv("FLIGHT_SEARCH_CACHE_MAX_ENTRIES", "5000")
+)
+
+
+def _text(value: Any, field: str) -> str:
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be a string")
+    return value.strip()
+
+
+def _canonical_segment(segment: Dict[str, Any]) -> List[str]:
+    if "departure_date" not in segment:
+        raise ValueError("missing departure_date")
+    return [
+        _text(segment.get("origin"), "origin").upper(),
+        _text(segment.get("destination"), "destination").upper(),
+        str(segment["departure_date"]).strip(),
+    ]
+
+
+def _canonical_search(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce search params to the fields that determine supplier results, in a fixed form.
+    Raises ValueError if one of them is missing or not a string.
+    """
+    try:
+        segments, cabin_class, trip_type = (
+            params["segments"],
+            params["cabin_class"],
+            params["trip_type"],
+        )
+    except KeyError as e:
+        raise ValueError(f"missing {e.args[0]}")
+    if not isinstance(segments, list) or not all(
+        isinstance(segment, dict) for segment in segments
+    ):
+        raise ValueError("segments must be a list of objects")
+    airlines = params.get("preferred_airlines", [])
+    if not isinstance(airlines, list):
+        raise ValueError("preferred_airlines must be a list")
+    return {
+        "segments": [_canonical_segment(segment) for segment in segments],
+        "pax": [
+            params.get("adult_count", 1),
+            params.get("child_count", 0),
+            params.get("infant_count", 0),
+        ],
+        "cabin_class": _text(cabin_class, "cabin_class").lower(),
+        "trip_type": _text(trip_type, "trip_type").lower(),
+        "preferred_airlines": sorted(
+            {_text(airline, "preferred_airlines entry").upper() for airline in airlines}
+        ),
+    }
+
+
+def search_fingerprint(params: Dict[str, Any]) -> str:
+    """
+    Stable hash of a flight search; identical searches map to the same key regardless of field order.
+    Raises ValueError for a search missing the fields it is made from.
+    """
+    canonical = json.dumps(
+        _canonical_search(params), sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _parse_date(value: str) -> Optional[date]:
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).date()
+    except ValueError:
+        return None
+
+
+def search_ttl(params: Dict[str, Any], today: Optional[date] = None) -> int:
+    """Cache lifetime for a search, shorter the closer its first departure is."""
+    today = today or date.today()
+    departures = [
+        d
+        for d in (
+            _parse_date(segment["departure_date"]) for segment in params["segments"]
+        )
+        if d
+    ]
+    if not departures:
+        return SEARCH_CACHE_TTL_TIERS[0][1]
+    days_out = (min(departures) - today).days
+    for max_days, ttl in SEARCH_CACHE_TTL_TIERS:
+        if days_out <= max_days:
+            return ttl
+    return SEARCH_CACHE_DEFAULT_TTL
+
+
+search_cache = create_cache(
+    FLIGHT_SEARCH_CACHE_BACKEND,
+    prefix="travel:flights:search:",
+    max_entries=FLIGHT_SEARCH_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,220 @@
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from shared.exceptions import CircuitOpenError, RateLimitExceeded
+from shared.hedging import default_hedge_policy
+from shared.rate_limiter import RateLimiter, create_bucket_store
+
+# Per-supplier timeouts and the overall deadline for a search fan-out (seconds)
+FLYHUB_TIMEOUT = float(os.getenv("FLYHUB_TIMEOUT", "8"))
+BDFARE_TIMEOUT = float(os.getenv("BDFARE_TIMEOUT", "8"))
+FLIGHT_SEARCH_DEADLINE = float(os.getenv("FLIGHT_SEARCH_DEADLINE", "10"))
+# Bookings are sent once and never cancelled, so they get a much longer timeout of their own
+FLIGHT_BOOKING_TIMEOUT = float(os.getenv("FLIGHT_BOOKING_TIMEOUT", "60"))
+
+SUPPLIER_TIMEOUTS = {
+    "flyhub": FLYHUB_TIMEOUT,
+    "bdfare": BDFARE_TIMEOUT,
+}
+
+# Supplier quotas in requests per second (0 disables); calls are spaced out evenly rather than burst
+SUPPLIER_RATE_LIMITS = {
+    "flyhub": float(os.getenv("FLYHUB_RATE_LIMIT", "0")),
+    "bdfare": float(os.getenv("BDFARE_RATE_LIMIT", "0")),
+}
+SUPPLIER_RATE_LIMIT_MAX_WAIT = float(os.getenv("SUPPLIER_RATE_LIMIT_MAX_WAIT", "2"))
+
+_bucket_store = create_bucket_store()
+supplier_rate_limiters = {
+    name: RateLimiter(
+        rate,
+        1,
+        burst=1,
+        mode="wait",
+        max_wait=SUPPLIER_RATE_LIMIT_MAX_WAIT,
+        store=_bucket_store,
+        name=f"supplier:{name}",
+    )
+    for name, rate in SUPPLIER_RATE_LIMITS.items()
+    if rate > 0
+}
+
+
+async def throttle_supplier(supplier: str):
+    """Wait for the supplier's quota; raises RateLimitExceeded if that would take too long."""
+    limiter = supplier_rate_limiters.get(supplier)
+    if limiter is not None:
+        await limiter.aacquire(f"supplier:{supplier}")
+
+
+# Supplier endpoints whose slow calls are hedged with a second request ("supplier:Endpoint", comma separated)
+FLIGHT_HEDGED_ENDPOINTS = frozenset(
+    endpoint.strip()
+    for endpoint in os.getenv(
+        "FLIGHT_HEDGED_ENDPOINTS", "flyhub:AirSearch,bdfare:AirShopping"
+    ).split(",")
+    if endpoint.strip()
+)
+
+
+async def hedge_supplier_call(
+    supplier: str, endpoint: str, send: Callable[[], Awaitable[Any]]
+):
+    """Make a supplier call, hedging it if the endpoint is configured for hedging."""
+    key = f"{supplier}:{endpoint}"
+    if key in FLIGHT_HEDGED_ENDPOINTS:
+        return await default_hedge_policy.run(send, key=key)
+    return await send()
+
+
+class SupplierResult:
+    """Outcome of a single supplier call within a search fan-out."""
+
+    def __init__(
+        self,
+        supplier: str,
+        status: str,
+        payload: Optional[Dict[str, Any]] = None,
+        http_status: Optional[int] = None,
+        error: Optional[str] = None,
+        elapsed: float = 0.0,
+    ):
+        self.supplier = supplier
+        self.status = status  # "ok", "error", "timeout", "throttled" or "unavailable"
+        self.payload = payload
+        self.http_status = http_status
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "http_status": self.http_status,
+            "error": self.error,
+            "elapsed_ms": round(self.elapsed * 1000, 1),
+        }
+
+
+async def _run_supplier(
+    supplier: str, call: Callable[[], Awaitable[Dict[str, Any]]], timeout: float
+) -> SupplierResult:
+    started = time.monotonic()
+    try:
+        payload = await asyncio.wait_for(call(), timeout=timeout)
+        return SupplierResult(
+            supplier,
+            "ok",
+            payload=payload,
+            http_status=200,
+            elapsed=time.monotonic() - started,
+        )
+    except asyncio.TimeoutError:
+        return SupplierResult(
+            supplier,
+            "timeout",
+            error=f"No response within {timeout}s",
+            elapsed=time.monotonic() - started,
+        )
+    except RateLimitExceeded as e:
+        return SupplierResult(
+            supplier, "throttled", error=str(e), elapsed=time.monotonic() - started
+        )
+    except CircuitOpenError as e:
+        return SupplierResult(
+            supplier, "unavailable", error=str(e), elapsed=time.monotonic() - started
+        )
+    except httpx.HTTPStatusError as e:
+        return SupplierResult(
+            supplier,
+            "error",
+            http_status=e.response.status_code,
+            error=f"{supplier} API request failed",
+            elapsed=time.monotonic() - started,
+        )
+    except httpx.HTTPError as e:
+        return SupplierResult(
+            supplier,
+            "error",
+            error=f"{supplier} API request failed: {e!r}",
+            elapsed=time.monotonic() - started,
+        )
+    except Exception as e:
+        # e.g. a failed supplier authentication; never let it discard the other suppliers
+        return SupplierResult(
+            supplier,
+            "error",
+            http_status=getattr(e, "status_code", None),
+            error=f"{supplier} API request failed: {getattr(e, 'detail', e)}",
+            elapsed=time.monotonic() - started,
+        )
+
+
+async def iter_supplier_results(
+    calls: Dict[str, Callable[[], Awaitable[Dict[str, Any]]]],
+    timeouts: Optional[Dict[str, float]] = None,
+    deadline: float = FLIGHT_SEARCH_DEADLINE,
+) -> AsyncIterator[SupplierResult]:
+    """
+    Run every supplier call concurrently and yield each result as soon as it arrives.
+
+    Each call is bounded by its own timeout and the whole fan-out by ``deadline``;
+    suppliers still running at the deadline are cancelled and yielded as timeouts.
+    """
+    timeouts = timeouts or SUPPLIER_TIMEOUTS
+    tasks = {
+        asyncio.ensure_future(
+            _run_supplier(name, call, min(timeouts.get(name, deadline), deadline))
+        ): name
+        for name, call in calls.items()
+    }
+    started = time.monotonic()
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+
+        for task in pending:
+            task.cancel()
+            yield SupplierResult(
+                tasks[task],
+                "timeout",
+                error=f"Search deadline of {deadline}s exceeded",
+                elapsed=time.monotonic() - started,
+            )
+    finally:
+        # Also reached when the consumer stops early, e.g. a streaming client disconnects
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def search_suppliers(
+    calls: Dict[str, Callable[[], Awaitable[Dict[str, Any]]]],
+    timeouts: Optional[Dict[str, float]] = None,
+    deadline: float = FLIGHT_SEARCH_DEADLINE,
+) -> Dict[str, SupplierResult]:
+    """
+    Run every supplier call concurrently and return whatever answered in time.
+
+    A slow or failing supplier never discards the results of the others.
+    """
+    results = {}
+    async for result in iter_supplier_results(calls, timeouts, deadline):
+        results[result.supplier] = result
+    return {name: results[name] for name in calls}
@@ -1,17 +1,18 @@
-from shared.api_client import APIClient
-from shared.auth import OAuth2Handler
+from shared.api_client import AsyncAPIClient
+from shared.auth.oauth2_client import OAuth2Client
+from shared.config import TOKEN_URL
 
-auth_handler = OAuth2Handler(client_id="holiday_client_id", client_secret="holiday_client_secret")
-holiday_api = APIClient(base_url="https://holiday-enterprise-api.com", auth_handler=auth_handler)
+oauth2_client = OAuth2Client(client_id="holiday_client_id", client_secret="holiday_client_secret", token_url=TOKEN_URL)
+holiday_api = AsyncAPIClient(base_url="https://holiday-enterprise-api.com", oauth2_client=oauth2_client)
 
-def search_holiday_packages(destination: str, start_date: str, duration: int):
-    return holiday_api.get("/holidays/search", params={"destination": destination, "start_date": start_date, "duration": duration})
+async def search_holiday_packages(destination: str, start_date: str, duration: int):
+    return await holiday_api.get("/holidays/search", params={"destination": destination, "start_date": start_date, "duration": duration})
 
-def book_holiday_package(package_id: str, traveler_details: dict):
-    return holiday_api.post("/holidays/book", data={"package_id": package_id, "travelers": traveler_details})
+async def book_holiday_package(package_id: str, traveler_details: dict):
+    return await holiday_api.post("/holidays/book", data={"package_id": package_id, "travelers": traveler_details})
 
-def get_holiday_booking_details(booking_id: str):
-    return holiday_api.get(f"/holidays/bookings/{booking_id}")
+async def get_holiday_booking_details(booking_id: str):
+    return await holiday_api.get(f"/holidays/bookings/{booking_id}")
 
-def cancel_holiday_booking(booking_id: str):
-    return holiday_api.delete(f"/holidays/bookings/{booking_id}")
\ No newline at end of file
+async def cancel_holiday_booking(booking_id: str):
+    return await holiday_api.delete(f"/holidays/bookings/{booking_id}")
\ No newline at end of file
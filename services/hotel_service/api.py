@@ -1,17 +1,18 @@
-from shared.api_client import APIClient
-from shared.auth import OAuth2Handler
+from shared.api_client import AsyncAPIClient
+from shared.auth.oauth2_client import OAuth2Client
+from shared.config import TOKEN_URL
 
-auth_handler = OAuth2Handler(client_id="hotel_client_id", client_secret="hotel_client_secret")
-hotel_api = APIClient(base_url="https://hotel-enterprise-api.com", auth_handler=auth_handler)
+oauth2_client = OAuth2Client(client_id="hotel_client_id", client_secret="hotel_client_secret", token_url=TOKEN_URL)
+hotel_api = AsyncAPIClient(base_url="https://hotel-enterprise-api.com", oauth2_client=oauth2_client)
 
-def search_hotels(location: str, check_in: str, check_out: str):
-    return hotel_api.get("/hotels/search", params={"location": location, "check_in": check_in, "check_out": check_out})
+async def search_hotels(location: str, check_in: str, check_out: str):
+    return await hotel_api.get("/hotels/search", params={"location": location, "check_in": check_in, "check_out": check_out})
 
-def book_hotel(hotel_id: str, room_type: str, guest_details: dict):
-    return hotel_api.post("/hotels/book", data={"hotel_id": hotel_id, "room_type": room_type, "guest": guest_details})
+async def book_hotel(hotel_id: str, room_type: str, guest_details: dict):
+    return await hotel_api.post("/hotels/book", data={"hotel_id": hotel_id, "room_type": room_type, "guest": guest_details})
 
-def get_booking_details(booking_id: str):
-    return hotel_api.get(f"/hotels/bookings/{booking_id}")
+async def get_booking_details(booking_id: str):
+    return await hotel_api.get(f"/hotels/bookings/{booking_id}")
 
-def cancel_booking(booking_id: str):
-    return hotel_api.delete(f"/hotels/bookings/{booking_id}")
\ No newline at end of file
+async def cancel_booking(booking_id: str):
+    return await hotel_api.delete(f"/hotels/bookings/{booking_id}")
\ No newline at end of file
@@ -0,0 +1,401 @@
+import asyncio
+import logging
+import os
+import time
+from array import array
+from bisect import bisect_left
+from datetime import date
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from shared.response import error_response, success_response
+
+# Seconds between inventory refreshes from the supplier; 0 disables the index and every search goes to the supplier
+HOTEL_INDEX_REFRESH_INTERVAL = float(os.getenv("HOTEL_INDEX_REFRESH_INTERVAL", "300"))
+# Nights from today covered by the index
+HOTEL_INDEX_HORIZON_DAYS = int(os.getenv("HOTEL_INDEX_HORIZON_DAYS", "365"))
+# Cheapest indexed matches whose prices are confirmed with the supplier before answering
+HOTEL_REPRICE_SHORTLIST = int(os.getenv("HOTEL_REPRICE_SHORTLIST", "10"))
+
+logger = logging.getLogger(__name__)
+
+
+def _location_key(location: str) -> str:
+    return location.strip().lower()
+
+
+def parse_stay(check_in: str, check_out: str) -> Tuple[date, date]:
+    """Check-in and check-out dates of a stay; raises ValueError unless both are YYYY-MM-DD and the stay is a night or more."""
+    try:
+        first, last = date.fromisoformat(check_in), date.fromisoformat(check_out)
+    except (TypeError, ValueError):
+        raise ValueError("check_in and check_out must be YYYY-MM-DD dates")
+    if last <= first:
+        raise ValueError("check_out must be after check_in")
+    return first, last
+
+
+class HotelCalendar:
+    """
+    Availability and nightly rates of one hotel, one slot per night of the index horizon.
+
+    Two derived arrays answer date-range queries without walking the stay:
+    ``sold_out`` lists the nights without rooms in order, so a stay over
+    nights [i, j) is bookable iff the first sold-out night at or after ``i``
+    (found by bisection) is not before ``j``; and ``rate_prefix`` holds running
+    totals of the nightly rates, so the stay costs ``rate_prefix[j] - rate_prefix[i]``.
+    """
+
+    __slots__ = (
+        "hotel_id",
+        "name",
+        "location",
+        "rooms",
+        "rates",
+        "sold_out",
+        "rate_prefix",
+    )
+
+    def __init__(self, hotel_id: str, name: str, location: str, days: int):
+        self.hotel_id = hotel_id
+        self.name = name
+        self.location = location
+        self.rooms = array("i", bytes(4 * days))
+        self.rates = array("d", bytes(8 * days))
+        self.sold_out = array("i", range(days))
+        self.rate_prefix = array("d", bytes(8 * (days + 1)))
+
+    def update(self, nights: Iterable[Tuple[int, int, float]]):
+        for night, rooms, rate in nights:
+            self.rooms[night] = rooms
+            self.rates[night] = rate
+        self._reindex()
+
+    def _reindex(self):
+        self.sold_out = array(
+            "i", [night for night, rooms in enumerate(self.rooms) if rooms <= 0]
+        )
+        self.rate_prefix = array("d", accumulate(self.rates, initial=0.0))
+
+    def stay(self, first_night: int, last_night: int) -> Optional[float]:
+        """Total rate for nights [first_night, last_night), or None if any of them is sold out."""
+        sold_out = self.sold_out
+        position = bisect_left(sold_out, first_night)
+        if position < len(sold_out) and sold_out[position] < last_night:
+            return None
+        return self.rate_prefix[last_night] - self.rate_prefix[first_night]
+
+
+class HotelAvailabilityIndex:
+    """
+    In-memory hotel inventory by location, kept in sync with the supplier.
+
+    The first refresh (and the first one each day, when the horizon moves)
+    loads the full inventory; later ones only fetch hotels changed since the
+    cursor the supplier returned last time. Supplier contract, on the hotel API:
+
+        GET /hotels/inventory?updated_since=<cursor>&page=<page>
+        -> {"hotels": [{"hotel_id", "name", "location", "deleted"?,
+                        "calendar": {"YYYY-MM-DD": {"available": rooms, "rate": nightly rate}}}],
+            "cursor": "...", "next_page": page or null}
+
+    Incremental calendars only carry the nights that changed. Malformed
+    records are logged and skipped; the rest of the refresh still applies.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        horizon_days: int = HOTEL_INDEX_HORIZON_DAYS,
+        refresh_interval: float = HOTEL_INDEX_REFRESH_INTERVAL,
+    ):
+        self._client = client
+        self.horizon_days = horizon_days
+        self.refresh_interval = refresh_interval
+        self.base: Optional[date] = None
+        self.cursor: Optional[str] = None
+        self._hotels: Dict[str, HotelCalendar] = {}
+        self._by_location: Dict[str, Set[str]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.skipped_records = 0
+        self.last_refresh: Optional[float] = None
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            # Imported on first use: the supplier API client pulls in requests, which is slow to import
+            from .api import hotel_api
+
+            self._client = hotel_api
+        return self._client
+
+    @property
+    def ready(self) -> bool:
+        return self.base == date.today()
+
+    def _nights(
+        self,
+        calendar: Dict[str, Dict[str, Any]],
+        base_ordinal: int,
+        day_index: Dict[str, int],
+    ) -> Iterable[Tuple[int, int, float]]:
+        for day, night in calendar.items():
+            # Every hotel has the same dates, so each is only parsed once per refresh
+            index = day_index.get(day)
+            if index is None:
+                index = day_index[day] = (
+                    date.fromisoformat(day).toordinal() - base_ordinal
+                )
+            if 0 <= index < self.horizon_days:
+                yield index, int(night.get("available", 0)), float(
+                    night.get("rate", 0.0)
+                )
+
+    def _parse(
+        self, record: Dict[str, Any], base_ordinal: int, day_index: Dict[str, int]
+    ) -> Tuple[str, bool, Optional[str], Optional[str], List[Tuple[int, int, float]]]:
+        """(hotel_id, deleted, name, location, nights) of one record; raises if the record is malformed."""
+        hotel_id = str(record["hotel_id"])
+        if record.get("deleted"):
+            return hotel_id, True, None, None, []
+        location = record.get("location")
+        if location is not None and not isinstance(location, str):
+            raise TypeError(f"location must be a string, not {type(location).__name__}")
+        nights = list(self._nights(record.get("calendar", {}), base_ordinal, day_index))
+        return hotel_id, False, record.get("name"), location, nights
+
+    def _apply(
+        self,
+        hotels: Dict[str, HotelCalendar],
+        by_location: Dict[str, Set[str]],
+        records: List[Dict[str, Any]],
+        base: date,
+    ):
+        # Every record is checked before any is applied, so applying them cannot fail halfway
+        base_ordinal = base.toordinal()
+        day_index: Dict[str, int] = {}
+        parsed = []
+        for record in records:
+            try:
+                parsed.append(self._parse(record, base_ordinal, day_index))
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                self.skipped_records += 1
+                logger.warning("Skipping malformed hotel inventory record: %r", e)
+
+        for hotel_id, deleted, name, location, nights in parsed:
+            calendar = hotels.get(hotel_id)
+            if deleted:
+                if calendar is not None:
+                    del hotels[hotel_id]
+                    by_location[_location_key(calendar.location)].discard(hotel_id)
+                continue
+            if calendar is None:
+                if location is None:
+                    self.skipped_records += 1
+                    logger.warning(
+                        "Skipping hotel inventory record %s: new hotel without a location",
+                        hotel_id,
+                    )
+                    continue
+                calendar = hotels[hotel_id] = HotelCalendar(
+                    hotel_id, name or "", location, self.horizon_days
+                )
+                by_location.setdefault(_location_key(location), set()).add(hotel_id)
+            elif location is not None and location != calendar.location:
+                by_location[_location_key(calendar.location)].discard(hotel_id)
+                calendar.location = location
+                by_location.setdefault(_location_key(location), set()).add(hotel_id)
+            if name is not None:
+                calendar.name = name
+            calendar.update(nights)
+
+    async def _fetch(
+        self, updated_since: Optional[str]
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        records: List[Dict[str, Any]] = []
+        params: Dict[str, Any] = (
+            {"updated_since": updated_since} if updated_since else {}
+        )
+        while True:
+            response = await self.client.get("/hotels/inventory", params=params)
+            if response.get("status") != "success":
+                raise RuntimeError(
+                    "; ".join(response.get("errors") or ["inventory request failed"])
+                )
+            data = response["data"]
+            records.extend(data.get("hotels", []))
+            if not data.get("next_page"):
+                return records, data.get("cursor")
+            params = {**params, "page": data["next_page"]}
+
+    async def refresh(self) -> bool:
+        """Load the full inventory, or only the changes since the last refresh; False if the supplier failed."""
+        today = date.today()
+        full = self.base != today or self.cursor is None
+        try:
+            records, cursor = await self._fetch(None if full else self.cursor)
+        except Exception as e:
+            self.failures += 1
+            logger.warning("Hotel inventory refresh failed: %s", e)
+            return False
+
+        if full:
+            # Built aside and swapped in, so searches never see a half-loaded index
+            hotels: Dict[str, HotelCalendar] = {}
+            by_location: Dict[str, Set[str]] = {}
+            self._apply(hotels, by_location, records, today)
+            self._hotels, self._by_location, self.base = hotels, by_location, today
+        else:
+            self._apply(self._hotels, self._by_location, records, today)
+        self.cursor = cursor
+        self.refreshes += 1
+        self.last_refresh = time.monotonic()
+        return True
+
+    def query(
+        self, location: str, check_in: str, check_out: str
+    ) -> List[Tuple[HotelCalendar, float]]:
+        """Hotels in ``location`` with rooms every night of the stay, cheapest first."""
+        if self.base is None:
+            return []
+        base_ordinal = self.base.toordinal()
+        first_night = date.fromisoformat(check_in).toordinal() - base_ordinal
+        last_night = date.fromisoformat(check_out).toordinal() - base_ordinal
+        if (
+            first_night < 0
+            or last_night > self.horizon_days
+            or first_night >= last_night
+        ):
+            return []
+
+        matches = []
+        for hotel_id in self._by_location.get(_location_key(location), ()):
+            calendar = self._hotels[hotel_id]
+            total = calendar.stay(first_night, last_night)
+            if total is not None:
+                matches.append((calendar, total))
+        matches.sort(key=lambda match: match[1])
+        return matches
+
+    async def _refresh_periodically(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                # Keep the last good index and try again next interval
+                self.failures += 1
+                logger.exception("Hotel inventory refresh failed")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        if self.refresh_interval > 0 and self._task is None:
+            self._task = asyncio.ensure_future(self._refresh_periodically())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hotels": len(self._hotels),
+            "locations": len(self._by_location),
+            "ready": self.ready,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "skipped_records": self.skipped_records,
+            "seconds_since_refresh": (
+                round(time.monotonic() - self.last_refresh, 1)
+                if self.last_refresh is not None
+                else None
+            ),
+        }
+
+
+async def _reprice(
+    client: Any,
+    shortlist: List[Tuple[HotelCalendar, float]],
+    check_in: str,
+    check_out: str,
+) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Live rates for the shortlisted hotels, in one supplier call:
+
+        POST /hotels/rates {"hotel_ids", "check_in", "check_out"}
+        -> {"rates": {hotel_id: {"available": bool, "total": price}}}
+    """
+    response = await client.post(
+        "/hotels/rates",
+        data={
+            "hotel_ids": [calendar.hotel_id for calendar, _ in shortlist],
+            "check_in": check_in,
+            "check_out": check_out,
+        },
+    )
+    if response.get("status") != "success":
+        return None
+    return response["data"].get("rates", {})
+
+
+def _hotel(calendar: HotelCalendar, total: float, priced: str) -> Dict[str, Any]:
+    return {
+        "hotel_id": calendar.hotel_id,
+        "name": calendar.name,
+        "location": calendar.location,
+        "total": round(total, 2),
+        "priced": priced,
+    }
+
+
+async def search_available_hotels(
+    location: str,
+    check_in: str,
+    check_out: str,
+    index: Optional[HotelAvailabilityIndex] = None,
+    shortlist_size: int = HOTEL_REPRICE_SHORTLIST,
+) -> Dict[str, Any]:
+    """
+    Hotel search served from the availability index.
+
+    Only the cheapest ``shortlist_size`` matches are re-priced with the
+    supplier; the rest keep their indexed prices ("priced": "indexed"). Falls
+    back to the supplier's own search until the index has loaded. Raises
+    ValueError for malformed dates, whichever way the search goes.
+    """
+    parse_stay(check_in, check_out)
+    index = index or hotel_index
+    if not index.ready:
+        from .api import search_hotels
+
+        try:
+            return await search_hotels(location, check_in, check_out)
+        except Exception as e:
+            logger.warning("Hotel supplier search failed: %r", e)
+            return error_response(f"API request failed: {e}")
+
+    matches = index.query(location, check_in, check_out)
+    shortlist, rest = matches[:shortlist_size], matches[shortlist_size:]
+    live_rates = (
+        await _reprice(index.client, shortlist, check_in, check_out)
+        if shortlist
+        else {}
+    )
+
+    hotels = []
+    for calendar, total in shortlist:
+        if live_rates is None:
+            # Re-pricing failed: indexed prices are better than no answer
+            hotels.append(_hotel(calendar, total, "indexed"))
+            continue
+        live = live_rates.get(calendar.hotel_id)
+        if live is not None and live.get("available"):
+            hotels.append(_hotel(calendar, float(live["total"]), "live"))
+    hotels.sort(key=lambda hotel: hotel["total"])
+    hotels.extend(_hotel(calendar, total, "indexed") for calendar, total in rest)
+    return success_response({"hotels": hotels, "source": "index"})
+
+
+hotel_index = HotelAvailabilityIndex()
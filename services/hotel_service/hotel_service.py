@@ -1,7 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from .availability_index import search_available_hotels
 
 router = APIRouter()
 
 @router.get("/hotels/search")
-async def search_hotels():
-    return {"message": "Hotel search endpoint"}
\ No newline at end of file
+async def search_hotels(location: str, check_in: str, check_out: str):
+    """Hotels with rooms for the whole stay, from the local availability index once it has loaded."""
+    try:
+        return await search_available_hotels(location, check_in, check_out)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
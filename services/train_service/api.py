@@ -1,17 +1,18 @@
-from shared.api_client import APIClient
-from shared.auth import OAuth2Handler
+from shared.api_client import AsyncAPIClient
+from shared.auth.oauth2_client import OAuth2Client
+from shared.config import TOKEN_URL
 
-auth_handler = OAuth2Handler(client_id="train_client_id", client_secret="train_client_secret")
-train_api = APIClient(base_url="https://train-enterprise-api.com", auth_handler=auth_handler)
+oauth2_client = OAuth2Client(client_id="train_client_id", client_secret="train_client_secret", token_url=TOKEN_URL)
+train_api = AsyncAPIClient(base_url="https://train-enterprise-api.com", oauth2_client=oauth2_client)
 
-def search_train_routes(origin: str, destination: str, date: str):
-    return train_api.get("/trains/search", params={"origin": origin, "destination": destination, "date": date})
+async def search_train_routes(origin: str, destination: str, date: str):
+    return await train_api.get("/trains/search", params={"origin": origin, "destination": destination, "date": date})
 
-def book_train_ticket(route_id: str, passenger_details: dict):
-    return train_api.post("/trains/book", data={"route_id": route_id, "passenger": passenger_details})
+async def book_train_ticket(route_id: str, passenger_details: dict):
+    return await train_api.post("/trains/book", data={"route_id": route_id, "passenger": passenger_details})
 
-def get_train_booking_details(booking_id: str):
-    return train_api.get(f"/trains/bookings/{booking_id}")
+async def get_train_booking_details(booking_id: str):
+    return await train_api.get(f"/trains/bookings/{booking_id}")
 
-def cancel_train_booking(booking_id: str):
-    return train_api.delete(f"/trains/bookings/{booking_id}")
\ No newline at end of file
+async def cancel_train_booking(booking_id: str):
+    return await train_api.delete(f"/trains/bookings/{booking_id}")
\ No newline at end of file
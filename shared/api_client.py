@@ -1,8 +1,14 @@
+import httpx
 import requests
 from shared.auth.oauth2_client import OAuth2Client
-from typing import Dict, Any, Optional
-from .exceptions import APIException
-from .retry import retry_with_backoff
+from typing import Dict, Any, Iterable, Optional
+from .exceptions import APIException, CircuitOpenError
+from .circuit_breaker import circuit_breakers
+from .retry import default_retry_policy, IDEMPOTENT_METHODS
+from .hedging import default_hedge_policy
+from .metrics import track_upstream, upstream_name
+from .http_clients import http_clients
+from . import fast_json
 from .response import success_response, error_response
 from .config import API_KEY  # If using environment variables
 from .secrets_manager import get_secret  # If using AWS Secrets Manager
@@ -20,9 +26,9 @@ class APIClient:
         self.oauth2_client = oauth2_client
         self.session = requests.Session()
         self.api_key = API_KEY
+        self.retry_policy = default_retry_policy
 
 
-    @retry_with_backoff(retries=3, backoff_in_seconds=1)
     def _make_request(self, method: str, endpoint: str, data: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         url = f"{self.base_url}{endpoint}"
         headers = {
@@ -31,10 +37,18 @@ class APIClient:
             # "API-Key": get_secret('your_api_key_secret_name')  # If using AWS Secrets Manager
         }
 
+        def attempt(timeout: float) -> requests.Response:
+            # Calls to a host whose circuit is open fail fast instead of waiting on it
+            with circuit_breakers.get(self.base_url).protect(), track_upstream(upstream_name(self.base_url)):
+                response = self.session.request(method, url, json=data, params=params, headers=headers, timeout=timeout)
+                response.raise_for_status()
+                return response
+
         try:
-            response = self.session.request(method, url, json=data, params=params, headers=headers)
-            response.raise_for_status()
+            response = self.retry_policy.execute(attempt, method, key=self.base_url)
             return success_response(response.json())
+        except CircuitOpenError as e:
+            return error_response(f"API request failed: {str(e)}")
         except requests.RequestException as e:
             return error_response(f"API request failed: {str(e)}")
         
@@ -56,8 +70,79 @@ class APIClient:
         return self._make_request("DELETE", endpoint)
 
     def _is_valid_url(self, url: str) -> bool:
+        return _is_valid_url(url)
+
+
+class AsyncAPIClient:
+    """
+    Non-blocking counterpart of APIClient for use from async routers.
+
+    Requests go through the application's pooled httpx clients and return the
+    same standard response envelope as APIClient. Idempotent requests to
+    ``hedged_endpoints`` are hedged when they run slower than usual.
+    """
+
+    def __init__(self, base_url: str, oauth2_client: OAuth2Client, http_client: Optional[httpx.AsyncClient] = None,
+                 hedged_endpoints: Optional[Iterable[str]] = None):
+        if not _is_valid_url(base_url):
+            raise ValueError("Invalid base URL format")
+
+        self.base_url = base_url.rstrip('/')
+        self.oauth2_client = oauth2_client
+        self.api_key = API_KEY
+        self.retry_policy = default_retry_policy
+        self.hedge_policy = default_hedge_policy
+        self.hedged_endpoints = frozenset(hedged_endpoints or ())
+        self._http_client = http_client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._http_client or http_clients.get(self.base_url)
+
+    async def _send(self, method: str, url: str, hedge: bool = False, **kwargs) -> httpx.Response:
+        async def attempt(timeout: float) -> httpx.Response:
+            async def send() -> httpx.Response:
+                async with circuit_breakers.get(self.base_url).protect(), track_upstream(upstream_name(self.base_url)):
+                    response = await self.client.request(method, url, timeout=timeout, **kwargs)
+                    response.raise_for_status()
+                    return response
+
+            if hedge:
+                return await self.hedge_policy.run(send, key=f"{method} {url}")
+            return await send()
+
+        return await self.retry_policy.aexecute(attempt, method, key=self.base_url)
+
+    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        url = f"{self.base_url}{endpoint}"
+        headers = {
+            "Authorization": f"Bearer {await self.oauth2_client.aget_access_token()}",
+            "API-Key": API_KEY
+        }
+
         try:
-            result = urlparse(url)
-            return all([result.scheme in ['http', 'https'], result.netloc])
-        except:
-            return False
+            hedge = method in IDEMPOTENT_METHODS and endpoint in self.hedged_endpoints
+            response = await self._send(method, url, hedge=hedge, json=data, params=params, headers=headers)
+            return success_response(fast_json.loads(response.content))
+        except (httpx.HTTPError, CircuitOpenError, ValueError) as e:
+            return error_response(f"API request failed: {str(e)}")
+
+    async def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return await self._make_request("GET", endpoint, params=params)
+
+    async def post(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._make_request("POST", endpoint, data=data)
+
+    async def put(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._make_request("PUT", endpoint, data=data)
+
+    async def delete(self, endpoint: str) -> Dict[str, Any]:
+        return await self._make_request("DELETE", endpoint)
+
+
+def _is_valid_url(url: str) -> bool:
+    try:
+        result = urlparse(url)
+        return all([result.scheme in ['http', 'https'], result.netloc])
+    except:
+        return False
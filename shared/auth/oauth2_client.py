@@ -1,7 +1,11 @@
+import asyncio
+import logging
+import threading
 import requests
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
-from ..config import API_KEY, CLIENT_SECRET  # If using environment variables
+from ..config import API_KEY, CLIENT_SECRET, TOKEN_REFRESH_SKEW  # If using environment variables
+from ..metrics import TOKEN_REFRESHES, upstream_name
 
 try:
     from ..secrets_manager import get_secret  # Optional AWS Secrets Manager
@@ -9,13 +13,20 @@ except ImportError:
     def get_secret(name: str) -> str:
         return "dummy_secret_for_testing"
 
+logger = logging.getLogger(__name__)
+
 class OAuth2Client:
-    def __init__(self, client_id: str, client_secret: str, token_url: str):
+    def __init__(self, client_id: str, client_secret: str, token_url: str, refresh_skew: float = TOKEN_REFRESH_SKEW):
         self.client_id = client_id
         self.client_secret = client_secret
         self.token_url = token_url
+        self.refresh_skew = timedelta(seconds=refresh_skew)
         self._access_token = None
         self._token_expires_at = None
+        # Serializes token fetches so concurrent callers never hit the token endpoint twice
+        self._lock = threading.Lock()
+        self._refresh_guard = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
 
     def _fetch_new_token(self) -> Dict[str, Any]:
         data = {
@@ -27,19 +38,59 @@ class OAuth2Client:
         response.raise_for_status()
         return response.json()
 
+    def _store_token(self, token_data: Dict[str, Any]):
+        self._token_expires_at = datetime.now() + timedelta(seconds=token_data['expires_in'])
+        self._access_token = token_data['access_token']
+        TOKEN_REFRESHES.labels(upstream_name(self.token_url)).inc()
+
+    def _has_usable_token(self) -> bool:
+        return self._access_token is not None and self._token_expires_at is not None and datetime.now() < self._token_expires_at
+
     def get_access_token(self) -> str:
-        if self._access_token is None or self._token_expires_at is None or datetime.now() >= self._token_expires_at:
-            token_data = self._fetch_new_token()
-            self._access_token = token_data['access_token']
-            self._token_expires_at = datetime.now() + timedelta(seconds=token_data['expires_in'])
-        return self._access_token
+        if self._has_usable_token():
+            # Still valid: serve it and refresh in the background once it nears expiry
+            token = self._access_token
+            if self.is_token_expired():
+                self._start_background_refresh()
+            return token
+
+        # No usable token; block, but let only one thread fetch a new one
+        with self._lock:
+            if not self._has_usable_token():
+                self._store_token(self._fetch_new_token())
+            return self._access_token
+
+    async def aget_access_token(self) -> str:
+        """Async variant of get_access_token; a blocking fetch runs off the event loop."""
+        if self._has_usable_token():
+            return self.get_access_token()
+        return await asyncio.to_thread(self.get_access_token)
 
     def refresh_token(self):
-        # Implementation for refreshing the access token
-        pass
+        """Fetch a new access token, unless another thread already refreshed it."""
+        with self._lock:
+            if self._access_token is None or self.is_token_expired():
+                self._store_token(self._fetch_new_token())
+
+    def is_token_expired(self) -> bool:
+        """True if there is no token or it expires within the refresh skew."""
+        if self._access_token is None or self._token_expires_at is None:
+            return True
+        return datetime.now() >= self._token_expires_at - self.refresh_skew
+
+    def _start_background_refresh(self):
+        # Separate guard: the refresh thread holds self._lock while it fetches
+        with self._refresh_guard:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self._background_refresh, daemon=True)
+            self._refresh_thread.start()
 
-    def is_token_expired(self):
-        # Check if the current token is expired or about to expire
-        pass
+    def _background_refresh(self):
+        try:
+            self.refresh_token()
+        except (requests.RequestException, KeyError, ValueError) as e:
+            # Keep serving the current token; the next caller near expiry retries
+            logger.warning("Background OAuth2 token refresh failed: %s", e)
 
     # Additional methods as needed
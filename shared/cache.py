@@ -0,0 +1,165 @@
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from . import fast_json
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Seconds a Redis call may take before the cache is skipped for that request
+CACHE_REDIS_TIMEOUT = float(os.getenv("CACHE_REDIS_TIMEOUT", "0.5"))
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryCacheBackend:
+    """Size-bounded LRU cache with per-entry expiry, local to this process."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+        }
+
+
+class RedisCacheBackend:
+    """
+    Cache stored in Redis (or anything speaking the Redis protocol), shared by all replicas.
+
+    Size bounds and LRU eviction are left to the server's ``maxmemory-policy``.
+    Bytes values are stored untouched, anything else as JSON; a one-byte tag
+    tells them apart on the way back.
+    """
+
+    def __init__(
+        self,
+        url: str = REDIS_URL,
+        prefix: str = "travel:cache:",
+        client: Any = None,
+        timeout: float = CACHE_REDIS_TIMEOUT,
+    ):
+        if client is None:
+            import redis.asyncio as redis  # Optional dependency, only needed for this backend
+
+            client = redis.from_url(
+                url, socket_timeout=timeout, socket_connect_timeout=timeout
+            )
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        if raw[:1] == b"b":
+            return raw[1:]
+        return fast_json.loads(raw[1:])
+
+    async def set(self, key: str, value: Any, ttl: float):
+        raw = (
+            b"b" + value if isinstance(value, bytes) else b"j" + fast_json.dumps(value)
+        )
+        await self.client.set(self.prefix + key, raw, px=max(int(ttl * 1000), 1))
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", "prefix": self.prefix}
+
+
+class Cache:
+    """
+    Backend-agnostic cache front that keeps hit/miss counters.
+
+    The cache is best-effort: a backend error (Redis down or timing out) is
+    logged and counted, reads then count as misses and writes are dropped, so
+    callers fall through to the upstream call instead of failing.
+    """
+
+    def __init__(self, backend: Any):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _failed(self, operation: str, key: str, e: Exception):
+        self.errors += 1
+        logger.warning("Cache %s of %s failed: %r", operation, key, e)
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            self._failed("get", key, e)
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        try:
+            await self.backend.set(key, value, ttl)
+        except Exception as e:
+            self._failed("set", key, e)
+
+    async def delete(self, key: str):
+        try:
+            await self.backend.delete(key)
+        except Exception as e:
+            self._failed("delete", key, e)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            **self.backend.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def create_cache(
+    backend: str = CACHE_BACKEND,
+    prefix: str = "travel:cache:",
+    max_entries: int = CACHE_MAX_ENTRIES,
+) -> Cache:
+    if backend == "memory":
+        return Cache(InMemoryCacheBackend(max_entries=max_entries))
+    if backend == "redis":
+        return Cache(RedisCacheBackend(prefix=prefix))
+    raise ValueError(f"Unknown cache backend: {backend}")
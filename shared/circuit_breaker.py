@@ -0,0 +1,269 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from .exceptions import CircuitOpenError
+
+# Default thresholds, applied to every upstream host unless overridden
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+CIRCUIT_SLOW_CALL_RATE = float(os.getenv("CIRCUIT_SLOW_CALL_RATE", "0.8"))
+CIRCUIT_SLOW_CALL_DURATION = float(os.getenv("CIRCUIT_SLOW_CALL_DURATION", "5"))
+CIRCUIT_WINDOW = float(os.getenv("CIRCUIT_WINDOW", "30"))
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "10"))
+CIRCUIT_OPEN_DURATION = float(os.getenv("CIRCUIT_OPEN_DURATION", "30"))
+CIRCUIT_HALF_OPEN_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_CALLS", "3"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def is_failure(exc: Optional[BaseException]) -> bool:
+    """
+    Whether an exception says something about the upstream's health.
+
+    Responses below 500 (bad requests, auth errors, not found) mean the
+    upstream is up and answering, so they do not count against it.
+    """
+    if exc is None:
+        return False
+    status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    if status_code is None:
+        status_code = getattr(exc, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code >= 500
+    return True
+
+
+class _Call:
+    """Records the outcome of one protected call; usable with ``with`` and ``async with``."""
+
+    def __init__(self, breaker: "CircuitBreaker"):
+        self.breaker = breaker
+        self.started = None
+        self.probe = None
+
+    def __enter__(self):
+        self.probe = self.breaker.before_call()
+        self.started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.monotonic() - self.started
+        if isinstance(exc, (asyncio.CancelledError, GeneratorExit)):
+            # A cancelled call (hedge loser, deadline, client gone) only tells us how slow it was
+            self.breaker.cancelled_call(elapsed, self.probe)
+        else:
+            self.breaker.after_call(elapsed, is_failure(exc))
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker for a single upstream.
+
+    Outcomes are kept over a rolling time window. Once the window holds at
+    least ``min_calls`` calls and either the failure rate or the share of calls
+    slower than ``slow_call_duration`` reaches its threshold, the circuit opens
+    and calls are rejected with CircuitOpenError without touching the network.
+    After ``open_duration`` up to ``half_open_calls`` trial calls are let
+    through; if they all succeed in time the circuit closes again, otherwise
+    it re-opens.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = CIRCUIT_FAILURE_RATE,
+        slow_call_rate: float = CIRCUIT_SLOW_CALL_RATE,
+        slow_call_duration: float = CIRCUIT_SLOW_CALL_DURATION,
+        window: float = CIRCUIT_WINDOW,
+        min_calls: int = CIRCUIT_MIN_CALLS,
+        open_duration: float = CIRCUIT_OPEN_DURATION,
+        half_open_calls: int = CIRCUIT_HALF_OPEN_CALLS,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.slow_call_duration = slow_call_duration
+        self.window = window
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.times_opened = 0
+        self._outcomes = deque()  # (finished_at, failed, slow)
+        self._probes_started = 0
+        self._probes_succeeded = 0
+        # Bumped on every state change, so a probe slot is only handed back to the episode it came from
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def protect(self) -> _Call:
+        """Guard a call: ``async with breaker.protect(): ...``."""
+        return _Call(self)
+
+    def before_call(self) -> Optional[int]:
+        """
+        Raise CircuitOpenError if the call must not go out. Returns an id of
+        the half-open episode for a trial call, None otherwise.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now - self.opened_at < self.open_duration:
+                    self.rejected += 1
+                    raise CircuitOpenError(
+                        self.name,
+                        retry_after=self.open_duration - (now - self.opened_at),
+                    )
+                self._transition(HALF_OPEN, now)
+            if self.state == HALF_OPEN:
+                if self._probes_started >= self.half_open_calls:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, retry_after=0.0)
+                self._probes_started += 1
+                return self._generation
+            return None
+
+    def cancelled_call(self, elapsed: float, probe: Optional[int] = None):
+        """
+        Record a call cancelled before it finished. Only a slow one says anything
+        about the upstream and is recorded as such; a quick one is neutral: it
+        frees its trial slot without counting as a success or entering the window.
+        """
+        if elapsed >= self.slow_call_duration:
+            self.after_call(elapsed, False)
+            return
+        with self._lock:
+            if (
+                probe is not None
+                and probe == self._generation
+                and self.state == HALF_OPEN
+            ):
+                self._probes_started -= 1
+
+    def after_call(self, elapsed: float, failed: bool):
+        with self._lock:
+            now = time.monotonic()
+            slow = elapsed >= self.slow_call_duration
+            if self.state == HALF_OPEN:
+                if failed or slow:
+                    self._transition(OPEN, now)
+                else:
+                    self._probes_succeeded += 1
+                    if self._probes_succeeded >= self.half_open_calls:
+                        self._transition(CLOSED, now)
+                return
+            if self.state == OPEN:
+                # Started before the circuit opened; the decision has already been made
+                return
+
+            self._outcomes.append((now, failed, slow))
+            self._prune(now)
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for _, call_failed, _ in self._outcomes if call_failed)
+            slow_calls = sum(1 for _, _, call_slow in self._outcomes if call_slow)
+            if (
+                failures / calls >= self.failure_rate
+                or slow_calls / calls >= self.slow_call_rate
+            ):
+                self._transition(OPEN, now)
+
+    def _prune(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def _transition(self, state: str, now: float):
+        self.state = state
+        self._generation += 1
+        self._probes_started = 0
+        self._probes_succeeded = 0
+        if state == OPEN:
+            self.opened_at = now
+            self.times_opened += 1
+        if state != OPEN:
+            self._outcomes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            calls = len(self._outcomes)
+            failures = sum(1 for _, failed, _ in self._outcomes if failed)
+            slow_calls = sum(1 for _, _, slow in self._outcomes if slow)
+            state = self.state
+            if state == OPEN and now - self.opened_at >= self.open_duration:
+                state = HALF_OPEN  # The next call will be a trial call
+            return {
+                "state": state,
+                "calls": calls,
+                "failure_rate": round(failures / calls, 3) if calls else 0.0,
+                "slow_call_rate": round(slow_calls / calls, 3) if calls else 0.0,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+                "retry_after": (
+                    round(max(self.open_duration - (now - self.opened_at), 0.0), 1)
+                    if state == OPEN
+                    else 0.0
+                ),
+            }
+
+
+class CircuitBreakerRegistry:
+    """One CircuitBreaker per upstream host, created on first use."""
+
+    def __init__(self, **defaults: Any):
+        self._defaults = defaults
+        self._overrides: Dict[str, Dict[str, Any]] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, url: str, **settings: Any):
+        """Override thresholds for a single host; applies to breakers created afterwards."""
+        self._overrides.setdefault(_origin(url), {}).update(settings)
+
+    def get(self, url: str) -> CircuitBreaker:
+        origin = _origin(url)
+        breaker = self._breakers.get(origin)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(origin)
+                if breaker is None:
+                    settings = {**self._defaults, **self._overrides.get(origin, {})}
+                    breaker = self._breakers[origin] = CircuitBreaker(
+                        origin, **settings
+                    )
+        return breaker
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            origin: breaker.stats() for origin, breaker in list(self._breakers.items())
+        }
+
+
+circuit_breakers = CircuitBreakerRegistry()
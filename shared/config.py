@@ -1,8 +1,10 @@
-from dotenv import load_dotenv
 import os
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from a .env file, if there is one; deployments set them directly
+DOTENV_PATH = os.getenv('DOTENV_PATH', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
+if os.path.isfile(DOTENV_PATH):
+    from dotenv import load_dotenv
+    load_dotenv(DOTENV_PATH)
 
 # Get environment variables with fallbacks
 API_KEY = os.getenv('API_KEY', 'default_api_key')
@@ -11,3 +13,14 @@ CLIENT_ID = os.getenv('CLIENT_ID', 'default_client_id')
 TOKEN_URL = os.getenv('TOKEN_URL', 'https://api.example.com/oauth/token')
 BASE_URL = os.getenv('BASE_URL', 'https://api.example.com')
 
+# Refresh OAuth2 access tokens this many seconds before they expire
+TOKEN_REFRESH_SKEW = float(os.getenv('TOKEN_REFRESH_SKEW', '60'))
+
+# Per-client request limit at the gateway, in requests per second (0 disables)
+CLIENT_RATE_LIMIT = float(os.getenv('CLIENT_RATE_LIMIT', '0'))
+CLIENT_RATE_LIMIT_BURST = float(os.getenv('CLIENT_RATE_LIMIT_BURST', '0')) or CLIENT_RATE_LIMIT * 2
+# API keys issued to clients, comma separated; requests without a known key are limited per IP address
+CLIENT_API_KEYS = frozenset(key.strip() for key in os.getenv('CLIENT_API_KEYS', '').split(',') if key.strip())
+
+# Service routers mounted by this deployment, e.g. "flights,hotels" (empty: all of them)
+ENABLED_SERVICES = [name.strip() for name in os.getenv('ENABLED_SERVICES', '').split(',') if name.strip()]
@@ -1,2 +1,16 @@
 class APIException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class RateLimitExceeded(APIException):
+    def __init__(self, key: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded for {key}")
+        self.key = key
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(APIException):
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"Circuit open for {upstream}")
+        self.upstream = upstream
+        self.retry_after = retry_after
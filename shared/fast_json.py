@@ -0,0 +1,21 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson  # Optional: several times faster than the stdlib for large payloads
+except ImportError:
+    orjson = None
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Decode JSON straight from response bytes, without an intermediate str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
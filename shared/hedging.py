@@ -0,0 +1,152 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .retry import RetryBudget
+
+# Hedging defaults; which calls are hedged is decided by each caller
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.05"))
+HEDGE_WINDOW = int(os.getenv("HEDGE_WINDOW", "200"))
+HEDGE_BUDGET_RATIO = float(os.getenv("HEDGE_BUDGET_RATIO", "0.1"))
+HEDGE_BUDGET_INITIAL = float(os.getenv("HEDGE_BUDGET_INITIAL", "5"))
+
+
+class LatencyTracker:
+    """Latencies of the most recent successful calls to one endpoint."""
+
+    def __init__(self, window: int = HEDGE_WINDOW):
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        return samples[max(math.ceil(p * len(samples)) - 1, 0)]
+
+
+class _EndpointHedging:
+    def __init__(self, window: int, budget: RetryBudget):
+        self.latency = LatencyTracker(window)
+        self.budget = budget
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+
+class HedgePolicy:
+    """
+    Hedges slow calls by sending a second, identical one.
+
+    If a call has not completed within the endpoint's rolling ``percentile``
+    latency, the same call is started again and whichever succeeds first wins;
+    the other is cancelled. Until ``min_samples`` latencies are known nothing
+    is hedged. Hedges are drawn from a per-endpoint budget (a RetryBudget
+    filled at ``budget_ratio`` per call), so at most that fraction of traffic
+    is duplicated. Only use it for idempotent calls.
+    """
+
+    def __init__(
+        self,
+        percentile: float = HEDGE_PERCENTILE,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        min_delay: float = HEDGE_MIN_DELAY,
+        window: int = HEDGE_WINDOW,
+        budget_ratio: float = HEDGE_BUDGET_RATIO,
+        budget_initial: float = HEDGE_BUDGET_INITIAL,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.window = window
+        self.budget_ratio = budget_ratio
+        self.budget_initial = budget_initial
+        self._endpoints: Dict[str, _EndpointHedging] = {}
+
+    def _endpoint(self, key: str) -> _EndpointHedging:
+        endpoint = self._endpoints.get(key)
+        if endpoint is None:
+            endpoint = self._endpoints.setdefault(
+                key,
+                _EndpointHedging(
+                    self.window, RetryBudget(self.budget_ratio, self.budget_initial)
+                ),
+            )
+        return endpoint
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """How long to wait before hedging a call to ``key``, or None while it is not known yet."""
+        latency = self._endpoint(key).latency
+        if len(latency) < self.min_samples:
+            return None
+        return max(latency.percentile(self.percentile), self.min_delay)
+
+    async def run(self, func: Callable[[], Awaitable[Any]], key: str) -> Any:
+        endpoint = self._endpoint(key)
+        endpoint.requests += 1
+        endpoint.budget.deposit()
+        delay = self.hedge_delay(key)
+
+        async def timed():
+            begin = time.monotonic()
+            result = await func()
+            endpoint.latency.record(time.monotonic() - begin)
+            return result
+
+        primary = asyncio.ensure_future(timed())
+        hedge = None
+        pending = {primary}
+        try:
+            if delay is not None:
+                done, pending = await asyncio.wait(pending, timeout=delay)
+                if done:
+                    return primary.result()
+                if endpoint.budget.withdraw():
+                    endpoint.hedged += 1
+                    hedge = asyncio.ensure_future(timed())
+                    pending.add(hedge)
+
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            endpoint.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            # Every attempt failed; surface the last failure
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        stats = {}
+        for key, endpoint in list(self._endpoints.items()):
+            delay = self.hedge_delay(key)
+            stats[key] = {
+                "requests": endpoint.requests,
+                "hedged": endpoint.hedged,
+                "hedge_wins": endpoint.hedge_wins,
+                "budget_exhausted": endpoint.budget.exhausted,
+                "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None,
+            }
+        return stats
+
+
+default_hedge_policy = HedgePolicy()
@@ -0,0 +1,176 @@
+import importlib.util
+import os
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+# Connection pool settings applied to every supplier host unless overridden
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20"))
+HTTP_POOL_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "30"))
+HTTP_CLIENT_TIMEOUT = float(os.getenv("HTTP_CLIENT_TIMEOUT", "10"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+# HTTP/2 needs the optional ``h2`` package (``pip install httpx[http2]``)
+H2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+class _CountedStream(httpx.AsyncByteStream):
+    """A response body that reports once when it has been closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, finished: Callable[[], None]):
+        self._stream = stream
+        self._finished: Optional[Callable[[], None]] = finished
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            finished, self._finished = self._finished, None
+            if finished is not None:
+                finished()
+
+
+class CountingTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps a transport to count requests in flight, from sending until the
+    response body is closed, using only httpx's public transport API.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+        self.in_flight = 0
+        self.requests = 0
+
+    def _finished(self):
+        self.in_flight -= 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.requests += 1
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            self.in_flight -= 1
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_CountedStream(response.stream, self._finished),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def _pool_connections(
+    transport: CountingTransport,
+) -> Tuple[Optional[int], Optional[int]]:
+    """(open, idle) connections, read from httpcore's pool; (None, None) if a newer httpx hides them."""
+    try:
+        connections = list(transport.transport._pool.connections)
+        return len(connections), sum(
+            1 for connection in connections if connection.is_idle()
+        )
+    except Exception:
+        return None, None
+
+
+class HTTPClientRegistry:
+    """
+    Long-lived pooled ``httpx.AsyncClient`` instances, one per upstream host.
+
+    Clients are created lazily on first use and reused for the lifetime of the
+    application, so DNS lookups, TCP connects and TLS handshakes are paid once
+    per connection instead of once per request.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = HTTP_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections: int = HTTP_POOL_MAX_KEEPALIVE,
+        keepalive_expiry: float = HTTP_POOL_KEEPALIVE_EXPIRY,
+        timeout: float = HTTP_CLIENT_TIMEOUT,
+        http2: bool = HTTP2_ENABLED,
+    ):
+        self._defaults = {
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive_connections,
+            "keepalive_expiry": keepalive_expiry,
+            "timeout": timeout,
+            "http2": http2,
+        }
+        self._overrides: Dict[str, Dict[str, Any]] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._transports: Dict[str, CountingTransport] = {}
+        self._http2: Dict[str, bool] = {}
+
+    def configure(self, url: str, **settings: Any):
+        """Override pool settings for a single host; applies to clients created afterwards."""
+        unknown = set(settings) - set(self._defaults)
+        if unknown:
+            raise ValueError(f"Unknown pool settings: {', '.join(sorted(unknown))}")
+        self._overrides.setdefault(_origin(url), {}).update(settings)
+
+    def get(self, url: str) -> httpx.AsyncClient:
+        origin = _origin(url)
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = self._create_client(origin)
+            self._clients[origin] = client
+        return client
+
+    def _create_client(self, origin: str) -> httpx.AsyncClient:
+        settings = {**self._defaults, **self._overrides.get(origin, {})}
+        limits = httpx.Limits(
+            max_connections=settings["max_connections"],
+            max_keepalive_connections=settings["max_keepalive_connections"],
+            keepalive_expiry=settings["keepalive_expiry"],
+        )
+        # HTTP/2 is only negotiated over TLS (ALPN); plain http hosts stay on HTTP/1.1
+        http2 = settings["http2"] and H2_AVAILABLE and origin.startswith("https://")
+        transport = CountingTransport(
+            httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+        )
+        self._transports[origin] = transport
+        self._http2[origin] = http2
+        return httpx.AsyncClient(transport=transport, timeout=settings["timeout"])
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Connection pool usage per host, for sizing the pools under load."""
+        stats = {}
+        for origin in self._clients:
+            settings = {**self._defaults, **self._overrides.get(origin, {})}
+            transport = self._transports[origin]
+            connections, idle = _pool_connections(transport)
+            stats[origin] = {
+                "http2": self._http2[origin],
+                "max_connections": settings["max_connections"],
+                "max_keepalive_connections": settings["max_keepalive_connections"],
+                # Requests sent and not yet fully read, including those waiting for a connection
+                "in_flight_requests": transport.in_flight,
+                "requests": transport.requests,
+                "connections": connections,
+                "idle": idle,
+            }
+        return stats
+
+
+# Application-wide registry; opened and closed by the FastAPI lifespan in main.py
+http_clients = HTTPClientRegistry()
@@ -0,0 +1,183 @@
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from prometheus_client import REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+# Supplier searches routinely take seconds, so the buckets reach further than the defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 30)
+
+REQUEST_LATENCY = Histogram(
+    "travel_http_request_duration_seconds",
+    "Gateway request latency by router prefix",
+    ["prefix", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_LATENCY = Histogram(
+    "travel_upstream_request_duration_seconds",
+    "Outbound supplier request latency",
+    ["upstream", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+TOKEN_REFRESHES = Counter(
+    "travel_token_refreshes_total",
+    "Access tokens fetched from an upstream",
+    ["upstream"],
+)
+RETRIES = Counter(
+    "travel_upstream_retries_total", "Retried upstream requests", ["upstream"]
+)
+RETRY_BUDGET_EXHAUSTED = Counter(
+    "travel_retry_budget_exhausted_total",
+    "Retries skipped because the retry budget was spent",
+    ["upstream"],
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "travel_rate_limit_rejections_total", "Calls refused by a rate limiter", ["limiter"]
+)
+
+
+def upstream_name(url: str) -> str:
+    """Label for an upstream: its host, so paths and query strings never become labels."""
+    return urlparse(url).netloc or url
+
+
+def status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+class _UpstreamCall:
+    """Times one outbound request; usable with ``with`` and ``async with``."""
+
+    def __init__(self, upstream: str):
+        self.upstream = upstream
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is None:
+            status = "2xx"
+        else:
+            status_code = getattr(getattr(exc, "response", None), "status_code", None)
+            if isinstance(status_code, int):
+                status = status_class(status_code)
+            elif (
+                "Timeout" in exc_type.__name__ or "CancelledError" in exc_type.__name__
+            ):
+                status = "timeout"
+            else:
+                status = "error"
+        UPSTREAM_LATENCY.labels(self.upstream, status).observe(
+            time.perf_counter() - self.started
+        )
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+def track_upstream(upstream: str) -> _UpstreamCall:
+    """Record latency and status class of a supplier request: ``async with track_upstream("flyhub"): ...``."""
+    return _UpstreamCall(upstream)
+
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware recording request latency per router prefix.
+
+    Paths are reduced to the longest matching prefix (anything else is
+    "other") so ids in paths never turn into label values. Written as plain
+    ASGI rather than with @app.middleware to keep its per-request cost small.
+    """
+
+    def __init__(self, app, prefixes: Iterable[str]):
+        self.app = app
+        self.prefixes = sorted(prefixes, key=len, reverse=True)
+        self._children: Dict[tuple, Any] = {}
+
+    def _prefix(self, path: str) -> str:
+        for prefix in self.prefixes:
+            if path == prefix or path.startswith(prefix + "/"):
+                return prefix
+        return "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = ["5xx"]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = status_class(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            key = (self._prefix(scope["path"]), scope["method"], status[0])
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = REQUEST_LATENCY.labels(*key)
+            child.observe(time.perf_counter() - started)
+
+
+class StatsCollector:
+    """
+    Exposes an existing ``stats()`` dict as gauges, read only when scraped.
+
+    ``stats`` returns ``{label_value: {stat: number}}``; every numeric stat
+    becomes a ``{name}_{stat}`` gauge labelled with ``label``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        label: str,
+        stats: Callable[[], Dict[str, Dict[str, Any]]],
+        documentation: Optional[str] = None,
+    ):
+        self.name = name
+        self.label = label
+        self.stats = stats
+        self.documentation = documentation or name.replace("_", " ")
+
+    def collect(self):
+        families = {}
+        for label_value, stats in self.stats().items():
+            for stat, value in stats.items():
+                if isinstance(value, bool):
+                    value = int(value)
+                if not isinstance(value, (int, float)):
+                    continue
+                family = families.get(stat)
+                if family is None:
+                    family = families[stat] = GaugeMetricFamily(
+                        f"{self.name}_{stat}",
+                        f"{self.documentation}: {stat}",
+                        labels=[self.label],
+                    )
+                family.add_metric([str(label_value)], value)
+        return list(families.values())
+
+
+def register_stats(
+    name: str,
+    label: str,
+    stats: Callable[[], Dict[str, Dict[str, Any]]],
+    documentation: Optional[str] = None,
+):
+    REGISTRY.register(StatsCollector(name, label, stats, documentation))
+
+
+def render_metrics() -> bytes:
+    return generate_latest(REGISTRY)
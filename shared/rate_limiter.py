@@ -1,24 +1,215 @@
+import asyncio
+import os
+import threading
 import time
 from functools import wraps
+from itertools import islice
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .exceptions import RateLimitExceeded
+from .metrics import RATE_LIMIT_REJECTIONS
+
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+
+
+def _schedule(tat: Optional[float], now: float, rate: float, capacity: float, tokens: float):
+    """
+    Token bucket in its "theoretical arrival time" form (GCRA).
+
+    ``tat`` is when the bucket would be full again. Returns the new tat and how
+    long the caller has to wait before its tokens are available.
+    """
+    interval = 1.0 / rate
+    tat = max(tat or now, now)
+    new_tat = tat + tokens * interval
+    # Not new_tat - capacity * interval - now: rounding there can turn a zero wait into a tiny positive one
+    wait = (tat - now) + (tokens - capacity) * interval
+    return new_tat, max(wait, 0.0)
+
+
+class InMemoryBucketStore:
+    """Buckets kept in this process; safe to share between threads."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str, rate: float, capacity: float, tokens: float, max_wait: float) -> Tuple[bool, float]:
+        """
+        Reserve tokens unless that means waiting longer than max_wait.
+
+        Returns whether the tokens were reserved and the delay before they are
+        available (before they would have been, for a refused reservation).
+        """
+        with self._lock:
+            now = time.monotonic()
+            new_tat, wait = _schedule(self._tats.get(key), now, rate, capacity, tokens)
+            if wait > max_wait:
+                return False, wait
+            # Re-inserted so the dict stays in least recently used order
+            self._tats.pop(key, None)
+            self._tats[key] = new_tat
+            if len(self._tats) > self.max_keys:
+                self._prune(now)
+            return True, wait
+
+    async def areserve(self, key: str, rate: float, capacity: float, tokens: float, max_wait: float) -> Tuple[bool, float]:
+        return self.reserve(key, rate, capacity, tokens, max_wait)
+
+    def _prune(self, now: float):
+        # A bucket whose tat has passed is full, which is the same as no entry at all
+        for key in [key for key, tat in self._tats.items() if tat <= now]:
+            del self._tats[key]
+        # Still too many busy keys (e.g. a flood of new clients): forget the least recently used,
+        # leaving headroom so the scan above runs once per many new keys rather than on every one
+        if len(self._tats) > self.max_keys:
+            for key in list(islice(self._tats, len(self._tats) - self.max_keys * 9 // 10)):
+                del self._tats[key]
+
+
+class RedisBucketStore:
+    """
+    Buckets kept in Redis so a limit holds across all replicas.
+
+    Each reservation is a WATCH/MULTI/EXEC transaction on the bucket's tat and
+    is retried if another replica updated the same bucket concurrently.
+    """
+
+    def __init__(self, url: str = RATE_LIMIT_REDIS_URL, prefix: str = 'travel:ratelimit:',
+                 client: Any = None, async_client: Any = None):
+        self.url = url
+        self.prefix = prefix
+        self._client = client
+        self._async_client = async_client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis  # Optional dependency, only needed for this backend
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            import redis.asyncio
+            self._async_client = redis.asyncio.Redis.from_url(self.url)
+        return self._async_client
+
+    def _plan(self, raw: Optional[bytes], rate: float, capacity: float, tokens: float, max_wait: float):
+        # Wall clock rather than monotonic: the tat is shared between hosts
+        now = time.time()
+        new_tat, wait = _schedule(float(raw) if raw is not None else None, now, rate, capacity, tokens)
+        ttl_ms = max(int((new_tat - now) * 1000) + 1, 1)
+        return new_tat, wait, ttl_ms
+
+    def reserve(self, key: str, rate: float, capacity: float, tokens: float, max_wait: float) -> Tuple[bool, float]:
+        from redis.exceptions import WatchError
+        name = self.prefix + key
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(name)
+                    new_tat, wait, ttl_ms = self._plan(pipe.get(name), rate, capacity, tokens, max_wait)
+                    if wait > max_wait:
+                        pipe.unwatch()
+                        return False, wait
+                    pipe.multi()
+                    pipe.set(name, repr(new_tat), px=ttl_ms)
+                    pipe.execute()
+                    return True, wait
+                except WatchError:
+                    continue
+
+    async def areserve(self, key: str, rate: float, capacity: float, tokens: float, max_wait: float) -> Tuple[bool, float]:
+        from redis.exceptions import WatchError
+        name = self.prefix + key
+        async with self.async_client.pipeline() as pipe:
+            while True:
+                try:
+                    await pipe.watch(name)
+                    new_tat, wait, ttl_ms = self._plan(await pipe.get(name), rate, capacity, tokens, max_wait)
+                    if wait > max_wait:
+                        await pipe.unwatch()
+                        return False, wait
+                    pipe.multi()
+                    pipe.set(name, repr(new_tat), px=ttl_ms)
+                    await pipe.execute()
+                    return True, wait
+                except WatchError:
+                    continue
+
+
+def create_bucket_store(backend: str = RATE_LIMIT_BACKEND):
+    if backend == 'memory':
+        return InMemoryBucketStore()
+    if backend == 'redis':
+        return RedisBucketStore()
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
 
 class RateLimiter:
-    def __init__(self, calls, period):
+    """
+    Token-bucket rate limiter for sync and async callables.
+
+    Allows ``calls`` per ``period`` on average with bursts of up to ``burst``
+    calls (``calls`` by default; use ``burst=1`` to space calls out evenly, e.g.
+    for supplier quotas). Limits are tracked per key, as returned by
+    ``key_func`` for decorated callables or passed to acquire().
+
+    In "reject" mode a call over the limit raises RateLimitExceeded at once; in
+    "wait" mode it waits for a token, up to ``max_wait`` seconds.
+    """
+
+    def __init__(self, calls: float, period: float, burst: Optional[float] = None, mode: str = 'reject',
+                 max_wait: float = 1.0, key_func: Optional[Callable[..., str]] = None, store: Any = None,
+                 name: str = 'default'):
+        if mode not in ('reject', 'wait'):
+            raise ValueError(f"Unknown rate limit mode: {mode}")
         self.calls = calls
         self.period = period
-        self.last_reset = time.time()
-        self.num_calls = 0
+        self.rate = calls / period
+        self.capacity = burst if burst is not None else calls
+        self.mode = mode
+        self.max_wait = max_wait if mode == 'wait' else 0.0
+        self.key_func = key_func
+        self.store = store if store is not None else InMemoryBucketStore()
+        self.rejections = 0
+        self.name = name
+
+    def _rejected(self, key: str, retry_after: float) -> RateLimitExceeded:
+        self.rejections += 1
+        RATE_LIMIT_REJECTIONS.labels(self.name).inc()
+        return RateLimitExceeded(key, retry_after=retry_after)
+
+    def acquire(self, key: str = 'default', tokens: float = 1):
+        reserved, wait = self.store.reserve(key, self.rate, self.capacity, tokens, self.max_wait)
+        if not reserved:
+            raise self._rejected(key, wait)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, key: str = 'default', tokens: float = 1):
+        reserved, wait = await self.store.areserve(key, self.rate, self.capacity, tokens, self.max_wait)
+        if not reserved:
+            raise self._rejected(key, wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
 
     def __call__(self, func):
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = self.key_func(*args, **kwargs) if self.key_func else 'default'
+                await self.aacquire(key)
+                return await func(*args, **kwargs)
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            current_time = time.time()
-            if current_time - self.last_reset >= self.period:
-                self.num_calls = 0
-                self.last_reset = current_time
-            
-            if self.num_calls >= self.calls:
-                raise Exception("Rate limit exceeded")
-            
-            self.num_calls += 1
+            key = self.key_func(*args, **kwargs) if self.key_func else 'default'
+            self.acquire(key)
             return func(*args, **kwargs)
-        return wrapper
\ No newline at end of file
+        return wrapper
@@ -1,4 +1,6 @@
 from typing import Any, Dict, Optional
+from starlette.responses import JSONResponse, Response
+from . import fast_json
 
 class StandardResponse:
     def __init__(self, status: str, data: Optional[Any] = None, errors: Optional[Dict[str, Any]] = None):
@@ -24,3 +26,30 @@ def error_response(error_message: str) -> Dict[str, Any]:
         "status": "error",
         "errors": [error_message]
     }
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available; the app's default response class."""
+
+    def render(self, content: Any) -> bytes:
+        return fast_json.dumps(content)
+
+
+class RawJSONResponse(Response):
+    """Response for a body that is already serialized JSON, e.g. a cached search result."""
+    media_type = "application/json"
+
+
+# Media types of the streaming search formats
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def encode_stream_frame(frame: Dict[str, Any], stream_format: str) -> bytes:
+    """One frame of a streamed response: an NDJSON line, or an SSE event named after the frame's type."""
+    data = fast_json.dumps(frame)
+    if stream_format == "sse":
+        return b"event: " + frame["type"].encode() + b"\ndata: " + data + b"\n\n"
+    return data + b"\n"
@@ -1,6 +1,39 @@
+import asyncio
+import os
+import sys
+import threading
 import time
+from email.utils import parsedate_to_datetime
 from functools import wraps
 import random
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from .metrics import RETRIES, RETRY_BUDGET_EXHAUSTED, upstream_name
+
+# Retry policy for calls to upstream APIs
+RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', '3'))
+RETRY_BACKOFF = float(os.getenv('RETRY_BACKOFF', '0.2'))
+RETRY_MAX_BACKOFF = float(os.getenv('RETRY_MAX_BACKOFF', '2'))
+RETRY_BUDGET_RATIO = float(os.getenv('RETRY_BUDGET_RATIO', '0.2'))
+RETRY_BUDGET_INITIAL = float(os.getenv('RETRY_BUDGET_INITIAL', '10'))
+REQUEST_DEADLINE = float(os.getenv('REQUEST_DEADLINE', '30'))
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+RETRIABLE_STATUSES = frozenset([502, 503, 504])
+# Failures where the request never reached the upstream
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _is_connect_error(exc: BaseException) -> bool:
+    if isinstance(exc, CONNECT_ERRORS):
+        return True
+    # requests is slow to import and only used by the sync client; if it is not loaded, exc is not one of its errors
+    requests = sys.modules.get('requests')
+    return requests is not None and isinstance(exc, requests.ConnectionError)
+
+
 def retry_with_backoff(retries=3, backoff_in_seconds=1):
     def decorator(func):
         @wraps(func)
@@ -12,9 +45,161 @@ def retry_with_backoff(retries=3, backoff_in_seconds=1):
                 except Exception as e:
                     if x == retries:
                         raise e
-                    sleep = (backoff_in_seconds * 2 ** x + 
+                    sleep = (backoff_in_seconds * 2 ** x +
                              random.uniform(0, 1))
                     time.sleep(sleep)
                     x += 1
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+
+def _retry_after(response: Any) -> Optional[float]:
+    """Seconds requested by a Retry-After header, in either of its two formats."""
+    value = response.headers.get('Retry-After') if response is not None else None
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of traffic.
+
+    Every request deposits ``ratio`` tokens and every retry withdraws one, so
+    once the initial allowance is spent at most ``ratio`` retries are made per
+    request. During an outage this keeps retries from multiplying the load on
+    the upstream.
+    """
+
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO, initial: float = RETRY_BUDGET_INITIAL,
+                 max_tokens: Optional[float] = None):
+        self.ratio = ratio
+        self.max_tokens = max_tokens if max_tokens is not None else max(initial, 100 * ratio)
+        self.tokens = initial
+        self.retries = 0
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens < 1:
+                self.exhausted += 1
+                return False
+            self.tokens -= 1
+            self.retries += 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {'tokens': round(self.tokens, 2), 'retries': self.retries, 'exhausted': self.exhausted}
+
+
+class RetryPolicy:
+    """
+    Retries upstream calls that failed in a way worth retrying.
+
+    Only connect errors, 502/503/504 responses and 429 responses carrying a
+    Retry-After header are retried, and only for idempotent methods unless the
+    caller allows otherwise (e.g. for read-only POST searches). Retries are
+    spaced with jittered exponential backoff (or as Retry-After asks), drawn
+    from a per-key RetryBudget, and never scheduled past the overall deadline.
+
+    The call is passed the time left until the deadline so it can bound each
+    attempt, and should raise for error statuses (``raise_for_status()``).
+    """
+
+    def __init__(self, max_attempts: int = RETRY_MAX_ATTEMPTS, backoff: float = RETRY_BACKOFF,
+                 max_backoff: float = RETRY_MAX_BACKOFF, deadline: float = REQUEST_DEADLINE,
+                 budget_ratio: float = RETRY_BUDGET_RATIO, budget_initial: float = RETRY_BUDGET_INITIAL):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.budget_ratio = budget_ratio
+        self.budget_initial = budget_initial
+        self._budgets: Dict[str, RetryBudget] = {}
+
+    def budget(self, key: str) -> RetryBudget:
+        budget = self._budgets.get(key)
+        if budget is None:
+            budget = self._budgets.setdefault(key, RetryBudget(self.budget_ratio, self.budget_initial))
+        return budget
+
+    def retry_delay(self, exc: BaseException, attempt: int) -> Optional[float]:
+        """How long to wait before retrying after ``exc``, or None if it is not retriable."""
+        if _is_connect_error(exc):
+            return self._backoff(attempt)
+        response = getattr(exc, 'response', None)
+        status_code = getattr(response, 'status_code', None)
+        if status_code == 429:
+            return _retry_after(response)
+        if status_code in RETRIABLE_STATUSES:
+            retry_after = _retry_after(response)
+            return retry_after if retry_after is not None else self._backoff(attempt)
+        return None
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _plan_retry(self, exc: BaseException, attempt: int, method: str, allow_non_idempotent: bool,
+                    key: str, budget: RetryBudget, give_up_at: float) -> Optional[float]:
+        if attempt + 1 >= self.max_attempts:
+            return None
+        if method.upper() not in IDEMPOTENT_METHODS and not allow_non_idempotent:
+            return None
+        delay = self.retry_delay(exc, attempt)
+        if delay is None or time.monotonic() + delay >= give_up_at:
+            return None
+        if not budget.withdraw():
+            RETRY_BUDGET_EXHAUSTED.labels(upstream_name(key)).inc()
+            return None
+        RETRIES.labels(upstream_name(key)).inc()
+        return delay
+
+    def execute(self, func: Callable[[float], Any], method: str, key: str = 'default',
+                deadline: Optional[float] = None, allow_non_idempotent: bool = False) -> Any:
+        give_up_at = time.monotonic() + (deadline if deadline is not None else self.deadline)
+        budget = self.budget(key)
+        budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                return func(give_up_at - time.monotonic())
+            except Exception as e:
+                delay = self._plan_retry(e, attempt, method, allow_non_idempotent, key, budget, give_up_at)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    async def aexecute(self, func: Callable[[float], Awaitable[Any]], method: str, key: str = 'default',
+                       deadline: Optional[float] = None, allow_non_idempotent: bool = False) -> Any:
+        give_up_at = time.monotonic() + (deadline if deadline is not None else self.deadline)
+        budget = self.budget(key)
+        budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                return await func(give_up_at - time.monotonic())
+            except Exception as e:
+                delay = self._plan_retry(e, attempt, method, allow_non_idempotent, key, budget, give_up_at)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {key: budget.stats() for key, budget in list(self._budgets.items())}
+
+
+default_retry_policy = RetryPolicy()
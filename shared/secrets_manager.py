@@ -1,11 +1,217 @@
-import boto3
-from botocore.exceptions import ClientError
-
-def get_secret(secret_name):
-    session = boto3.session.Session()
-    client = session.client(service_name='secretsmanager')
-    try:
-        get_secret_value_response = client.get_secret_value(SecretId=secret_name)
-    except ClientError as e:
-        raise e
-    return get_secret_value_response['SecretString']
\ No newline at end of file
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+SECRETS_BACKEND = os.getenv('SECRETS_BACKEND', 'aws')
+SECRETS_TTL = float(os.getenv('SECRETS_TTL', '300'))
+SECRETS_REFRESH_MARGIN = float(os.getenv('SECRETS_REFRESH_MARGIN', '60'))
+SECRETS_DIR = os.getenv('SECRETS_DIR', '/run/secrets')
+SECRETS_ENV_PREFIX = os.getenv('SECRETS_ENV_PREFIX', 'SECRET_')
+AWS_REGION = os.getenv('AWS_REGION')
+
+logger = logging.getLogger(__name__)
+
+
+class SecretNotFound(KeyError):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.name = name
+
+    def __str__(self):
+        return f"Secret not found: {self.name}"
+
+
+class EnvSecretsBackend:
+    """Secrets from environment variables: ``api/key`` is read from ``SECRET_API_KEY``."""
+
+    def __init__(self, prefix: str = SECRETS_ENV_PREFIX):
+        self.prefix = prefix
+
+    def variable(self, name: str) -> str:
+        return self.prefix + ''.join(c if c.isalnum() else '_' for c in name).upper()
+
+    def fetch(self, name: str) -> str:
+        value = os.environ.get(self.variable(name))
+        if value is None:
+            raise SecretNotFound(name)
+        return value
+
+
+class FileSecretsBackend:
+    """Secrets as files in a directory, one per secret, e.g. Docker or Kubernetes mounted secrets."""
+
+    def __init__(self, directory: str = SECRETS_DIR):
+        self.directory = directory
+
+    def path(self, name: str) -> str:
+        """The file holding ``name``; raises ValueError for a name that leads out of the directory."""
+        directory = os.path.abspath(self.directory)
+        path = os.path.abspath(os.path.join(directory, name))
+        if os.path.commonpath([directory, path]) != directory or path == directory:
+            raise ValueError(f"Invalid secret name: {name!r}")
+        return path
+
+    def fetch(self, name: str) -> str:
+        path = self.path(name)
+        try:
+            with open(path) as f:
+                return f.read().rstrip('\n')
+        except FileNotFoundError:
+            raise SecretNotFound(name) from None
+
+
+class AWSSecretsBackend:
+    """
+    Secrets from AWS Secrets Manager.
+
+    The boto3 client is created on the first fetch and reused afterwards;
+    building a session and client costs far more than the API call itself.
+    """
+
+    def __init__(self, region: Optional[str] = AWS_REGION, client: Any = None):
+        self.region = region
+        self._client = client
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import boto3  # Optional dependency, only needed for this backend
+                    self._client = boto3.session.Session().client(service_name='secretsmanager',
+                                                                  region_name=self.region)
+        return self._client
+
+    def fetch(self, name: str) -> str:
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.get_secret_value(SecretId=name)['SecretString']
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ResourceNotFoundException':
+                raise SecretNotFound(name) from e
+            raise
+
+
+class SecretsProvider:
+    """
+    Caches secrets from a backend for ``ttl`` seconds.
+
+    Within ``refresh_margin`` of expiry the cached value is still served while
+    one background thread fetches a fresh one, so callers only block on the
+    first lookup (or after a failed refresh let the value expire). Concurrent
+    lookups of a missing secret share a single fetch.
+    """
+
+    def __init__(self, backend: Any, ttl: float = SECRETS_TTL, refresh_margin: float = SECRETS_REFRESH_MARGIN):
+        self.backend = backend
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self._values: Dict[str, Tuple[str, float]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._refreshing: Dict[str, threading.Thread] = {}
+        self._guard = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    def _lock_for(self, name: str) -> threading.Lock:
+        lock = self._locks.get(name)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.setdefault(name, threading.Lock())
+        return lock
+
+    def _cached(self, name: str) -> Optional[Tuple[str, float]]:
+        entry = self._values.get(name)
+        if entry is not None and time.monotonic() < entry[1]:
+            return entry
+        return None
+
+    def _fetch(self, name: str) -> str:
+        try:
+            value = self.backend.fetch(name)
+        except Exception:
+            self.failures += 1
+            raise
+        self._values[name] = (value, time.monotonic() + self.ttl)
+        return value
+
+    def get(self, name: str) -> str:
+        entry = self._cached(name)
+        if entry is not None:
+            self.hits += 1
+            value, expires_at = entry
+            if time.monotonic() >= expires_at - self.refresh_margin:
+                self._start_background_refresh(name)
+            return value
+
+        # Missing or expired: block, but let only one thread fetch it
+        with self._lock_for(name):
+            entry = self._cached(name)
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return self._fetch(name)
+
+    async def aget(self, name: str) -> str:
+        """Async variant of get; a blocking fetch runs off the event loop."""
+        if self._cached(name) is not None:
+            return self.get(name)
+        return await asyncio.to_thread(self.get, name)
+
+    def _start_background_refresh(self, name: str):
+        with self._guard:
+            thread = self._refreshing.get(name)
+            if thread is not None and thread.is_alive():
+                return
+            thread = self._refreshing[name] = threading.Thread(target=self._background_refresh, args=(name,),
+                                                               daemon=True)
+            thread.start()
+
+    def _background_refresh(self, name: str):
+        with self._lock_for(name):
+            try:
+                self._fetch(name)
+                self.refreshes += 1
+            except Exception as e:
+                # Keep serving the cached value until it expires; the next lookup near expiry retries
+                logger.warning("Background refresh of secret %s failed: %s", name, e)
+
+    def invalidate(self, name: Optional[str] = None):
+        if name is None:
+            self._values.clear()
+        else:
+            self._values.pop(name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'backend': type(self.backend).__name__,
+            'cached': len(self._values),
+            'hits': self.hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+        }
+
+
+def create_secrets_backend(backend: str = SECRETS_BACKEND) -> Any:
+    if backend == 'env':
+        return EnvSecretsBackend()
+    if backend == 'file':
+        return FileSecretsBackend()
+    if backend == 'aws':
+        return AWSSecretsBackend()
+    raise ValueError(f"Unknown secrets backend: {backend}")
+
+
+secrets_provider = SecretsProvider(create_secrets_backend())
+
+
+def get_secret(secret_name: str) -> str:
+    return secrets_provider.get(secret_name)
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one.
+
+    While a call for a key is in flight, further callers with the same key
+    await its result (or exception) instead of starting their own. A caller
+    that is cancelled only stops waiting; the shared call is cancelled once
+    no caller is left waiting for it.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.requests = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        self.requests += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight(asyncio.ensure_future(func()))
+            flight.task.add_done_callback(lambda task: self._landed(key, flight))
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            # Shielded so one caller going away doesn't cancel the call for the others
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def _landed(self, key: str, flight: _Flight):
+        self._forget(key, flight)
+        # Mark the outcome as retrieved even if every caller had already gone
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights),
+            "coalescing_ratio": (
+                round(self.coalesced / self.requests, 3) if self.requests else 0.0
+            ),
+        }
@@ -16,4 +16,19 @@ def api_client(oauth2_client):
     return APIClient(
         base_url="https://test.com/api",
         oauth2_client=oauth2_client
-    )
\ No newline at end of file
+    )
+
+@pytest.fixture
+def redis_standin():
+    """Local Redis-protocol server for testing Redis-backed stores"""
+    from tests.redis_standin import RedisStandIn
+    server = RedisStandIn().start()
+    yield server
+    server.stop()
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Start every test with closed circuits for all hosts"""
+    from shared.circuit_breaker import circuit_breakers
+    circuit_breakers.reset()
+    yield
@@ -0,0 +1,164 @@
+import asyncio
+import threading
+import time
+
+
+class RedisStandIn:
+    """
+    Minimal in-memory server speaking the Redis protocol (RESP2), for tests.
+
+    Supports the handful of commands our cache and stores use, including
+    WATCH/MULTI/EXEC optimistic transactions. It runs its own event loop in a
+    background thread so tests can talk to it from asyncio.run() or threads.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.versions = {}
+        self.commands = []
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._server = None
+        self.port = None
+
+    @property
+    def url(self) -> str:
+        # Recent clients negotiate RESP3 by default; the stand-in only speaks RESP2
+        return f"redis://127.0.0.1:{self.port}/0?protocol=2"
+
+    def start(self):
+        self._thread.start()
+        future = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._handle, "127.0.0.1", 0), self._loop
+        )
+        self._server = future.result(timeout=5)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    def stop(self):
+        async def close():
+            self._server.close()
+            # Drop connections the tests left open so no handler outlives the loop
+            handlers = [
+                task
+                for task in asyncio.all_tasks()
+                if task is not asyncio.current_task()
+            ]
+            for task in handlers:
+                task.cancel()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    async def _handle(self, reader, writer):
+        # Per-connection transaction state
+        session = {"watched": {}, "queue": None}
+        try:
+            while True:
+                command = await self._read_command(reader)
+                if command is None:
+                    break
+                writer.write(self._dispatch(session, command))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def _dispatch(self, session, args):
+        name = args[0].decode().upper()
+        self.commands.append(name)
+        if name == "WATCH":
+            for key in args[1:]:
+                session["watched"][key] = self.versions.get(key, 0)
+            return b"+OK\r\n"
+        if name == "UNWATCH":
+            session["watched"] = {}
+            return b"+OK\r\n"
+        if name == "MULTI":
+            session["queue"] = []
+            return b"+OK\r\n"
+        if name == "DISCARD":
+            session["queue"] = None
+            session["watched"] = {}
+            return b"+OK\r\n"
+        if name == "EXEC":
+            queue, session["queue"] = session["queue"] or [], None
+            watched, session["watched"] = session["watched"], {}
+            if any(
+                self.versions.get(key, 0) != version for key, version in watched.items()
+            ):
+                return b"*-1\r\n"
+            return b"*%d\r\n" % len(queue) + b"".join(
+                self._execute(command) for command in queue
+            )
+        if session["queue"] is not None:
+            session["queue"].append(args)
+            return b"+QUEUED\r\n"
+        return self._execute(args)
+
+    def _touch(self, key):
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    async def _read_command(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        count = int(line[1:].strip())
+        args = []
+        for _ in range(count):
+            length = int((await reader.readline())[1:].strip())
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _alive(self, key):
+        expires_at = self.expires.get(key)
+        if expires_at is not None and time.monotonic() >= expires_at:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _execute(self, args):
+        name = args[0].decode().upper()
+        if name == "PING":
+            return b"+PONG\r\n"
+        if name in ("CLIENT", "SELECT"):
+            return b"+OK\r\n"
+        if name == "GET":
+            if not self._alive(args[1]):
+                return b"$-1\r\n"
+            value = self.data[args[1]]
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if name == "SET":
+            key, value = args[1], args[2]
+            options = [arg.decode().upper() for arg in args[3:]]
+            if "NX" in options and self._alive(key):
+                return b"$-1\r\n"
+            self.data[key] = value
+            self._touch(key)
+            self.expires.pop(key, None)
+            if "PX" in options:
+                self.expires[key] = (
+                    time.monotonic() + int(options[options.index("PX") + 1]) / 1000
+                )
+            if "EX" in options:
+                self.expires[key] = time.monotonic() + int(
+                    options[options.index("EX") + 1]
+                )
+            return b"+OK\r\n"
+        if name == "DEL":
+            removed = 0
+            for key in args[1:]:
+                if self._alive(key):
+                    removed += 1
+                    self._touch(key)
+                self.data.pop(key, None)
+                self.expires.pop(key, None)
+            return b":%d\r\n" % removed
+        if name == "FLUSHDB":
+            self.data.clear()
+            self.expires.clear()
+            return b"+OK\r\n"
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
@@ -1,6 +1,7 @@
 import pytest
 import responses
 import requests  # Add this import
+import threading
 from unittest.mock import patch, Mock
 import sys
 import os
@@ -15,12 +16,6 @@ load_dotenv()
 # Remove the global client initialization and test_credentials call
 # This should be handled in individual tests instead
 
-class MockRetryWithBackoff:
-    def __call__(self, *args, **kwargs):
-        def decorator(func):
-            return func
-        return decorator
-
 @pytest.fixture
 def oauth2_client():
     mock_oauth2_client = Mock(spec=OAuth2Client)
@@ -56,7 +51,7 @@ def test_credentials_initialization():
     api_client.test_credentials()
 
 # Test basic HTTP methods
-@patch('shared.api_client.retry_with_backoff', MockRetryWithBackoff())
+@patch('shared.retry.time.sleep', Mock())
 @responses.activate
 def test_get_request_success(api_client):
     responses.add(
@@ -69,7 +64,7 @@ def test_get_request_success(api_client):
     response = api_client.get("/test")
     assert response == {"status": "success", "data": {"key": "value"}}
 
-@patch('shared.api_client.retry_with_backoff', MockRetryWithBackoff())
+@patch('shared.retry.time.sleep', Mock())
 @responses.activate
 def test_get_request_error(api_client):
     responses.add(
@@ -82,7 +77,7 @@ def test_get_request_error(api_client):
     response = api_client.get("/test")
     assert response == {"status": "error", "errors": ["API request failed: 404 Client Error: Not Found for url: https://api.example.com/test"]}
 
-@patch('shared.api_client.retry_with_backoff', MockRetryWithBackoff())
+@patch('shared.retry.time.sleep', Mock())
 @responses.activate
 def test_post_request_success(api_client):
     responses.add(
@@ -95,7 +90,7 @@ def test_post_request_success(api_client):
     response = api_client.post("/test", data={"name": "Test"})
     assert response == {"status": "success", "data": {"id": "123"}}
 
-@patch('shared.api_client.retry_with_backoff', MockRetryWithBackoff())
+@patch('shared.retry.time.sleep', Mock())
 @responses.activate
 def test_put_request_success(api_client):
     responses.add(
@@ -108,7 +103,7 @@ def test_put_request_success(api_client):
     response = api_client.put("/test/123", data={"name": "Updated"})
     assert response == {"status": "success", "data": {"id": "123", "name": "Updated"}}
 
-@patch('shared.api_client.retry_with_backoff', MockRetryWithBackoff())
+@patch('shared.retry.time.sleep', Mock())
 @responses.activate
 def test_delete_request_success(api_client):
     responses.add(
@@ -190,7 +185,7 @@ def test_oauth2_integration():
     assert api_request.headers["Authorization"] == "Bearer test_access_token"
 
 # Test error handling and edge cases
-@patch('shared.api_client.retry_with_backoff', MockRetryWithBackoff())
+@patch('shared.retry.time.sleep', Mock())
 @responses.activate
 def test_network_error(api_client):
     # Use responses.CallbackResponse to simulate a network error
@@ -207,7 +202,7 @@ def test_network_error(api_client):
     assert response["status"] == "error"
     assert "Network error" in str(response["errors"][0])
 
-@patch('shared.api_client.retry_with_backoff', MockRetryWithBackoff())
+@patch('shared.retry.time.sleep', Mock())
 @responses.activate
 def test_invalid_json_response(api_client):
     responses.add(
@@ -264,5 +259,82 @@ def test_token_refresh():
     token2 = oauth2_client.get_access_token()
     assert token2 == "refreshed_token"
 
+@responses.activate
+def test_token_refreshed_in_background_before_expiry():
+    responses.add(
+        responses.POST,
+        "https://auth.example.com/token",
+        json={"access_token": "initial_token", "expires_in": 30},
+        status=200
+    )
+    responses.add(
+        responses.POST,
+        "https://auth.example.com/token",
+        json={"access_token": "refreshed_token", "expires_in": 3600},
+        status=200
+    )
+
+    # A 60 second skew puts the 30 second token inside the refresh window
+    oauth2_client = OAuth2Client(
+        client_id="test_client_id",
+        client_secret="test_client_secret",
+        token_url="https://auth.example.com/token",
+        refresh_skew=60
+    )
+    assert oauth2_client.get_access_token() == "initial_token"
+    assert oauth2_client.is_token_expired()
+
+    # The still-valid token is served while the refresh runs in the background
+    assert oauth2_client.get_access_token() == "initial_token"
+    oauth2_client._refresh_thread.join(timeout=5)
+
+    assert oauth2_client.get_access_token() == "refreshed_token"
+    assert not oauth2_client.is_token_expired()
+    assert len(responses.calls) == 2
+
+@responses.activate
+def test_concurrent_token_fetches_are_collapsed():
+    responses.add(
+        responses.POST,
+        "https://auth.example.com/token",
+        json={"access_token": "test_token", "expires_in": 3600},
+        status=200
+    )
+
+    oauth2_client = OAuth2Client(
+        client_id="test_client_id",
+        client_secret="test_client_secret",
+        token_url="https://auth.example.com/token"
+    )
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(oauth2_client.get_access_token())) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert tokens == ["test_token"] * 10
+    assert len(responses.calls) == 1
+
+@patch('shared.retry.time.sleep', Mock())
+@responses.activate
+def test_unavailable_upstream_is_retried(api_client):
+    responses.add(responses.GET, "https://api.example.com/test", status=503)
+    responses.add(responses.GET, "https://api.example.com/test", json={"key": "value"}, status=200)
+
+    response = api_client.get("/test")
+    assert response == {"status": "success", "data": {"key": "value"}}
+    assert len(responses.calls) == 2
+
+@patch('shared.retry.time.sleep', Mock())
+@responses.activate
+def test_post_is_not_retried(api_client):
+    responses.add(responses.POST, "https://api.example.com/test", status=503)
+    responses.add(responses.POST, "https://api.example.com/test", json={"id": "123"}, status=201)
+
+    response = api_client.post("/test", data={"name": "Test"})
+    assert response["status"] == "error"
+    assert len(responses.calls) == 1
+
 if __name__ == "__main__":
     pytest.main(["-v", "-s"])
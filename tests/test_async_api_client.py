@@ -0,0 +1,125 @@
+import asyncio
+import json
+import os
+import sys
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from shared.api_client import AsyncAPIClient
+from shared.auth.oauth2_client import OAuth2Client
+
+
+@pytest.fixture
+def oauth2_client():
+    mock_oauth2_client = Mock(spec=OAuth2Client)
+    mock_oauth2_client.aget_access_token = AsyncMock(return_value="test_token")
+    return mock_oauth2_client
+
+
+def make_client(oauth2_client, handler):
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return AsyncAPIClient(
+        "https://api.example.com", oauth2_client, http_client=http_client
+    )
+
+
+def test_get_request_success(oauth2_client):
+    def handler(request):
+        assert request.url == "https://api.example.com/test?q=1"
+        assert request.headers["Authorization"] == "Bearer test_token"
+        return httpx.Response(200, json={"key": "value"})
+
+    api_client = make_client(oauth2_client, handler)
+    response = asyncio.run(api_client.get("/test", params={"q": 1}))
+    assert response == {"status": "success", "data": {"key": "value"}}
+
+
+def test_post_put_delete_success(oauth2_client):
+    def handler(request):
+        body = json.loads(request.content) if request.content else None
+        return httpx.Response(200, json={"method": request.method, "body": body})
+
+    api_client = make_client(oauth2_client, handler)
+
+    async def run():
+        return (
+            await api_client.post("/test", data={"name": "Test"}),
+            await api_client.put("/test/123", data={"name": "Updated"}),
+            await api_client.delete("/test/123"),
+        )
+
+    post, put, delete = asyncio.run(run())
+    assert post["data"] == {"method": "POST", "body": {"name": "Test"}}
+    assert put["data"]["method"] == "PUT"
+    assert delete["data"] == {"method": "DELETE", "body": None}
+
+
+def test_error_status_is_not_retried(oauth2_client):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(404, json={"error": "Not found"})
+
+    api_client = make_client(oauth2_client, handler)
+    response = asyncio.run(api_client.get("/test"))
+
+    assert response["status"] == "error"
+    assert "404" in response["errors"][0]
+    assert len(calls) == 1
+
+
+@patch("shared.retry.asyncio.sleep", new_callable=AsyncMock)
+def test_network_error_is_retried(mock_sleep, oauth2_client):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) < 3:
+            raise httpx.ConnectError("Network error")
+        return httpx.Response(200, json={"key": "value"})
+
+    api_client = make_client(oauth2_client, handler)
+    response = asyncio.run(api_client.get("/test"))
+
+    assert response == {"status": "success", "data": {"key": "value"}}
+    assert len(calls) == 3
+    assert mock_sleep.await_count == 2
+
+
+def test_invalid_json_response(oauth2_client):
+    api_client = make_client(
+        oauth2_client, lambda request: httpx.Response(200, text="Invalid JSON")
+    )
+    response = asyncio.run(api_client.get("/test"))
+    assert response["status"] == "error"
+
+
+def test_invalid_base_url(oauth2_client):
+    with pytest.raises(ValueError, match=r"Invalid base URL format"):
+        AsyncAPIClient("ftp://invalid.com", oauth2_client)
+
+
+def test_open_circuit_fails_fast(oauth2_client):
+    from shared.circuit_breaker import circuit_breakers
+
+    circuit_breakers.configure("https://api.example.com", min_calls=2, failure_rate=0.5)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    api_client = make_client(oauth2_client, handler)
+
+    async def run():
+        return [await api_client.get("/test") for _ in range(3)]
+
+    first, second, third = asyncio.run(run())
+    assert len(calls) == 2
+    assert third["status"] == "error"
+    assert "Circuit open" in third["errors"][0]
+    assert circuit_breakers.stats()["https://api.example.com"]["state"] == "open"
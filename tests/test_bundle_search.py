@@ -0,0 +1,183 @@
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from services.bundle_service import bundle_search as bundle_search_module
+from services.bundle_service import bundle_service
+from services.car_service import api as car_api
+from services.hotel_service import api as hotel_api
+from services.insurance_service import api as insurance_api
+from shared import fast_json
+from shared.cache import Cache, InMemoryCacheBackend
+from shared.single_flight import SingleFlight
+
+FLIGHTS = {
+    "segments": [
+        {"origin": "DAC", "destination": "DXB", "departure_date": "2099-12-20"}
+    ],
+    "adult_count": 1,
+    "cabin_class": "economy",
+    "trip_type": "one_way",
+}
+BUNDLE = {
+    "flights": FLIGHTS,
+    "hotels": {"location": "DXB", "check_in": "2099-12-20", "check_out": "2099-12-24"},
+    "cars": {
+        "location": "DXB",
+        "pickup_date": "2099-12-20",
+        "return_date": "2099-12-24",
+    },
+    "insurance": {"trip": {"destination": "DXB"}, "travelers": {"count": 1}},
+}
+
+
+class FakeServices:
+    """Stand-ins for each product's search, each taking ``delay`` seconds."""
+
+    def __init__(self, delay=0.1, hotel_status="success"):
+        self.delay = delay
+        self.hotel_status = hotel_status
+        self.calls = []
+
+    async def _answer(self, product, data):
+        self.calls.append(product)
+        await asyncio.sleep(self.delay)
+        return data
+
+    async def flights(self, params):
+        return await self._answer(
+            "flights", fast_json.dumps({"results": [{"id": "F1"}], "suppliers": {}})
+        )
+
+    async def hotels(self, location, check_in, check_out):
+        if self.hotel_status != "success":
+            self.calls.append("hotels")
+            return {"status": "error", "errors": ["API request failed: 503"]}
+        return await self._answer(
+            "hotels", {"status": "success", "data": {"hotels": [location]}}
+        )
+
+    async def cars(self, location, pickup_date, return_date):
+        return await self._answer(
+            "cars", {"status": "success", "data": {"cars": [location]}}
+        )
+
+    async def insurance(self, trip, travelers):
+        return await self._answer(
+            "insurance",
+            {"status": "success", "data": {"quotes": [trip["destination"]]}},
+        )
+
+    def patch(self):
+        caches = {
+            product: Cache(InMemoryCacheBackend())
+            for product in ("hotels", "cars", "insurance")
+        }
+        return [
+            patch.object(bundle_search_module, "cached_flight_search", self.flights),
+            patch.object(hotel_api, "search_hotels", self.hotels),
+            patch.object(car_api, "search_cars", self.cars),
+            patch.object(insurance_api, "get_insurance_quotes", self.insurance),
+            patch.dict(bundle_search_module.product_caches, caches),
+            patch.dict(
+                bundle_search_module.product_searches,
+                {product: SingleFlight() for product in caches},
+            ),
+        ]
+
+
+def run_patched(services, coroutine_factory):
+    patches = services.patch()
+    for p in patches:
+        p.start()
+    try:
+        return asyncio.run(coroutine_factory())
+    finally:
+        for p in reversed(patches):
+            p.stop()
+
+
+def test_sections_are_searched_concurrently():
+    services = FakeServices(delay=0.1)
+    started = time.monotonic()
+    response = run_patched(services, lambda: bundle_service.bundle_search(dict(BUNDLE)))
+
+    assert time.monotonic() - started < 0.3
+    assert sorted(services.calls) == ["cars", "flights", "hotels", "insurance"]
+    assert response["results"]["flights"]["results"] == [{"id": "F1"}]
+    assert response["results"]["hotels"] == {"hotels": ["DXB"]}
+    assert all(section["status"] == "ok" for section in response["sections"].values())
+
+
+def test_failed_and_late_sections_degrade_to_partial_results():
+    services = FakeServices(delay=0.2, hotel_status="error")
+
+    async def run():
+        async def instant_flights(params):
+            return fast_json.dumps({"results": [], "suppliers": {}})
+
+        with patch.object(
+            bundle_search_module, "cached_flight_search", instant_flights
+        ), patch.object(bundle_search_module, "BUNDLE_SEARCH_DEADLINE", 0.05):
+            return await bundle_service.bundle_search(dict(BUNDLE))
+
+    response = run_patched(services, run)
+
+    assert response["sections"]["flights"]["status"] == "ok"
+    assert response["sections"]["hotels"]["status"] == "error"
+    assert response["sections"]["hotels"]["http_status"] == 502
+    assert response["sections"]["cars"]["status"] == "timeout"
+    assert response["results"]["cars"] is None
+
+
+def test_product_results_are_cached():
+    services = FakeServices(delay=0)
+
+    async def run():
+        bundle = {"hotels": BUNDLE["hotels"], "cars": BUNDLE["cars"]}
+        await bundle_service.bundle_search(dict(bundle))
+        return await bundle_service.bundle_search(dict(bundle))
+
+    response = run_patched(services, run)
+
+    assert sorted(services.calls) == ["cars", "hotels"]
+    assert response["results"]["cars"] == {"cars": ["DXB"]}
+
+
+def test_stream_yields_each_section_then_summary():
+    services = FakeServices(delay=0)
+
+    async def run():
+        response = await bundle_service.bundle_search_stream(dict(BUNDLE))
+        return [fast_json.loads(line) async for line in response.body_iterator]
+
+    frames = run_patched(services, run)
+
+    assert [frame["type"] for frame in frames] == ["section"] * 4 + ["summary"]
+    assert {frame["product"] for frame in frames[:4]} == set(BUNDLE)
+    assert set(frames[-1]["sections"]) == set(BUNDLE)
+
+
+def test_invalid_bundles_are_rejected_before_searching():
+    for bundle in (
+        {},
+        {"boats": {}},
+        {"hotels": {"location": "DXB"}},
+        {"flights": {"segments": []}},
+        {
+            "hotels": {
+                "location": "DXB",
+                "check_in": "2099-12-24",
+                "check_out": "2099-12-20",
+            }
+        },
+    ):
+        with pytest.raises(HTTPException) as e:
+            asyncio.run(bundle_service.bundle_search(bundle))
+        assert e.value.status_code == 400
@@ -0,0 +1,184 @@
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from shared.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry
+from shared.exceptions import CircuitOpenError
+
+
+def fail(breaker, exc=None):
+    with pytest.raises(type(exc) if exc else RuntimeError):
+        with breaker.protect():
+            raise exc or RuntimeError("upstream down")
+
+
+def succeed(breaker, duration=0.0):
+    with breaker.protect():
+        time.sleep(duration)
+
+
+def test_opens_on_failure_rate_and_rejects_immediately():
+    breaker = CircuitBreaker(
+        "supplier", failure_rate=0.5, min_calls=4, open_duration=60
+    )
+
+    succeed(breaker)
+    succeed(breaker)
+    fail(breaker)
+    assert breaker.state == "closed"  # Not enough calls to judge yet
+    fail(breaker)
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        with breaker.protect():
+            pytest.fail("call must not go out while the circuit is open")
+    assert excinfo.value.retry_after > 59
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_client_errors_do_not_count_as_failures():
+    breaker = CircuitBreaker("supplier", failure_rate=0.5, min_calls=2)
+    request = httpx.Request("GET", "https://supplier.example.com")
+
+    for _ in range(4):
+        fail(
+            breaker,
+            httpx.HTTPStatusError(
+                "bad request", request=request, response=httpx.Response(400)
+            ),
+        )
+    assert breaker.state == "closed"
+
+    for _ in range(4):
+        fail(
+            breaker,
+            httpx.HTTPStatusError(
+                "unavailable", request=request, response=httpx.Response(503)
+            ),
+        )
+    assert breaker.state == "open"
+
+
+def test_opens_on_slow_call_rate():
+    breaker = CircuitBreaker(
+        "supplier", slow_call_rate=0.5, slow_call_duration=0.01, min_calls=2
+    )
+
+    succeed(breaker, duration=0.02)
+    succeed(breaker, duration=0.02)
+
+    assert breaker.state == "open"
+
+
+def test_rolling_window_forgets_old_failures():
+    breaker = CircuitBreaker("supplier", failure_rate=0.5, min_calls=3, window=0.05)
+
+    fail(breaker)
+    fail(breaker)
+    time.sleep(0.06)
+    succeed(breaker)
+
+    assert breaker.state == "closed"
+    assert breaker.stats()["calls"] == 1
+
+
+def test_half_open_closes_after_successful_trial_calls():
+    breaker = CircuitBreaker(
+        "supplier", min_calls=1, open_duration=0.02, half_open_calls=2
+    )
+    fail(breaker)
+    time.sleep(0.03)
+
+    assert breaker.stats()["state"] == "half_open"
+    first, second = breaker.protect(), breaker.protect()
+    first.__enter__()
+    second.__enter__()
+    # Only half_open_calls trial calls are let through at once
+    with pytest.raises(CircuitOpenError):
+        with breaker.protect():
+            pass
+    first.__exit__(None, None, None)
+    second.__exit__(None, None, None)
+
+    assert breaker.state == "closed"
+
+
+def test_half_open_reopens_on_failed_trial_call():
+    breaker = CircuitBreaker("supplier", min_calls=1, open_duration=0.02)
+    fail(breaker)
+    time.sleep(0.03)
+    fail(breaker)
+
+    assert breaker.state == "open"
+    assert breaker.stats()["times_opened"] == 2
+
+
+def test_cancelled_call_is_not_a_failure():
+    breaker = CircuitBreaker("supplier", min_calls=1, slow_call_duration=10)
+
+    async def call():
+        async with breaker.protect():
+            await asyncio.sleep(1)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(call(), timeout=0.01)
+
+    asyncio.run(run())
+    assert breaker.state == "closed"
+    # Nor a success: it stays out of the window
+    assert breaker.stats()["calls"] == 0
+
+
+def test_cancelled_trial_call_frees_its_slot_without_closing():
+    breaker = CircuitBreaker(
+        "supplier",
+        min_calls=1,
+        open_duration=0.02,
+        half_open_calls=1,
+        slow_call_duration=10,
+    )
+    fail(breaker)
+    time.sleep(0.03)
+
+    # A hedge loser cancelled during the trial neither closes the circuit nor keeps the slot
+    loser = breaker.protect()
+    loser.__enter__()
+    loser.__exit__(asyncio.CancelledError, asyncio.CancelledError(), None)
+    assert breaker.state == "half_open"
+
+    succeed(breaker)
+    assert breaker.state == "closed"
+
+
+def test_slow_cancelled_calls_count_as_slow():
+    breaker = CircuitBreaker(
+        "supplier", min_calls=2, slow_call_rate=0.5, slow_call_duration=0.01
+    )
+
+    for _ in range(2):
+        call = breaker.protect()
+        call.__enter__()
+        time.sleep(0.02)
+        call.__exit__(asyncio.CancelledError, asyncio.CancelledError(), None)
+
+    assert breaker.state == "open"
+
+
+def test_registry_keeps_one_breaker_per_host():
+    registry = CircuitBreakerRegistry(min_calls=1)
+    registry.configure("https://bdfare.example.com", min_calls=5)
+
+    flyhub = registry.get("https://flyhub.example.com/api/AirSearch")
+    assert registry.get("https://flyhub.example.com/api/AirPrice") is flyhub
+    assert registry.get("https://bdfare.example.com/AirShopping").min_calls == 5
+
+    fail(flyhub)
+    stats = registry.stats()
+    assert stats["https://flyhub.example.com"]["state"] == "open"
+    assert stats["https://bdfare.example.com"]["state"] == "closed"
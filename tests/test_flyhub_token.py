@@ -0,0 +1,84 @@
+import asyncio
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from services.flight_service import auth_handler
+from services.flight_service.auth_handler import FlyhubTokenCache
+
+
+def test_concurrent_callers_share_one_refresh(monkeypatch):
+    calls = []
+
+    async def authenticate():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return f"token-{len(calls)}"
+
+    monkeypatch.setattr(auth_handler, "_authenticate_flyhub", authenticate)
+    cache = FlyhubTokenCache(ttl=3600, refresh_margin=60)
+
+    async def run():
+        return await asyncio.gather(*(cache.get_token() for _ in range(20)))
+
+    tokens = asyncio.run(run())
+    assert tokens == ["token-1"] * 20
+    assert len(calls) == 1
+
+    # Cached token is reused without another Authenticate call
+    assert asyncio.run(cache.get_token()) == "token-1"
+    assert len(calls) == 1
+
+
+def test_stale_token_is_refreshed(monkeypatch):
+    calls = []
+
+    async def authenticate():
+        calls.append(1)
+        return f"token-{len(calls)}"
+
+    monkeypatch.setattr(auth_handler, "_authenticate_flyhub", authenticate)
+    # Token is stale as soon as it is issued because the margin exceeds the TTL
+    cache = FlyhubTokenCache(ttl=30, refresh_margin=60)
+
+    assert asyncio.run(cache.get_token()) == "token-1"
+    assert asyncio.run(cache.get_token()) == "token-2"
+
+
+def test_invalidate_keeps_newer_token(monkeypatch):
+    async def authenticate():
+        return "fresh-token"
+
+    monkeypatch.setattr(auth_handler, "_authenticate_flyhub", authenticate)
+    cache = FlyhubTokenCache()
+    asyncio.run(cache.get_token())
+
+    cache.invalidate("old-token")
+    assert cache.is_valid()
+
+    cache.invalidate("fresh-token")
+    assert not cache.is_valid()
+
+
+def test_flyhub_post_retries_once_after_401(monkeypatch):
+    tokens = iter(["expired-token", "fresh-token"])
+
+    async def authenticate():
+        return next(tokens)
+
+    def handler(request):
+        if request.headers["Authorization"] == "Bearer expired-token":
+            return httpx.Response(401)
+        return httpx.Response(200, json={"Results": []})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(auth_handler, "_authenticate_flyhub", authenticate)
+    monkeypatch.setattr(auth_handler, "flyhub_token_cache", FlyhubTokenCache())
+    monkeypatch.setattr(auth_handler.http_clients, "get", lambda url: client)
+
+    response = asyncio.run(auth_handler.flyhub_post("AirSearch", {}))
+
+    assert response.status_code == 200
+    assert auth_handler.flyhub_token_cache.refresh_count == 2
@@ -0,0 +1,129 @@
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from shared.api_client import AsyncAPIClient
+from shared.auth.oauth2_client import OAuth2Client
+from shared.hedging import HedgePolicy, LatencyTracker
+
+
+def warmed_up(policy, key, latency=0.01, count=20):
+    for _ in range(count):
+        policy._endpoint(key).latency.record(latency)
+    return policy
+
+
+def supplier(*delays):
+    """Call whose n-th invocation answers after delays[n]; records cancellations."""
+    calls = []
+
+    async def call():
+        index = len(calls)
+        calls.append("started")
+        try:
+            await asyncio.sleep(delays[index])
+        except asyncio.CancelledError:
+            calls[index] = "cancelled"
+            raise
+        calls[index] = "done"
+        return index
+
+    call.calls = calls
+    return call
+
+
+def test_percentile():
+    tracker = LatencyTracker(window=100)
+    for ms in range(1, 101):
+        tracker.record(ms / 1000)
+    assert tracker.percentile(0.95) == 0.095
+    assert tracker.percentile(0.5) == 0.05
+
+
+def test_no_hedge_until_latency_is_known():
+    policy = HedgePolicy(min_samples=20)
+    call = supplier(0.05)
+
+    assert asyncio.run(policy.run(call, key="flyhub:AirSearch")) == 0
+    assert policy.stats()["flyhub:AirSearch"]["hedged"] == 0
+    assert policy.stats()["flyhub:AirSearch"]["hedge_delay_ms"] is None
+
+
+def test_slow_call_is_hedged_and_loser_cancelled():
+    policy = warmed_up(HedgePolicy(min_delay=0), "flyhub:AirSearch")
+    call = supplier(1, 0.01)
+
+    assert asyncio.run(policy.run(call, key="flyhub:AirSearch")) == 1
+    assert call.calls == ["cancelled", "done"]
+    stats = policy.stats()["flyhub:AirSearch"]
+    assert stats["hedged"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_fast_call_is_not_hedged():
+    policy = warmed_up(HedgePolicy(min_delay=0), "flyhub:AirSearch", latency=0.05)
+    call = supplier(0.01)
+
+    assert asyncio.run(policy.run(call, key="flyhub:AirSearch")) == 0
+    assert call.calls == ["done"]
+
+
+def test_failed_hedge_waits_for_primary():
+    policy = warmed_up(HedgePolicy(min_delay=0), "bdfare:AirShopping")
+    calls = []
+
+    async def call():
+        calls.append(1)
+        if len(calls) == 2:
+            raise httpx.ConnectError("refused")
+        await asyncio.sleep(0.05)
+        return "primary"
+
+    assert asyncio.run(policy.run(call, key="bdfare:AirShopping")) == "primary"
+
+
+def test_hedges_are_capped_by_budget():
+    policy = warmed_up(
+        HedgePolicy(min_delay=0, budget_ratio=0.5, budget_initial=1), "flyhub:AirSearch"
+    )
+
+    async def run():
+        for _ in range(4):
+            await policy.run(supplier(0.05, 0.001), key="flyhub:AirSearch")
+
+    asyncio.run(run())
+    stats = policy.stats()["flyhub:AirSearch"]
+    # 1 initial token plus 0.5 per call allows 3 hedges in 4 calls
+    assert stats["hedged"] == 3
+    assert stats["budget_exhausted"] == 1
+
+
+def test_async_api_client_hedges_configured_endpoints():
+    oauth2_client = Mock(spec=OAuth2Client)
+    oauth2_client.aget_access_token = AsyncMock(return_value="test_token")
+    requests_seen = []
+
+    async def handler(request):
+        requests_seen.append(request.url.path)
+        if len(requests_seen) == 1:
+            await asyncio.sleep(1)
+        return httpx.Response(200, json={"path": request.url.path})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    api_client = AsyncAPIClient(
+        "https://api.example.com",
+        oauth2_client,
+        http_client=http_client,
+        hedged_endpoints=["/availability"],
+    )
+    api_client.hedge_policy = warmed_up(
+        HedgePolicy(min_delay=0), "GET https://api.example.com/availability"
+    )
+
+    response = asyncio.run(api_client.get("/availability"))
+    assert response == {"status": "success", "data": {"path": "/availability"}}
+    assert requests_seen == ["/availability", "/availability"]
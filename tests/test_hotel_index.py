@@ -0,0 +1,311 @@
+import asyncio
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from services.hotel_service import availability_index
+
+
+def day(offset):
+    return (date.today() + timedelta(days=offset)).isoformat()
+
+
+def calendar(rates, sold_out=()):
+    return {
+        day(night): {"available": 0 if night in sold_out else 5, "rate": rate}
+        for night, rate in enumerate(rates)
+    }
+
+
+class FakeHotelAPI:
+    """Stand-in for the hotel API client: inventory pages, changes since a cursor and live rates."""
+
+    def __init__(self, hotels, page_size=2):
+        self.hotels = hotels
+        self.page_size = page_size
+        self.changes = []
+        self.live_rates = {}
+        self.rates_fail = False
+        self.calls = []
+
+    async def get(self, endpoint, params=None):
+        self.calls.append((endpoint, dict(params or {})))
+        if params and params.get("updated_since"):
+            return {
+                "status": "success",
+                "data": {"hotels": self.changes, "cursor": "c2"},
+            }
+        page = (params or {}).get("page", 0)
+        start = page * self.page_size
+        stop = start + self.page_size
+        more = stop < len(self.hotels)
+        return {
+            "status": "success",
+            "data": {
+                "hotels": self.hotels[start:stop],
+                "cursor": "c1",
+                "next_page": page + 1 if more else None,
+            },
+        }
+
+    async def post(self, endpoint, data):
+        self.calls.append((endpoint, data))
+        if self.rates_fail:
+            return {"status": "error", "errors": ["API request failed"]}
+        return {
+            "status": "success",
+            "data": {
+                "rates": {
+                    hotel_id: self.live_rates.get(
+                        hotel_id, {"available": True, "total": 999.0}
+                    )
+                    for hotel_id in data["hotel_ids"]
+                }
+            },
+        }
+
+
+HOTELS = [
+    {
+        "hotel_id": "H1",
+        "name": "Cheap",
+        "location": "DXB",
+        "calendar": calendar([100, 100, 100, 100]),
+    },
+    {
+        "hotel_id": "H2",
+        "name": "Pricey",
+        "location": "dxb",
+        "calendar": calendar([300, 300, 300, 300]),
+    },
+    {
+        "hotel_id": "H3",
+        "name": "Sold out",
+        "location": "DXB",
+        "calendar": calendar([50, 50, 50, 50], sold_out={2}),
+    },
+    {
+        "hotel_id": "H4",
+        "name": "Elsewhere",
+        "location": "DAC",
+        "calendar": calendar([80, 80, 80, 80]),
+    },
+]
+
+
+def build_index(client):
+    index = availability_index.HotelAvailabilityIndex(client, horizon_days=30)
+    assert asyncio.run(index.refresh())
+    return index
+
+
+def test_full_refresh_pages_through_inventory():
+    client = FakeHotelAPI(HOTELS)
+    index = build_index(client)
+
+    assert [params.get("page", 0) for endpoint, params in client.calls] == [0, 1]
+    assert index.ready
+    assert index.stats()["hotels"] == 4
+
+
+def test_query_matches_location_and_whole_stay():
+    index = build_index(FakeHotelAPI(HOTELS))
+
+    # Nights 0 and 1: H3 has rooms and is cheapest
+    assert [
+        (c.hotel_id, total) for c, total in index.query(" Dxb ", day(0), day(2))
+    ] == [("H3", 100.0), ("H1", 200.0), ("H2", 600.0)]
+    # Nights 1 to 3 include H3's sold-out night
+    assert [c.hotel_id for c, _ in index.query("DXB", day(1), day(4))] == ["H1", "H2"]
+    # Outside the horizon or an empty stay
+    assert index.query("DXB", day(-1), day(1)) == []
+    assert index.query("DXB", day(2), day(2)) == []
+
+
+def test_incremental_refresh_applies_only_changes():
+    client = FakeHotelAPI(HOTELS)
+    index = build_index(client)
+    client.changes = [
+        {"hotel_id": "H3", "calendar": {day(2): {"available": 4, "rate": 50}}},
+        {"hotel_id": "H2", "deleted": True},
+        {"hotel_id": "H4", "location": "DXB"},
+    ]
+
+    assert asyncio.run(index.refresh())
+    assert client.calls[-1] == ("/hotels/inventory", {"updated_since": "c1"})
+    assert [c.hotel_id for c, _ in index.query("DXB", day(1), day(4))] == [
+        "H3",
+        "H4",
+        "H1",
+    ]
+    assert index.query("DAC", day(0), day(1)) == []
+
+
+def test_failed_refresh_keeps_serving_the_index():
+    client = FakeHotelAPI(HOTELS)
+    index = build_index(client)
+
+    async def failing_get(endpoint, params=None):
+        return {"status": "error", "errors": ["API request failed"]}
+
+    client.get = failing_get
+    assert not asyncio.run(index.refresh())
+    assert index.stats()["failures"] == 1
+    assert len(index.query("DXB", day(0), day(2))) == 3
+
+
+def test_search_reprices_only_the_shortlist():
+    client = FakeHotelAPI(HOTELS)
+    index = build_index(client)
+    client.live_rates = {
+        "H3": {"available": False},
+        "H1": {"available": True, "total": 180.0},
+    }
+
+    response = asyncio.run(
+        availability_index.search_available_hotels(
+            "DXB", day(0), day(2), index=index, shortlist_size=2
+        )
+    )
+
+    assert client.calls[-1] == (
+        "/hotels/rates",
+        {"hotel_ids": ["H3", "H1"], "check_in": day(0), "check_out": day(2)},
+    )
+    assert response["data"]["hotels"] == [
+        {
+            "hotel_id": "H1",
+            "name": "Cheap",
+            "location": "DXB",
+            "total": 180.0,
+            "priced": "live",
+        },
+        {
+            "hotel_id": "H2",
+            "name": "Pricey",
+            "location": "dxb",
+            "total": 600.0,
+            "priced": "indexed",
+        },
+    ]
+
+
+def test_search_keeps_indexed_prices_when_repricing_fails():
+    client = FakeHotelAPI(HOTELS)
+    index = build_index(client)
+    client.rates_fail = True
+
+    response = asyncio.run(
+        availability_index.search_available_hotels(
+            "DXB", day(0), day(2), index=index, shortlist_size=1
+        )
+    )
+
+    assert [
+        (hotel["hotel_id"], hotel["priced"]) for hotel in response["data"]["hotels"]
+    ] == [("H3", "indexed"), ("H1", "indexed"), ("H2", "indexed")]
+
+
+def test_search_goes_to_the_supplier_until_the_index_is_loaded(monkeypatch):
+    from services.hotel_service import api
+
+    async def search_hotels(location, check_in, check_out):
+        return {"status": "success", "data": {"live": location}}
+
+    monkeypatch.setattr(api, "search_hotels", search_hotels)
+    index = availability_index.HotelAvailabilityIndex(FakeHotelAPI(HOTELS))
+
+    assert asyncio.run(
+        availability_index.search_available_hotels("DXB", day(0), day(2), index=index)
+    ) == {
+        "status": "success",
+        "data": {"live": "DXB"},
+    }
+
+
+def test_malformed_records_are_skipped_and_the_rest_applied():
+    client = FakeHotelAPI(
+        HOTELS
+        + [
+            {"name": "No id", "location": "DXB", "calendar": calendar([10])},
+            {
+                "hotel_id": "H5",
+                "location": "DXB",
+                "calendar": {"tomorrow": {"available": 1, "rate": 10}},
+            },
+            {"hotel_id": "H6", "location": "DXB", "calendar": calendar(["cheap"])},
+        ],
+        page_size=10,
+    )
+    index = build_index(client)
+    assert index.stats()["hotels"] == 4
+    assert index.stats()["skipped_records"] == 3
+
+    # A bad change leaves the hotel as it was, and the good ones still apply
+    client.changes = [
+        {
+            "hotel_id": "H1",
+            "name": "Renamed",
+            "calendar": {day(0): {"available": 3, "rate": "n/a"}},
+        },
+        {"hotel_id": "H2", "deleted": True},
+        {"hotel_id": "H7", "calendar": calendar([10])},
+    ]
+    assert asyncio.run(index.refresh())
+    assert [
+        (c.hotel_id, c.name, total) for c, total in index.query("DXB", day(0), day(2))
+    ] == [("H3", "Sold out", 100.0), ("H1", "Cheap", 200.0)]
+    assert index.stats()["skipped_records"] == 5
+
+
+def test_periodic_refresh_survives_errors(monkeypatch):
+    index = availability_index.HotelAvailabilityIndex(
+        FakeHotelAPI(HOTELS), refresh_interval=0.001
+    )
+    attempts = []
+
+    async def refresh():
+        attempts.append(1)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(index, "refresh", refresh)
+
+    async def run():
+        index.start()
+        await asyncio.sleep(0.05)
+        await index.stop()
+
+    asyncio.run(run())
+    assert len(attempts) > 1
+    assert index.stats()["failures"] == len(attempts)
+
+
+def test_dates_are_validated_before_choosing_a_path(monkeypatch):
+    from services.hotel_service import api
+
+    async def search_hotels(location, check_in, check_out):
+        raise RuntimeError("token endpoint unreachable")
+
+    monkeypatch.setattr(api, "search_hotels", search_hotels)
+    loading = availability_index.HotelAvailabilityIndex(FakeHotelAPI(HOTELS))
+    loaded = build_index(FakeHotelAPI(HOTELS))
+
+    for index in (loading, loaded):
+        for check_in, check_out in (("tomorrow", day(2)), (day(2), day(1))):
+            with pytest.raises(ValueError):
+                asyncio.run(
+                    availability_index.search_available_hotels(
+                        "DXB", check_in, check_out, index=index
+                    )
+                )
+    assert (
+        asyncio.run(
+            availability_index.search_available_hotels(
+                "DXB", day(0), day(2), index=loading
+            )
+        )["status"]
+        == "error"
+    )
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from shared.http_clients import CountingTransport, HTTPClientRegistry
+
+
+def test_one_client_per_host():
+    registry = HTTPClientRegistry()
+
+    flyhub = registry.get("http://api.sandbox.flyhub.com/api/v1/AirSearch")
+    assert registry.get("http://api.sandbox.flyhub.com/api/v1/Authenticate") is flyhub
+    assert registry.get("https://bdf.example.com/api/enterprise/") is not flyhub
+    assert set(registry.stats()) == {
+        "http://api.sandbox.flyhub.com",
+        "https://bdf.example.com",
+    }
+
+    asyncio.run(registry.aclose())
+
+
+def test_per_host_pool_settings():
+    registry = HTTPClientRegistry(max_connections=10)
+    registry.configure("https://bdf.example.com", max_connections=50)
+
+    registry.get("https://bdf.example.com/api/enterprise/")
+    registry.get("http://api.sandbox.flyhub.com/api/v1/")
+
+    stats = registry.stats()
+    assert stats["https://bdf.example.com"]["max_connections"] == 50
+    assert stats["http://api.sandbox.flyhub.com"]["max_connections"] == 10
+    assert stats["http://api.sandbox.flyhub.com"]["connections"] == 0
+
+    asyncio.run(registry.aclose())
+
+
+def test_unknown_pool_setting():
+    registry = HTTPClientRegistry()
+    with pytest.raises(ValueError, match="Unknown pool settings"):
+        registry.configure("https://bdf.example.com", pool_size=5)
+
+
+def test_closed_clients_are_recreated():
+    registry = HTTPClientRegistry()
+    client = registry.get("https://bdf.example.com")
+
+    asyncio.run(registry.aclose())
+
+    assert client.is_closed
+    assert registry.stats() == {}
+    assert registry.get("https://bdf.example.com") is not client
+
+
+def test_in_flight_requests_are_counted_until_the_body_is_closed():
+    async def handler(request):
+        return httpx.Response(200, content=b"ok")
+
+    async def run():
+        transport = CountingTransport(httpx.MockTransport(handler))
+        async with httpx.AsyncClient(transport=transport) as client:
+            async with client.stream("GET", "https://bdf.example.com/") as response:
+                assert transport.in_flight == 1
+                await response.aread()
+            assert (transport.in_flight, transport.requests) == (0, 1)
+            await client.get("https://bdf.example.com/")
+            assert (transport.in_flight, transport.requests) == (0, 2)
+
+    asyncio.run(run())
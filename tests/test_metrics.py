@@ -0,0 +1,120 @@
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from shared.exceptions import RateLimitExceeded
+from shared.metrics import StatsCollector, track_upstream
+from shared.rate_limiter import RateLimiter
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_request_latency_is_recorded_per_router_prefix():
+    from main import app
+
+    client = TestClient(app)
+    before = sample(
+        "travel_http_request_duration_seconds_count",
+        prefix="/api/v1/flights",
+        method="GET",
+        status="2xx",
+    )
+
+    client.get("/api/v1/flights/")
+    client.get("/api/v1/flights/BK123")
+
+    after = sample(
+        "travel_http_request_duration_seconds_count",
+        prefix="/api/v1/flights",
+        method="GET",
+        status="2xx",
+    )
+    assert after - before == 2
+
+
+def test_metrics_endpoint():
+    from main import app
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "travel_http_request_duration_seconds_bucket" in response.text
+    assert "travel_single_flight_requests" in response.text
+
+
+def test_upstream_status_classes():
+    request = httpx.Request("POST", "https://supplier.example.com/AirSearch")
+    before = {
+        status: sample(
+            "travel_upstream_request_duration_seconds_count",
+            upstream="test",
+            status=status,
+        )
+        for status in ("2xx", "5xx", "timeout", "error")
+    }
+
+    async def run():
+        async with track_upstream("test"):
+            pass
+        with pytest.raises(httpx.HTTPStatusError):
+            async with track_upstream("test"):
+                raise httpx.HTTPStatusError(
+                    "down", request=request, response=httpx.Response(503)
+                )
+        with pytest.raises(httpx.ReadTimeout):
+            async with track_upstream("test"):
+                raise httpx.ReadTimeout("slow")
+        with pytest.raises(httpx.ConnectError):
+            async with track_upstream("test"):
+                raise httpx.ConnectError("refused")
+
+    asyncio.run(run())
+    for status in before:
+        assert (
+            sample(
+                "travel_upstream_request_duration_seconds_count",
+                upstream="test",
+                status=status,
+            )
+            - before[status]
+            == 1
+        )
+
+
+def test_rate_limiter_rejections_are_counted():
+    limiter = RateLimiter(1, 60, name="test")
+    limiter.acquire()
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire()
+    assert sample("travel_rate_limit_rejections_total", limiter="test") == 1
+
+
+def test_stats_collector_exports_numeric_stats():
+    collector = StatsCollector(
+        "travel_test_pool",
+        "origin",
+        lambda: {
+            "https://flyhub.example.com": {
+                "connections": 3,
+                "http2": True,
+                "state": "open",
+                "delay": None,
+            }
+        },
+    )
+    families = {family.name: family for family in collector.collect()}
+
+    assert set(families) == {"travel_test_pool_connections", "travel_test_pool_http2"}
+    assert families["travel_test_pool_connections"].samples[0].labels == {
+        "origin": "https://flyhub.example.com"
+    }
+    assert families["travel_test_pool_connections"].samples[0].value == 3
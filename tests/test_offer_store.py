@@ -0,0 +1,326 @@
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from services.flight_service import flight_service
+from services.flight_service.offer_store import OfferStore, offer_store
+from shared import fast_json
+from tests.test_result_combiner import bdfare_offer, flyhub_result
+
+
+def test_entries_expire_and_oldest_are_evicted(monkeypatch):
+    from services.flight_service import offer_store as offer_store_module
+
+    now = [1000.0]
+    monkeypatch.setattr(offer_store_module.time, "monotonic", lambda: now[0])
+    store = OfferStore(ttl=60, max_entries=2)
+    store.put("A", "Flyhub", "S1", 100, "BDT")
+    store.put("B", "Flyhub", "S1", 200, "BDT")
+    store.put("C", "Bdfare", "T1", 300, "BDT")
+
+    assert store.get("A") is None
+    assert store.get("C").search_ref == "T1"
+    assert store.stats()["evictions"] == 1
+
+    now[0] += 61
+    assert store.get("C") is None
+    # Expired entries at the front are dropped as new ones arrive
+    store.put("D", "Flyhub", "S2", 400, "BDT")
+    assert len(store) == 1 and store.get("D").total_fare == 400
+
+
+def test_remember_keeps_alternatives_with_their_supplier_context():
+    store = OfferStore()
+    store.remember(
+        [
+            {
+                "source": "Bdfare",
+                "result_id": "BD1",
+                "total_fare": 300,
+                "currency": "BDT",
+                "alternatives": [
+                    {"source": "Flyhub", "result_id": "FH1", "total_fare": 350}
+                ],
+            }
+        ],
+        {"flyhub": "SEARCH-1", "bdfare": "TRACE-1"},
+    )
+
+    assert (store.get("BD1").source, store.get("BD1").search_ref) == (
+        "Bdfare",
+        "TRACE-1",
+    )
+    assert (
+        store.get("FH1").source,
+        store.get("FH1").search_ref,
+        store.get("FH1").currency,
+    ) == ("Flyhub", "SEARCH-1", "BDT")
+
+
+def test_searches_are_held_until_one_of_their_offers_goes():
+    store = OfferStore(max_entries=2)
+    store.remember(
+        [
+            {
+                "source": "Flyhub",
+                "result_id": "FH1",
+                "total_fare": 100,
+                "currency": "BDT",
+                "alternatives": [],
+            }
+        ],
+        {"flyhub": "SEARCH-1"},
+        "search-1",
+    )
+    assert store.has_search("search-1") and not store.has_search("search-2")
+
+    store.put("A", "Flyhub", "S2", 200, "BDT")
+    store.put("B", "Flyhub", "S2", 300, "BDT")
+    assert store.get("FH1") is None
+    assert not store.has_search("search-1")
+
+
+def test_lookups_stay_constant_time_when_full():
+    store = OfferStore(max_entries=100000)
+    for i in range(100000):
+        store.put(f"R{i}", "Flyhub", "S1", i, "BDT")
+    started = time.perf_counter()
+    for i in range(10000):
+        store.get(f"R{i * 10}")
+        store.put(f"N{i}", "Flyhub", "S2", i, "BDT")
+    assert (time.perf_counter() - started) / 10000 < 0.0001
+    assert len(store) == 100000
+
+
+class FakeSuppliers:
+    """Answers supplier POSTs from canned payloads and records them."""
+
+    def __init__(self):
+        self.calls = []
+        self.fares = {"FH1": 500, "BD1": 450}
+
+    async def post(self, supplier, endpoint, payload, timeout):
+        self.calls.append((supplier, endpoint, payload))
+        if endpoint == "AirSearch":
+            body = {
+                "SearchId": "SEARCH-1",
+                "Results": [flyhub_result("FH1", 500, "101")],
+            }
+        elif endpoint == "AirShopping":
+            body = {
+                "response": {
+                    "traceId": "TRACE-1",
+                    "offersGroup": [bdfare_offer("BD1", 450, "102")],
+                }
+            }
+        elif endpoint == "AirPrice":
+            body = {"Results": [flyhub_result("FH1", self.fares["FH1"], "101")]}
+        elif endpoint == "OfferPrice":
+            body = {
+                "response": {
+                    "offersGroup": [bdfare_offer("BD1", self.fares["BD1"], "102")]
+                }
+            }
+        else:
+            body = {"BookingID": f"{endpoint}-1"}
+        return httpx.Response(200, content=fast_json.dumps(body))
+
+
+@pytest.fixture
+def client(monkeypatch):
+    suppliers = FakeSuppliers()
+    monkeypatch.setattr(flight_service, "_supplier_post", suppliers.post)
+    app = FastAPI()
+    app.include_router(flight_service.router, prefix="/api/v1/flights")
+    client = TestClient(app)
+    client.suppliers = suppliers
+    return client
+
+
+def search(client):
+    params = {
+        "segments": [
+            {"origin": "DAC", "destination": "DXB", "departure_date": "2099-11-02"}
+        ],
+        "passengers": {"adults": 1},
+        "cabin_class": "economy",
+        "trip_type": "one_way",
+    }
+    response = client.post("/api/v1/flights/search", json=params)
+    assert response.status_code == 200
+    return response.json()["results"]
+
+
+def test_verify_price_is_one_supplier_call(client):
+    assert {offer["result_id"] for offer in search(client)} == {"FH1", "BD1"}
+    client.suppliers.calls.clear()
+    client.suppliers.fares["BD1"] = 470
+
+    flyhub = client.post(
+        "/api/v1/flights/verify-price", params={"offer_id": "FH1"}
+    ).json()
+    bdfare = client.post(
+        "/api/v1/flights/verify-price", params={"offer_id": "BD1"}
+    ).json()
+
+    assert client.suppliers.calls == [
+        ("flyhub", "AirPrice", {"SearchID": "SEARCH-1", "ResultID": "FH1"}),
+        ("bdfare", "OfferPrice", {"traceId": "TRACE-1", "offerId": ["BD1"]}),
+    ]
+    assert (flyhub["total_fare"], flyhub["price_changed"]) == (500, False)
+    assert (bdfare["quoted_fare"], bdfare["total_fare"], bdfare["price_changed"]) == (
+        450,
+        470,
+        True,
+    )
+
+
+def test_create_booking_is_one_supplier_call_and_consumes_the_offer(client):
+    search(client)
+    client.suppliers.calls.clear()
+    passengers = [{"first_name": "A", "last_name": "B"}]
+
+    response = client.post(
+        "/api/v1/flights/create-booking",
+        json={
+            "offer_id": "BD1",
+            "passengers": passengers,
+            "contact": {"email": "a@example.com"},
+        },
+    )
+
+    assert response.json() == {
+        "offer_id": "BD1",
+        "source": "Bdfare",
+        "booking": {"BookingID": "OrderCreate-1"},
+    }
+    assert client.suppliers.calls == [
+        (
+            "bdfare",
+            "OrderCreate",
+            {
+                "traceId": "TRACE-1",
+                "offerId": ["BD1"],
+                "request": {
+                    "contactInfo": {"email": "a@example.com"},
+                    "paxList": passengers,
+                },
+            },
+        )
+    ]
+    assert offer_store.get("BD1") is None
+
+
+def test_unknown_offers_and_failed_suppliers(client, monkeypatch):
+    assert (
+        client.post(
+            "/api/v1/flights/verify-price", params={"offer_id": "nope"}
+        ).status_code
+        == 404
+    )
+    assert (
+        client.post(
+            "/api/v1/flights/create-booking", json={"offer_id": "FH1"}
+        ).status_code
+        == 400
+    )
+
+    search(client)
+
+    async def failing_post(supplier, endpoint, payload, timeout):
+        return httpx.Response(
+            500, request=httpx.Request("POST", "http://supplier")
+        ).raise_for_status()
+
+    monkeypatch.setattr(flight_service, "_supplier_post", failing_post)
+    response = client.post(
+        "/api/v1/flights/create-booking", json={"offer_id": "FH1", "passengers": []}
+    )
+    assert response.status_code == 502
+    assert response.json()["detail"]["flyhub"]["http_status"] == 500
+    # A failed booking leaves the offer bookable
+    assert offer_store.get("FH1") is not None
+
+
+def test_cache_hits_refill_the_offer_store(client, monkeypatch):
+    search(client)
+    # The cached search was made by another replica, or before a restart
+    monkeypatch.setattr(flight_service, "offer_store", OfferStore())
+    client.suppliers.calls.clear()
+
+    assert {offer["result_id"] for offer in search(client)} == {"FH1", "BD1"}
+    assert (
+        client.post(
+            "/api/v1/flights/verify-price", params={"offer_id": "BD1"}
+        ).status_code
+        == 200
+    )
+    assert [endpoint for supplier, endpoint, payload in client.suppliers.calls] == [
+        "OfferPrice"
+    ]
+    assert client.suppliers.calls[0][2]["traceId"] == "TRACE-1"
+
+    monkeypatch.setattr(flight_service, "offer_store", OfferStore())
+    client.suppliers.calls.clear()
+    client.post(
+        "/api/v1/flights/search/stream",
+        json={
+            "segments": [
+                {"origin": "DAC", "destination": "DXB", "departure_date": "2099-11-02"}
+            ],
+            "passengers": {"adults": 1},
+            "cabin_class": "economy",
+            "trip_type": "one_way",
+        },
+    )
+    assert client.suppliers.calls == []
+    assert flight_service.offer_store.get("FH1").search_ref == "SEARCH-1"
+
+
+def test_bookings_outlast_the_search_timeout_and_report_unknown_outcomes(
+    client, monkeypatch
+):
+    from services.flight_service import supplier_search
+
+    monkeypatch.setattr(flight_service, "offer_store", OfferStore())
+    search(client)
+    monkeypatch.setitem(supplier_search.SUPPLIER_TIMEOUTS, "bdfare", 0.01)
+    timeouts = []
+
+    async def slow_post(supplier, endpoint, payload, timeout):
+        timeouts.append(timeout)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, content=fast_json.dumps({"BookingID": "B-1"}))
+
+    monkeypatch.setattr(flight_service, "_supplier_post", slow_post)
+    booking = {"offer_id": "BD1", "passengers": []}
+    response = client.post("/api/v1/flights/create-booking", json=booking)
+    assert response.json()["booking"] == {"BookingID": "B-1"}
+    assert timeouts == [flight_service.FLIGHT_BOOKING_TIMEOUT]
+
+    # A booked offer is gone from the store; the next tries book FH1
+    booking = {"offer_id": "FH1", "passengers": []}
+
+    async def timing_out_post(supplier, endpoint, payload, timeout):
+        raise httpx.ReadTimeout("read timed out")
+
+    monkeypatch.setattr(flight_service, "_supplier_post", timing_out_post)
+    response = client.post("/api/v1/flights/create-booking", json=booking)
+    assert response.status_code == 504
+    assert response.json()["detail"]["status"] == "outcome_unknown"
+    assert flight_service.offer_store.get("FH1") is not None
+
+    async def unreachable_post(supplier, endpoint, payload, timeout):
+        raise httpx.ConnectTimeout("connect timed out")
+
+    monkeypatch.setattr(flight_service, "_supplier_post", unreachable_post)
+    assert (
+        client.post("/api/v1/flights/create-booking", json=booking).status_code == 502
+    )
@@ -0,0 +1,208 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from shared import rate_limiter
+from shared.exceptions import RateLimitExceeded
+from shared.rate_limiter import RateLimiter
+
+
+def test_reject_mode_allows_burst_then_rejects():
+    limiter = RateLimiter(calls=3, period=60)
+
+    for _ in range(3):
+        limiter.acquire("client-a")
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        limiter.acquire("client-a")
+
+    assert excinfo.value.retry_after == pytest.approx(20, abs=0.1)
+    assert limiter.rejections == 1
+
+
+def test_limits_are_tracked_per_key():
+    limiter = RateLimiter(calls=1, period=60)
+
+    limiter.acquire("client-a")
+    limiter.acquire("client-b")
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire("client-a")
+
+
+def test_no_double_burst_at_window_boundary():
+    # A fixed window would allow 2x the limit across a boundary; the bucket only refills gradually
+    limiter = RateLimiter(calls=10, period=0.1)
+    allowed = 0
+    deadline = time.monotonic() + 0.1
+    while time.monotonic() < deadline:
+        try:
+            limiter.acquire()
+            allowed += 1
+        except RateLimitExceeded:
+            pass
+    assert allowed <= 21
+
+
+def test_wait_mode_spaces_calls_evenly():
+    limiter = RateLimiter(calls=20, period=1, burst=1, mode="wait", max_wait=1)
+
+    started = time.monotonic()
+    for _ in range(5):
+        limiter.acquire("supplier:flyhub")
+
+    # First call is immediate, the next four are 50ms apart
+    assert time.monotonic() - started == pytest.approx(0.2, abs=0.05)
+
+
+def test_wait_mode_rejects_beyond_max_wait():
+    limiter = RateLimiter(calls=1, period=10, burst=1, mode="wait", max_wait=0.5)
+
+    limiter.acquire()
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire()
+
+
+def test_concurrent_threads_never_exceed_capacity():
+    limiter = RateLimiter(calls=50, period=60)
+    allowed = []
+
+    def worker():
+        for _ in range(20):
+            try:
+                limiter.acquire("shared")
+                allowed.append(1)
+            except RateLimitExceeded:
+                pass
+
+    threads = [threading.Thread(target=worker) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(allowed) == 50
+
+
+def test_decorators_for_sync_and_async_callables():
+    limiter = RateLimiter(calls=1, period=60, key_func=lambda client_id: client_id)
+
+    @limiter
+    def sync_call(client_id):
+        return f"sync {client_id}"
+
+    @limiter
+    async def async_call(client_id):
+        return f"async {client_id}"
+
+    assert sync_call("a") == "sync a"
+    assert asyncio.run(async_call("b")) == "async b"
+    with pytest.raises(RateLimitExceeded):
+        sync_call("b")
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(async_call("a"))
+
+
+def test_async_wait_mode_does_not_block_loop():
+    limiter = RateLimiter(calls=20, period=1, burst=1, mode="wait", max_wait=1)
+
+    async def run():
+        started = time.monotonic()
+        await asyncio.gather(*(limiter.aacquire() for _ in range(5)))
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) == pytest.approx(0.2, abs=0.05)
+
+
+def test_in_memory_store_prunes_full_buckets():
+    store = rate_limiter.InMemoryBucketStore(max_keys=10)
+    for i in range(50):
+        store.reserve(f"key-{i}", rate=1000, capacity=1, tokens=1, max_wait=0)
+    time.sleep(0.01)
+    store.reserve("last", rate=1000, capacity=1, tokens=1, max_wait=0)
+
+    assert len(store._tats) <= 11
+
+
+# Test the shared-store backend against a local Redis stand-in
+def test_redis_store_shares_limits_across_replicas(redis_standin):
+    import redis
+
+    replica_a = RateLimiter(
+        calls=2,
+        period=60,
+        store=rate_limiter.RedisBucketStore(
+            client=redis.Redis.from_url(redis_standin.url)
+        ),
+    )
+    replica_b = RateLimiter(
+        calls=2,
+        period=60,
+        store=rate_limiter.RedisBucketStore(
+            client=redis.Redis.from_url(redis_standin.url)
+        ),
+    )
+
+    replica_a.acquire("client-a")
+    replica_b.acquire("client-a")
+    with pytest.raises(RateLimitExceeded):
+        replica_a.acquire("client-a")
+    replica_b.acquire("client-b")
+
+    assert "EXEC" in redis_standin.commands
+
+
+def test_redis_store_async(redis_standin):
+    import redis.asyncio
+
+    async def run():
+        client = redis.asyncio.Redis.from_url(redis_standin.url)
+        limiter = RateLimiter(
+            calls=20,
+            period=1,
+            burst=1,
+            mode="wait",
+            max_wait=1,
+            store=rate_limiter.RedisBucketStore(async_client=client),
+        )
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.aacquire("supplier:bdfare")
+        elapsed = time.monotonic() - started
+        await client.aclose()
+        return elapsed
+
+    assert asyncio.run(run()) == pytest.approx(0.1, abs=0.05)
+
+
+def test_in_memory_store_is_bounded_under_a_flood_of_busy_keys():
+    store = rate_limiter.InMemoryBucketStore(max_keys=100)
+    store.reserve("regular", rate=0.001, capacity=1, tokens=1, max_wait=0)
+    for i in range(1000):
+        store.reserve(f"flood-{i}", rate=0.001, capacity=1, tokens=1, max_wait=0)
+        assert len(store._tats) <= 100
+
+    # The least recently used keys are the ones forgotten
+    assert "regular" not in store._tats and "flood-999" in store._tats
+
+
+def test_clients_are_limited_by_known_key_or_address(monkeypatch):
+    from starlette.requests import Request
+
+    import main
+
+    def request(api_key=None, host="203.0.113.7"):
+        headers = [(b"api-key", api_key.encode())] if api_key else []
+        return Request({"type": "http", "headers": headers, "client": (host, 1234)})
+
+    monkeypatch.setattr(main, "CLIENT_API_KEYS", frozenset({"issued-key"}))
+    assert main.client_identity(request("issued-key")) == "key:issued-key"
+    # Made-up keys do not get their own buckets
+    assert (
+        main.client_identity(request("rotated-1"))
+        == main.client_identity(request("rotated-2"))
+        == "ip:203.0.113.7"
+    )
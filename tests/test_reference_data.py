@@ -0,0 +1,142 @@
+import os
+import sys
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from services.flight_service import reference_data
+from services.flight_service.result_combiner import parse_bdfare, parse_flyhub
+from tests.test_result_combiner import bdfare_offer, flyhub_result
+
+
+def search(origin="DAC", destination="DXB", airlines=()):
+    return {
+        "segments": [
+            {
+                "origin": origin,
+                "destination": destination,
+                "departure_date": "2099-12-20",
+            }
+        ],
+        "cabin_class": "economy",
+        "trip_type": "one_way",
+        "preferred_airlines": list(airlines),
+    }
+
+
+def test_known_codes_pass_validation():
+    reference_data.validate_flight_search(
+        search("dac", " DXB ", ["bg", "EK"]), mode="strict"
+    )
+
+
+def test_unknown_and_malformed_codes_are_all_reported():
+    with pytest.raises(ValueError) as e:
+        reference_data.validate_flight_search(
+            search("QQQ", "Dubai", ["ZZ"]), mode="strict"
+        )
+
+    assert str(e.value) == (
+        "unknown airport QQQ; destination 'Dubai' is not an IATA airport code; "
+        "unknown airline ZZ"
+    )
+
+
+def test_malformed_fields_are_all_reported_in_every_mode():
+    malformed = {**search(), "preferred_airlines": [12], "adult_count": "2"}
+    del malformed["cabin_class"]
+    for mode in ("strict", "format", "off"):
+        with pytest.raises(ValueError) as e:
+            reference_data.validate_flight_search(malformed, mode=mode)
+        assert str(e.value) == (
+            "cabin_class must be a string; preferred_airlines must be a list of strings; "
+            "adult_count must be a whole number"
+        )
+
+    with pytest.raises(ValueError, match="segments must be"):
+        reference_data.validate_flight_search({**search(), "segments": "DAC-DXB"})
+    with pytest.raises(ValueError, match="every segment needs a string origin"):
+        reference_data.validate_flight_search(search(origin=None))
+
+
+def test_format_mode_only_checks_code_shape():
+    reference_data.validate_flight_search(search("QQQ", "XYZ"), mode="format")
+    # The default: routes missing from the bundled data are still searched
+    reference_data.validate_flight_search(search("DAC", "GRU"))
+    with pytest.raises(ValueError):
+        reference_data.validate_flight_search(search("QQQ", "Dubai"), mode="format")
+    reference_data.validate_flight_search(search("QQQ", "Dubai"), mode="off")
+
+
+def test_autocomplete_matches_codes_names_and_cities():
+    airports = reference_data.reference_data().airports
+
+    # The exact code first, then other prefix matches
+    assert [airport["code"] for airport in airports.search("dac", 3)][0] == "DAC"
+    assert {airport["code"] for airport in airports.search("shahjalal")} == {"DAC"}
+    assert {airport["code"] for airport in airports.search("  New  York ")} == {
+        "JFK",
+        "LGA",
+    }
+    assert {airport["code"] for airport in airports.search("Dub")} >= {
+        "DXB",
+        "DWC",
+        "DUB",
+    }
+    assert len(airports.search("a", 5)) == 5
+    assert airports.search("") == []
+    assert reference_data.reference_data().airlines.search("biman")[0] == {
+        "code": "BG",
+        "name": "Biman Bangladesh Airlines",
+        "country": "BD",
+    }
+
+
+def test_autocomplete_is_well_under_a_millisecond():
+    airports = reference_data.reference_data().airports
+    started = time.perf_counter()
+    for _ in range(1000):
+        airports.search("ba")
+    assert (time.perf_counter() - started) / 1000 < 0.0005
+
+
+def test_parsers_share_reference_strings():
+    reference = reference_data.reference_data()
+    flyhub = parse_flyhub(
+        {"Results": [flyhub_result("FH1", 300), flyhub_result("FH2", 400)]}
+    )
+    bdfare = parse_bdfare({"response": {"offersGroup": [bdfare_offer("BD1", 350)]}})
+    segments = [flyhub[0].segments[0], flyhub[1].segments[0], bdfare[0].segments[0]]
+
+    assert all(segment.airline is reference.airline_names["BG"] for segment in segments)
+    assert all(segment.origin is reference.airport_codes["DAC"] for segment in segments)
+
+
+def test_autocomplete_routes_are_not_taken_for_booking_ids():
+    from services.flight_service.flight_service import router
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1/flights")
+    client = TestClient(app)
+
+    response = client.get("/api/v1/flights/airlines", params={"q": "emir"})
+    assert response.json() == {
+        "results": [{"code": "EK", "name": "Emirates", "country": "AE"}]
+    }
+    assert (
+        client.get("/api/v1/flights/airports", params={"q": "CGP", "limit": 1}).json()[
+            "results"
+        ][0]["code"]
+        == "CGP"
+    )
+    assert (
+        client.post("/api/v1/flights/search", json=search("Dubai")).status_code == 400
+    )
+    response = client.post("/api/v1/flights/search", json=search(airlines=[12]))
+    assert (response.status_code, response.json()["detail"]) == (
+        400,
+        "preferred_airlines must be a list of strings",
+    )
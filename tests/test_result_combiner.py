@@ -0,0 +1,279 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from services.flight_service import result_combiner
+
+
+def flyhub_result(
+    result_id, fare, flight_number="147", departure="2026-12-20T10:00:00"
+):
+    return {
+        "ResultID": result_id,
+        "IsRefundable": True,
+        "TotalFare": fare,
+        "Currency": "BDT",
+        "Segments": [
+            {
+                "Origin": {"AirportCode": "DAC"},
+                "Destination": {"AirportCode": "DXB"},
+                "Airline": {
+                    "AirlineName": "Biman Bangladesh Airlines",
+                    "AirlineCode": "BG",
+                },
+                "FlightNumber": flight_number,
+                "DepartureDateTime": departure,
+                "ArrivalDateTime": "2026-12-20T14:00:00",
+                "Duration": "360",
+                "Baggage": "30K",
+            }
+        ],
+    }
+
+
+def bdfare_offer(offer_id, fare, flight_number="147", departure="2026-12-20T10:00:00"):
+    return {
+        "offer": {
+            "offerId": offer_id,
+            "refundable": False,
+            "price": {"totalPayable": {"total": fare, "currency": "BDT"}},
+            "baggageAllowanceList": [
+                {"departure": "DXB", "checkIn": [{"allowance": "25KG"}]},
+                {"departure": "DAC", "checkIn": [{"allowance": "30KG"}]},
+                {"departure": "DAC", "checkIn": [{"allowance": "20KG"}]},
+            ],
+            "paxSegmentList": [
+                {
+                    "paxSegment": {
+                        "departure": {
+                            "iatA_LocationCode": "DAC",
+                            "aircraftScheduledDateTime": departure,
+                        },
+                        "arrival": {
+                            "iatA_LocationCode": "DXB",
+                            "aircraftScheduledDateTime": "2026-12-20T14:00:00",
+                        },
+                        "marketingCarrierInfo": {
+                            "carrierName": "Biman Bangladesh Airlines",
+                            "carrierDesigCode": "BG",
+                        },
+                        "flightNumber": flight_number,
+                        "duration": "360",
+                    }
+                },
+                {
+                    "paxSegment": {
+                        "departure": {
+                            "iatA_LocationCode": "CGP",
+                            "aircraftScheduledDateTime": "2026-12-21T10:00:00",
+                        },
+                        "arrival": {
+                            "iatA_LocationCode": "DAC",
+                            "aircraftScheduledDateTime": "2026-12-21T11:00:00",
+                        },
+                        "marketingCarrierInfo": {
+                            "carrierName": "Biman Bangladesh Airlines",
+                            "carrierDesigCode": "BG",
+                        },
+                        "flightNumber": "432",
+                        "duration": "60",
+                    }
+                },
+            ],
+        }
+    }
+
+
+def test_combined_results_are_normalized_and_sorted():
+    flyhub = {
+        "Results": [flyhub_result("FH1", 500, "101"), flyhub_result("FH2", 300, "102")]
+    }
+    bdfare = {"response": {"offersGroup": [bdfare_offer("BD1", 400, "103")]}}
+
+    results = result_combiner.combine_results(flyhub, bdfare)
+
+    assert [result["result_id"] for result in results] == ["FH2", "BD1", "FH1"]
+    assert results[0] == {
+        "source": "Flyhub",
+        "result_id": "FH2",
+        "is_refundable": True,
+        "total_fare": 300,
+        "currency": "BDT",
+        "segments": [
+            {
+                "origin": "DAC",
+                "destination": "DXB",
+                "airline": "Biman Bangladesh Airlines",
+                "flight_number": "BG102",
+                "departure_time": "2026-12-20T10:00:00",
+                "arrival_time": "2026-12-20T14:00:00",
+                "duration": "360",
+                "baggage": "30K",
+            }
+        ],
+        "alternatives": [],
+    }
+
+
+def test_bdfare_baggage_lookup():
+    offer = result_combiner.parse_bdfare(
+        {"response": {"offersGroup": [bdfare_offer("BD1", 400)]}}
+    )[0]
+
+    # First allowance for the departure airport wins; unknown airports fall back to N/A
+    assert [segment.baggage for segment in offer.segments] == ["30KG", "N/A"]
+    assert offer.segments[0].flight_number == "BG147"
+
+
+def test_missing_supplier_payloads():
+    assert result_combiner.combine_results({}, {}) == []
+    assert (
+        result_combiner.combine_results(
+            {"Results": [flyhub_result("FH1", 100)]}, {"response": {}}
+        )[0]["result_id"]
+        == "FH1"
+    )
+
+
+def test_top_k_selection_matches_full_sort():
+    flyhub = {
+        "Results": [
+            flyhub_result(f"FH{i}", fare, f"1{i}")
+            for i, fare in enumerate([9, 3, 7, 3, 1])
+        ]
+    }
+    bdfare = {
+        "response": {
+            "offersGroup": [
+                bdfare_offer(f"BD{i}", fare, f"2{i}")
+                for i, fare in enumerate([4, 3, 8])
+            ]
+        }
+    }
+
+    full = result_combiner.combine_results(flyhub, bdfare)
+    assert result_combiner.combine_results(flyhub, bdfare, limit=4) == full[:4]
+    assert [result["result_id"] for result in full[:4]] == ["FH4", "FH1", "FH3", "BD1"]
+    assert result_combiner.select_offers([], limit=10) == []
+
+
+# Test cross-supplier de-duplication
+def test_same_itinerary_keeps_cheapest_offer():
+    flyhub = {
+        "Results": [flyhub_result("FH1", 450, "147"), flyhub_result("FH2", 600, "585")]
+    }
+    one_way = bdfare_offer("BD1", 400, "0147", departure="2026-12-20T10:00:00+06:00")
+    one_way["offer"]["paxSegmentList"].pop()
+    one_way["offer"]["refundable"] = True
+    bdfare = {"response": {"offersGroup": [one_way]}}
+
+    results = result_combiner.combine_results(flyhub, bdfare)
+
+    assert [result["result_id"] for result in results] == ["BD1", "FH2"]
+    assert results[0]["alternatives"] == [
+        {"source": "Flyhub", "result_id": "FH1", "total_fare": 450}
+    ]
+    assert results[1]["alternatives"] == []
+
+
+def test_different_departure_times_are_kept():
+    flyhub = {"Results": [flyhub_result("FH1", 450, departure="2026-12-20T10:00:00")]}
+    bdfare = {
+        "response": {
+            "offersGroup": [bdfare_offer("BD1", 400, departure="2026-12-21T10:00:00")]
+        }
+    }
+
+    assert len(result_combiner.combine_results(flyhub, bdfare)) == 2
+    assert (
+        len(
+            result_combiner.combine_results(
+                {"Results": [flyhub_result("FH1", 450)] * 2}, {}, deduplicate=False
+            )
+        )
+        == 2
+    )
+
+
+def one_way_bdfare(offer_id, fare, refundable=True):
+    offer = bdfare_offer(offer_id, fare)
+    offer["offer"]["paxSegmentList"].pop()
+    offer["offer"]["refundable"] = refundable
+    return offer
+
+
+def test_deduplication_collects_all_alternatives():
+    offers = [
+        *result_combiner.parse_flyhub({"Results": [flyhub_result("FH1", 500)]}),
+        *result_combiner.parse_bdfare(
+            {"response": {"offersGroup": [one_way_bdfare("BD1", 300)]}}
+        ),
+        *result_combiner.parse_flyhub({"Results": [flyhub_result("FH3", 400)]}),
+        *result_combiner.parse_bdfare(
+            {"response": {"offersGroup": [one_way_bdfare("BD2", 300)]}}
+        ),
+    ]
+
+    deduplicated = result_combiner.deduplicate_offers(offers)
+
+    # BD2 is a second BDFare fare for the itinerary, so it is not collapsed into BD1
+    assert [offer.result_id for offer in deduplicated] == ["BD1", "BD2"]
+    assert [
+        alternative["result_id"] for alternative in deduplicated[0].alternatives
+    ] == ["FH3", "FH1"]
+
+
+def test_deduplication_does_not_depend_on_input_order():
+    offers = [
+        *result_combiner.parse_flyhub(
+            {
+                "Results": [
+                    flyhub_result("FH1", 500),
+                    flyhub_result("FH2", 300),
+                    flyhub_result("FH3", 450),
+                ]
+            }
+        ),
+        *result_combiner.parse_bdfare(
+            {
+                "response": {
+                    "offersGroup": [
+                        one_way_bdfare("BD1", 400),
+                        one_way_bdfare("BD2", 300),
+                        one_way_bdfare("BD3", 350, refundable=False),
+                    ]
+                }
+            }
+        ),
+    ]
+
+    def outcome(offers):
+        return sorted(
+            (
+                offer.result_id,
+                [alternative["result_id"] for alternative in offer.alternatives or []],
+            )
+            for offer in result_combiner.deduplicate_offers(offers)
+        )
+
+    expected = outcome(offers)
+    # BD2 ties FH2 and wins on source; Flyhub's fares fold into it, BDFare's other fare stays its own offer
+    assert expected == [("BD1", []), ("BD2", ["FH2", "FH3", "FH1"]), ("BD3", [])]
+    rng = random.Random(0)
+    for _ in range(20):
+        rng.shuffle(offers)
+        assert outcome(offers) == expected
+
+
+def test_deduplication_keeps_distinct_fares():
+    refundable = result_combiner.parse_flyhub({"Results": [flyhub_result("FH1", 500)]})
+    non_refundable = result_combiner.parse_bdfare(
+        {"response": {"offersGroup": [one_way_bdfare("BD1", 300, refundable=False)]}}
+    )
+    same_supplier = result_combiner.parse_flyhub(
+        {"Results": [flyhub_result("FH2", 450), flyhub_result("FH3", 480)]}
+    )
+
+    assert len(result_combiner.deduplicate_offers(refundable + non_refundable)) == 2
+    assert len(result_combiner.deduplicate_offers(same_supplier)) == 2
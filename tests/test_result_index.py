@@ -0,0 +1,214 @@
+import os
+import sys
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from services.flight_service import flight_service, result_index
+from services.flight_service.result_combiner import combine_results
+from shared import fast_json
+from tests.test_result_combiner import flyhub_result
+
+
+def offer(
+    result_id,
+    fare,
+    airline="BG",
+    departure="10:00",
+    duration="360",
+    refundable=True,
+    via=None,
+):
+    result = flyhub_result(
+        result_id,
+        fare,
+        flight_number=result_id[2:],
+        departure=f"2099-12-20T{departure}:00",
+    )
+    result["IsRefundable"] = refundable
+    segment = result["Segments"][0]
+    segment["Airline"] = {"AirlineName": airline, "AirlineCode": airline}
+    segment["Duration"] = duration
+    if via:
+        connection = dict(
+            segment, Origin={"AirportCode": via}, FlightNumber=result_id[2:] + "9"
+        )
+        segment["Destination"] = {"AirportCode": via}
+        result["Segments"] = [segment, connection]
+    return result
+
+
+RESULTS = [
+    offer("FH1", 500, "BG", "08:00", "300"),
+    offer("FH2", 300, "EK", "23:30", "700", refundable=False, via="DOH"),
+    offer("FH3", 400, "QR", "14:00", "200", via="DOH"),
+    offer("FH4", 200, "BG", "05:00", "900", refundable=False),
+    offer("FH5", 600, "EK", "12:00", "250"),
+]
+
+
+def build_body(results=RESULTS):
+    return fast_json.dumps(
+        {
+            "results": combine_results({"Results": results}, {}),
+            "suppliers": {"flyhub": {"status": "ok"}},
+        }
+    )
+
+
+def ids(index, positions):
+    return [fast_json.loads(index.encoded[i])["result_id"] for i in positions]
+
+
+def test_filters_are_combined_bitmaps():
+    index = result_index.SearchResultIndex(build_body(), ["DXB"])
+
+    assert ids(index, index.page(index.select())[0]) == [
+        "FH4",
+        "FH2",
+        "FH3",
+        "FH1",
+        "FH5",
+    ]
+    assert ids(index, index.page(index.select(stops=0))[0]) == ["FH4", "FH1", "FH5"]
+    assert ids(index, index.page(index.select(airlines=["ek", "QR"]))[0]) == [
+        "FH2",
+        "FH3",
+        "FH5",
+    ]
+    assert ids(
+        index,
+        index.page(index.select(min_price=300, max_price=500, refundable=True))[0],
+    ) == ["FH3", "FH1"]
+    assert ids(
+        index, index.page(index.select(departure_from="07:00", departure_to="14:00"))[0]
+    ) == ["FH3", "FH1", "FH5"]
+    # A window past midnight
+    assert ids(
+        index, index.page(index.select(departure_from="22:00", departure_to="06:00"))[0]
+    ) == ["FH4", "FH2"]
+    assert index.select(airlines=["ZZ"]) == 0
+    with pytest.raises(ValueError):
+        index.select(departure_from="25:00")
+
+
+def test_sort_keys_and_pages():
+    index = result_index.SearchResultIndex(build_body(), ["DXB"])
+
+    assert ids(index, index.page(index.all, "duration")[0]) == [
+        "FH5",
+        "FH1",
+        "FH3",
+        "FH4",
+        "FH2",
+    ]
+    assert ids(index, index.page(index.all, "-departure")[0]) == [
+        "FH2",
+        "FH3",
+        "FH5",
+        "FH1",
+        "FH4",
+    ]
+    positions, place = index.page(index.select(refundable=True), "-price", 0, 2)
+    assert ids(index, positions) == ["FH5", "FH1"]
+    assert ids(
+        index, index.page(index.select(refundable=True), "-price", place, 2)[0]
+    ) == ["FH3"]
+
+
+def test_store_reuses_indexes_of_the_same_result_set():
+    store = result_index.ResultIndexStore(max_entries=1)
+    body = build_body()
+
+    first = store.index("search-1", body, ["DXB"])
+    assert store.index("search-1", bytes(body), ["DXB"]) is first
+    assert store.index("search-1", build_body(RESULTS[:2]), ["DXB"]) is not first
+    store.index("search-2", body, ["DXB"])
+    assert store.get("search-1") is None
+    assert store.stats()["builds"] == 3
+
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = []
+
+    async def supplier_post(supplier, endpoint, payload, timeout):
+        calls.append(supplier)
+        body = (
+            {"Results": RESULTS}
+            if supplier == "flyhub"
+            else {"response": {"offersGroup": []}}
+        )
+        return httpx.Response(200, content=fast_json.dumps(body))
+
+    monkeypatch.setattr(flight_service, "_supplier_post", supplier_post)
+    app = FastAPI()
+    app.include_router(flight_service.router, prefix="/api/v1/flights")
+    client = TestClient(app)
+    client.calls = calls
+    return client
+
+
+SEARCH = {
+    "segments": [
+        {"origin": "DAC", "destination": "DXB", "departure_date": "2099-12-20"}
+    ],
+    "cabin_class": "business",
+    "trip_type": "one_way",
+}
+
+
+def test_pages_follow_the_cursor_without_searching_again(client):
+    query = {"airlines": "BG,EK", "sort": "duration", "limit": 2}
+    first = client.post("/api/v1/flights/search", json=SEARCH, params=query).json()
+    supplier_calls = len(client.calls)
+    second = client.post(
+        "/api/v1/flights/search",
+        json=SEARCH,
+        params={**query, "cursor": first["next_cursor"]},
+    ).json()
+
+    assert [result["result_id"] for result in first["results"]] == ["FH5", "FH1"]
+    assert [result["result_id"] for result in second["results"]] == ["FH4", "FH2"]
+    assert first["total_results"] == second["total_results"] == 4
+    assert second["next_cursor"] is None
+    assert second["suppliers"] == first["suppliers"]
+    assert len(client.calls) == supplier_calls
+
+    # The full result set is still there without query parameters
+    assert (
+        len(client.post("/api/v1/flights/search", json=SEARCH).json()["results"]) == 5
+    )
+
+
+def test_bad_queries_and_cursors_are_rejected(client):
+    first = client.post(
+        "/api/v1/flights/search", json=SEARCH, params={"limit": 1}
+    ).json()
+
+    def page(**params):
+        return client.post(
+            "/api/v1/flights/search", json=SEARCH, params=params
+        ).status_code
+
+    assert page(limit=1, cursor=first["next_cursor"]) == 200
+    assert page(limit=1, cursor=first["next_cursor"], stops=0) == 400
+    assert page(cursor="not-a-cursor") == 400
+    assert page(sort="fare") == 400
+    assert page(limit=0) == 400
+    assert page(departure_from="7am") == 400
+
+    flight_service.result_indexes._indexes.clear()
+    assert page(limit=1, cursor=first["next_cursor"]) == 410
+
+
+def test_searches_keep_only_the_cheapest_offers(client, monkeypatch):
+    monkeypatch.setattr(flight_service, "RESULT_LIMIT", 2)
+    response = client.post(
+        "/api/v1/flights/search", json={**SEARCH, "cabin_class": "first"}
+    ).json()
+
+    assert [result["result_id"] for result in response["results"]] == ["FH4", "FH2"]
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from shared.retry import RetryBudget, RetryPolicy
+
+REQUEST = httpx.Request("GET", "https://supplier.example.com/search")
+
+
+def status_error(status_code, headers=None):
+    response = httpx.Response(status_code, headers=headers, request=REQUEST)
+    return httpx.HTTPStatusError(
+        f"HTTP {status_code}", request=REQUEST, response=response
+    )
+
+
+def flaky(*failures):
+    """Call that raises each of ``failures`` in turn, then succeeds."""
+    calls = []
+
+    def call(timeout):
+        calls.append(timeout)
+        if len(calls) <= len(failures):
+            raise failures[len(calls) - 1]
+        return "ok"
+
+    call.calls = calls
+    return call
+
+
+# Test classification of failures
+@pytest.mark.parametrize(
+    "exc",
+    [
+        httpx.ConnectError("refused"),
+        status_error(502),
+        status_error(503),
+        status_error(504),
+        status_error(429, {"Retry-After": "0"}),
+    ],
+)
+def test_retriable_failures(exc):
+    call = flaky(exc)
+    assert RetryPolicy(backoff=0).execute(call, "GET") == "ok"
+    assert len(call.calls) == 2
+
+
+@pytest.mark.parametrize(
+    "exc",
+    [
+        httpx.ReadTimeout("no response"),
+        status_error(500),
+        status_error(404),
+        status_error(429),  # No Retry-After
+    ],
+)
+def test_non_retriable_failures(exc):
+    call = flaky(exc)
+    with pytest.raises(type(exc)):
+        RetryPolicy(backoff=0).execute(call, "GET")
+    assert len(call.calls) == 1
+
+
+def test_non_idempotent_methods_need_opt_in():
+    call = flaky(status_error(503))
+    with pytest.raises(httpx.HTTPStatusError):
+        RetryPolicy(backoff=0).execute(call, "POST")
+    assert len(call.calls) == 1
+
+    call = flaky(status_error(503))
+    assert (
+        RetryPolicy(backoff=0).execute(call, "POST", allow_non_idempotent=True) == "ok"
+    )
+
+
+def test_retry_after_is_honoured():
+    call = flaky(status_error(429, {"Retry-After": "0.05"}))
+    started = time.monotonic()
+    RetryPolicy().execute(call, "GET")
+    assert time.monotonic() - started >= 0.05
+
+
+# Test deadline and budget
+def test_retry_is_not_scheduled_past_the_deadline():
+    call = flaky(status_error(503, {"Retry-After": "5"}))
+    with pytest.raises(httpx.HTTPStatusError):
+        RetryPolicy().execute(call, "GET", deadline=1)
+    assert len(call.calls) == 1
+
+
+def test_attempts_get_the_remaining_time():
+    call = flaky(httpx.ConnectError("refused"))
+    RetryPolicy(backoff=0).execute(call, "GET", deadline=2)
+    assert 0 < call.calls[1] < call.calls[0] <= 2
+
+
+def test_budget_caps_retries_at_a_fraction_of_traffic():
+    policy = RetryPolicy(backoff=0, max_attempts=2, budget_ratio=0.25, budget_initial=0)
+    retried = 0
+    for _ in range(100):
+        call = flaky(status_error(503))
+        try:
+            policy.execute(call, "GET", key="supplier")
+        except httpx.HTTPStatusError:
+            pass
+        retried += len(call.calls) - 1
+
+    assert retried == 25
+    assert policy.stats()["supplier"]["exhausted"] == 75
+
+
+def test_budget_tokens_are_capped():
+    budget = RetryBudget(ratio=1, initial=0, max_tokens=3)
+    for _ in range(10):
+        budget.deposit()
+    assert [budget.withdraw() for _ in range(4)] == [True, True, True, False]
+
+
+@patch("shared.retry.asyncio.sleep", new_callable=AsyncMock)
+def test_async_execute(mock_sleep):
+    calls = []
+
+    async def call(timeout):
+        calls.append(timeout)
+        if len(calls) < 3:
+            raise httpx.ConnectError("refused")
+        return "ok"
+
+    assert asyncio.run(RetryPolicy().aexecute(call, "GET")) == "ok"
+    assert mock_sleep.await_count == 2
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import sys
+import time
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from services.flight_service.search_cache import search_fingerprint, search_ttl
+from shared.cache import Cache, InMemoryCacheBackend, RedisCacheBackend
+
+SEARCH = {
+    "segments": [
+        {"origin": "DAC", "destination": "DXB", "departure_date": "2026-12-20"},
+        {"origin": "DXB", "destination": "DAC", "departure_date": "2026-12-28"},
+    ],
+    "adult_count": 2,
+    "cabin_class": "economy",
+    "trip_type": "round_trip",
+    "preferred_airlines": ["EK", "BG"],
+}
+
+
+# Test search fingerprints
+def test_fingerprint_ignores_field_order_and_formatting():
+    reordered = {
+        "preferred_airlines": ["bg", "EK", "EK"],
+        "trip_type": "Round_Trip",
+        "cabin_class": "Economy",
+        "child_count": 0,
+        "adult_count": 2,
+        "user_ip": "10.0.0.1",
+        "segments": [
+            {"departure_date": "2026-12-20", "destination": "dxb", "origin": "dac"},
+            {"destination": "DAC", "origin": "DXB", "departure_date": "2026-12-28"},
+        ],
+    }
+    assert search_fingerprint(reordered) == search_fingerprint(SEARCH)
+
+
+def test_fingerprint_distinguishes_searches():
+    assert search_fingerprint({**SEARCH, "adult_count": 1}) != search_fingerprint(
+        SEARCH
+    )
+    assert search_fingerprint(
+        {**SEARCH, "cabin_class": "business"}
+    ) != search_fingerprint(SEARCH)
+    reversed_segments = {**SEARCH, "segments": list(reversed(SEARCH["segments"]))}
+    assert search_fingerprint(reversed_segments) != search_fingerprint(SEARCH)
+
+
+MALFORMED = [
+    {key: value for key, value in SEARCH.items() if key != "cabin_class"},
+    {**SEARCH, "preferred_airlines": [12]},
+    {
+        **SEARCH,
+        "segments": [
+            {"origin": None, "destination": "DXB", "departure_date": "2026-12-20"}
+        ],
+    },
+]
+
+
+def test_fingerprint_rejects_missing_and_malformed_fields():
+    for search in MALFORMED:
+        with pytest.raises(ValueError):
+            search_fingerprint(search)
+
+
+def test_malformed_searches_are_rejected_with_400():
+    from services.flight_service.flight_service import router
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1/flights")
+    client = TestClient(app)
+
+    for search in MALFORMED[:2]:
+        assert client.post("/api/v1/flights/search", json=search).status_code == 400
+        assert (
+            client.post("/api/v1/flights/search/stream", json=search).status_code == 400
+        )
+
+
+def test_ttl_shrinks_close_to_departure():
+    assert search_ttl(SEARCH, today=date(2026, 12, 19)) == 120
+    assert search_ttl(SEARCH, today=date(2026, 12, 10)) == 300
+    assert search_ttl(SEARCH, today=date(2026, 11, 1)) == 900
+    assert search_ttl(SEARCH, today=date(2026, 6, 1)) == 1800
+
+
+# Test cache backends
+def test_in_memory_lru_eviction():
+    cache = Cache(InMemoryCacheBackend(max_entries=2))
+
+    async def run():
+        await cache.set("a", {"v": 1}, ttl=60)
+        await cache.set("b", {"v": 2}, ttl=60)
+        await cache.get("a")  # "a" is now most recently used
+        await cache.set("c", {"v": 3}, ttl=60)
+        return await cache.get("a"), await cache.get("b"), await cache.get("c")
+
+    assert asyncio.run(run()) == ({"v": 1}, None, {"v": 3})
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_in_memory_expiry():
+    cache = Cache(InMemoryCacheBackend())
+
+    async def run():
+        await cache.set("a", {"v": 1}, ttl=0.01)
+        time.sleep(0.02)
+        return await cache.get("a")
+
+    assert asyncio.run(run()) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_redis_backend(redis_standin):
+    import redis.asyncio as redis
+
+    async def run():
+        client = redis.from_url(redis_standin.url)
+        cache = Cache(RedisCacheBackend(client=client, prefix="test:"))
+        await cache.set("search", {"results": [1, 2, 3]}, ttl=60)
+        await cache.set("body", b'{"results":[]}', ttl=60)
+        hit = await cache.get("search")
+        raw = await cache.get("body")
+        await cache.delete("search")
+        miss = await cache.get("search")
+        await client.aclose()
+        return hit, raw, miss
+
+    hit, raw, miss = asyncio.run(run())
+    assert hit == {"results": [1, 2, 3]}
+    # Pre-serialized bodies come back as the same bytes, without a JSON round trip
+    assert raw == b'{"results":[]}'
+    assert miss is None
+    assert b"test:search" not in redis_standin.data
+
+
+def test_unreachable_redis_degrades_to_misses():
+    import redis.asyncio as redis
+
+    async def run():
+        # Nothing listens on port 1: every call fails to connect
+        client = redis.from_url(
+            "redis://127.0.0.1:1/0?protocol=2", socket_connect_timeout=0.2
+        )
+        cache = Cache(RedisCacheBackend(client=client, prefix="test:"))
+        await cache.set("search", b"{}", ttl=60)
+        value = await cache.get("search")
+        await cache.delete("search")
+        await client.aclose()
+        return value, cache.stats()
+
+    value, stats = asyncio.run(run())
+    assert value is None
+    assert (stats["misses"], stats["errors"]) == (1, 3)
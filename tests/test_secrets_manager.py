@@ -0,0 +1,180 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from shared import secrets_manager
+
+
+class FakeSecretsManagerClient:
+    """Stand-in for a boto3 secretsmanager client."""
+
+    def __init__(self, secrets, delay=0.0):
+        self.secrets = secrets
+        self.delay = delay
+        self.calls = 0
+        self.fail = False
+
+    def get_secret_value(self, SecretId):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ClientError(
+                {"Error": {"Code": "InternalServiceError"}}, "GetSecretValue"
+            )
+        if SecretId not in self.secrets:
+            raise ClientError(
+                {"Error": {"Code": "ResourceNotFoundException"}}, "GetSecretValue"
+            )
+        return {"SecretString": self.secrets[SecretId]}
+
+
+def test_cached_secret_is_not_fetched_again():
+    client = FakeSecretsManagerClient({"api-key": "k1"})
+    provider = secrets_manager.SecretsProvider(
+        secrets_manager.AWSSecretsBackend(client=client), ttl=60, refresh_margin=0
+    )
+
+    assert provider.get("api-key") == "k1"
+    assert provider.get("api-key") == "k1"
+    assert client.calls == 1
+    assert provider.stats()["hits"] == 1
+    assert provider.stats()["misses"] == 1
+
+
+def test_concurrent_lookups_share_one_fetch():
+    client = FakeSecretsManagerClient({"api-key": "k1"}, delay=0.05)
+    provider = secrets_manager.SecretsProvider(
+        secrets_manager.AWSSecretsBackend(client=client), ttl=60, refresh_margin=0
+    )
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(provider.get("api-key")))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["k1"] * 10
+    assert client.calls == 1
+
+
+def test_secret_near_expiry_is_refreshed_in_background():
+    client = FakeSecretsManagerClient({"api-key": "k1"}, delay=0.05)
+    # Every cached value is inside the refresh margin
+    provider = secrets_manager.SecretsProvider(
+        secrets_manager.AWSSecretsBackend(client=client), ttl=60, refresh_margin=60
+    )
+    assert provider.get("api-key") == "k1"
+
+    client.secrets["api-key"] = "k2"
+    started = time.monotonic()
+    assert provider.get("api-key") == "k1"
+    assert time.monotonic() - started < 0.05
+    provider._refreshing["api-key"].join()
+    assert provider.stats()["refreshes"] == 1
+
+    provider.refresh_margin = 0
+    assert provider.get("api-key") == "k2"
+    assert client.calls == 2
+
+
+def test_failed_background_refresh_keeps_serving_cached_value():
+    client = FakeSecretsManagerClient({"api-key": "k1"})
+    provider = secrets_manager.SecretsProvider(
+        secrets_manager.AWSSecretsBackend(client=client), ttl=60, refresh_margin=60
+    )
+    provider.get("api-key")
+
+    client.fail = True
+    assert provider.get("api-key") == "k1"
+    provider._refreshing["api-key"].join()
+    assert provider.get("api-key") == "k1"
+    assert provider.stats()["failures"] >= 1
+
+
+def test_expired_secret_is_fetched_again():
+    client = FakeSecretsManagerClient({"api-key": "k1"})
+    provider = secrets_manager.SecretsProvider(
+        secrets_manager.AWSSecretsBackend(client=client), ttl=0, refresh_margin=0
+    )
+    provider.get("api-key")
+    provider.get("api-key")
+    assert client.calls == 2
+
+
+def test_missing_secrets_raise_secret_not_found(tmp_path, monkeypatch):
+    monkeypatch.delenv("SECRET_MISSING", raising=False)
+    backends = [
+        secrets_manager.AWSSecretsBackend(client=FakeSecretsManagerClient({})),
+        secrets_manager.EnvSecretsBackend(),
+        secrets_manager.FileSecretsBackend(str(tmp_path)),
+    ]
+    for backend in backends:
+        with pytest.raises(secrets_manager.SecretNotFound):
+            secrets_manager.SecretsProvider(backend).get("missing")
+
+
+def test_env_and_file_backends(tmp_path, monkeypatch):
+    monkeypatch.setenv("SECRET_FLYHUB_API_KEY", "from-env")
+    (tmp_path / "flyhub-api-key").write_text("from-file\n")
+
+    assert (
+        secrets_manager.SecretsProvider(secrets_manager.EnvSecretsBackend()).get(
+            "flyhub/api-key"
+        )
+        == "from-env"
+    )
+    assert (
+        secrets_manager.SecretsProvider(
+            secrets_manager.FileSecretsBackend(str(tmp_path))
+        ).get("flyhub-api-key")
+        == "from-file"
+    )
+
+
+def test_file_backend_stays_inside_its_directory(tmp_path):
+    secrets_dir = tmp_path / "secrets"
+    (secrets_dir / "flyhub").mkdir(parents=True)
+    (secrets_dir / "flyhub" / "api-key").write_text("nested\n")
+    (tmp_path / "outside").write_text("not a secret\n")
+    backend = secrets_manager.FileSecretsBackend(str(secrets_dir))
+
+    assert backend.fetch("flyhub/api-key") == "nested"
+    for name in (
+        "../outside",
+        "flyhub/../../outside",
+        str(tmp_path / "outside"),
+        "/etc/passwd",
+        "",
+        ".",
+    ):
+        with pytest.raises(ValueError):
+            backend.fetch(name)
+
+
+def test_aws_client_is_created_lazily_and_reused(monkeypatch):
+    import boto3
+
+    sessions = []
+
+    class Session:
+        def __init__(self):
+            sessions.append(self)
+
+        def client(self, service_name, region_name=None):
+            return FakeSecretsManagerClient({"a": "1", "b": "2"})
+
+    monkeypatch.setattr(boto3.session, "Session", Session)
+    backend = secrets_manager.create_secrets_backend("aws")
+    assert sessions == []
+
+    assert backend.fetch("a") == "1"
+    assert backend.fetch("b") == "2"
+    assert len(sessions) == 1
@@ -0,0 +1,152 @@
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from shared.single_flight import SingleFlight
+
+
+def upstream(delay=0.05, result="results", error=None):
+    calls = []
+
+    async def call():
+        calls.append("started")
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            calls.append("cancelled")
+            raise
+        if error:
+            raise error
+        return result
+
+    call.calls = calls
+    return call
+
+
+def test_concurrent_identical_calls_share_one_upstream_call():
+    flights = SingleFlight()
+    call = upstream()
+
+    async def run():
+        return await asyncio.gather(*(flights.do("DAC-DXB", call) for _ in range(10)))
+
+    assert asyncio.run(run()) == ["results"] * 10
+    assert call.calls == ["started"]
+    assert flights.stats() == {
+        "requests": 10,
+        "coalesced": 9,
+        "in_flight": 0,
+        "coalescing_ratio": 0.9,
+    }
+
+
+def test_different_keys_are_not_coalesced():
+    flights = SingleFlight()
+    call = upstream()
+
+    async def run():
+        await asyncio.gather(flights.do("DAC-DXB", call), flights.do("DAC-CXB", call))
+
+    asyncio.run(run())
+    assert call.calls == ["started", "started"]
+
+
+def test_calls_after_completion_start_fresh():
+    flights = SingleFlight()
+    call = upstream(delay=0)
+
+    async def run():
+        await flights.do("DAC-DXB", call)
+        await flights.do("DAC-DXB", call)
+
+    asyncio.run(run())
+    assert call.calls == ["started", "started"]
+
+
+def test_errors_are_shared():
+    flights = SingleFlight()
+    call = upstream(error=ValueError("suppliers down"))
+
+    async def run():
+        return await asyncio.gather(
+            *(flights.do("DAC-DXB", call) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert call.calls == ["started"]
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    flights = SingleFlight()
+    call = upstream()
+
+    async def run():
+        leader = asyncio.ensure_future(flights.do("DAC-DXB", call))
+        follower = asyncio.ensure_future(flights.do("DAC-DXB", call))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower, leader.cancelled()
+
+    assert asyncio.run(run()) == ("results", True)
+    assert call.calls == ["started"]
+
+
+def test_upstream_call_is_cancelled_when_every_caller_is_gone():
+    flights = SingleFlight()
+    call = upstream()
+
+    async def run():
+        callers = [asyncio.ensure_future(flights.do("DAC-DXB", call)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        # A new caller starts a fresh call rather than joining the cancelled one
+        return await flights.do("DAC-DXB", call)
+
+    assert asyncio.run(run()) == "results"
+    assert call.calls == ["started", "cancelled", "started"]
+
+
+def test_flight_search_coalesces_identical_searches():
+    from services.flight_service import flight_service
+    from services.flight_service.supplier_search import SupplierResult
+    from shared.cache import Cache, InMemoryCacheBackend
+
+    fan_outs = []
+
+    async def fake_search_suppliers(calls):
+        fan_outs.append(1)
+        await asyncio.sleep(0.05)
+        return {name: SupplierResult(name, "ok", payload={}) for name in calls}
+
+    search = {
+        "segments": [
+            {"origin": "DAC", "destination": "DXB", "departure_date": "2099-12-20"}
+        ],
+        "adult_count": 1,
+        "cabin_class": "economy",
+        "trip_type": "one_way",
+    }
+
+    async def run():
+        return await asyncio.gather(
+            *(flight_service.flight_search(dict(search)) for _ in range(5))
+        )
+
+    with patch.object(
+        flight_service, "search_suppliers", fake_search_suppliers
+    ), patch.object(
+        flight_service, "search_cache", Cache(InMemoryCacheBackend())
+    ), patch.object(
+        flight_service, "search_flights", SingleFlight()
+    ) as flights:
+        responses = asyncio.run(run())
+
+    assert len(fan_outs) == 1
+    assert len({response.body for response in responses}) == 1
+    assert flights.stats()["coalesced"] == 4
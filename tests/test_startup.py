@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def run_main(env, code):
+    return subprocess.run(
+        [sys.executable, "-c", f"import sys, main; {code}"],
+        cwd=ROOT,
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.splitlines()
+
+
+def imported_after_main(env):
+    output = run_main(
+        env,
+        "print(' '.join(sorted(main.SERVICE_ROUTERS))); print(' '.join(sys.modules))",
+    )
+    return output[0].split(), set(output[1].split())
+
+
+def test_only_enabled_services_are_imported():
+    prefixes, modules = imported_after_main({"ENABLED_SERVICES": "hotels,cars"})
+    assert prefixes == ["/api/v1/cars", "/api/v1/hotels"]
+    assert "services.hotel_service.hotel_service" in modules
+    assert "services.flight_service.flight_service" not in modules
+
+
+def test_heavy_optional_dependencies_are_not_imported_at_startup():
+    prefixes, modules = imported_after_main({"ENABLED_SERVICES": ""})
+    assert len(prefixes) == 9
+    assert "boto3" not in modules
+    assert "requests" not in modules
+
+
+def test_bundles_alone_start_the_hotel_index():
+    output = run_main(
+        {"ENABLED_SERVICES": "bundles", "HOTEL_INDEX_REFRESH_INTERVAL": "300"},
+        (
+            "from fastapi.testclient import TestClient\n"
+            "from services.hotel_service.availability_index import hotel_index\n"
+            "print([type(service).__name__ for service in main.background_services])\n"
+            "with TestClient(main.app):\n"
+            "    print(hotel_index._task is not None)"
+        ),
+    )
+    assert output[-2:] == ["['HotelAvailabilityIndex']", "True"]
@@ -0,0 +1,129 @@
+import asyncio
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from services.flight_service import supplier_search
+from shared.exceptions import CircuitOpenError
+
+
+async def fast_supplier():
+    return {"Results": []}
+
+
+async def slow_supplier():
+    await asyncio.sleep(5)
+    return {"Results": []}
+
+
+async def failing_supplier():
+    request = httpx.Request("POST", "https://supplier.example.com/AirSearch")
+    response = httpx.Response(503, request=request)
+    raise httpx.HTTPStatusError(
+        "Service Unavailable", request=request, response=response
+    )
+
+
+def test_all_suppliers_answer():
+    results = asyncio.run(
+        supplier_search.search_suppliers(
+            {"flyhub": fast_supplier, "bdfare": fast_supplier}
+        )
+    )
+
+    assert results["flyhub"].ok
+    assert results["bdfare"].ok
+    assert results["flyhub"].payload == {"Results": []}
+
+
+def test_slow_supplier_does_not_block_others():
+    results = asyncio.run(
+        supplier_search.search_suppliers(
+            {"flyhub": fast_supplier, "bdfare": slow_supplier},
+            timeouts={"flyhub": 1, "bdfare": 0.05},
+            deadline=1,
+        )
+    )
+
+    assert results["flyhub"].ok
+    assert results["bdfare"].status == "timeout"
+    assert results["bdfare"].payload is None
+
+
+def test_overall_deadline_caps_supplier_timeouts():
+    results = asyncio.run(
+        supplier_search.search_suppliers(
+            {"flyhub": slow_supplier}, timeouts={"flyhub": 10}, deadline=0.05
+        )
+    )
+
+    assert results["flyhub"].status == "timeout"
+
+
+def test_failed_supplier_keeps_partial_results():
+    results = asyncio.run(
+        supplier_search.search_suppliers(
+            {"flyhub": failing_supplier, "bdfare": fast_supplier}
+        )
+    )
+
+    assert results["bdfare"].ok
+    assert results["flyhub"].status == "error"
+    assert results["flyhub"].metadata()["http_status"] == 503
+
+
+def test_results_are_yielded_as_they_arrive():
+    async def medium_supplier():
+        await asyncio.sleep(0.05)
+        return {"Results": []}
+
+    async def run():
+        return [
+            result.supplier
+            async for result in supplier_search.iter_supplier_results(
+                {
+                    "slow": slow_supplier,
+                    "medium": medium_supplier,
+                    "fast": fast_supplier,
+                },
+                timeouts={"slow": 1, "medium": 1, "fast": 1},
+                deadline=0.2,
+            )
+        ]
+
+    assert asyncio.run(run()) == ["fast", "medium", "slow"]
+
+
+def test_closing_stream_early_cancels_pending_suppliers():
+    cancelled = []
+
+    async def tracked_slow_supplier():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def run():
+        results = supplier_search.iter_supplier_results(
+            {"fast": fast_supplier, "slow": tracked_slow_supplier}, deadline=1
+        )
+        first = await results.__anext__()
+        await results.aclose()
+        return first
+
+    assert asyncio.run(run()).supplier == "fast"
+    assert cancelled == [True]
+
+
+def test_open_circuit_is_reported_as_unavailable():
+    async def rejected():
+        raise CircuitOpenError("https://flyhub.example.com", retry_after=30)
+
+    results = asyncio.run(
+        supplier_search.search_suppliers({"flyhub": rejected, "bdfare": fast_supplier})
+    )
+    assert results["flyhub"].status == "unavailable"
+    assert results["bdfare"].ok